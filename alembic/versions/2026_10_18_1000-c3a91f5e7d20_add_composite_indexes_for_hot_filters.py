@@ -0,0 +1,66 @@
+"""add composite and partial indexes for the reservation, user and notification hot filters
+
+Revision ID: c3a91f5e7d20
+Revises: 534a420d4c69
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a91f5e7d20'
+down_revision: Union[str, None] = '534a420d4c69'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ACTIVE_RESERVATION = sa.text("status != 'cancelled'")
+ACTIVE_RESERVATION_DATE2 = sa.text(
+    "status != 'cancelled' AND date2 IS NOT NULL")
+UNREAD_NOTIFICATION = sa.text("is_read = false")
+
+
+def upgrade() -> None:
+    # reservations
+    op.create_index('ix_reservations_county_clan_status_date1', 'reservations',
+                    ['county_id', 'clan_id', 'status', 'date1'], unique=False)
+    op.create_index('ix_reservations_active_clan_date1', 'reservations',
+                    ['clan_id', 'date1'], unique=False,
+                    postgresql_where=ACTIVE_RESERVATION)
+    op.create_index('ix_reservations_active_clan_date2', 'reservations',
+                    ['clan_id', 'date2'], unique=False,
+                    postgresql_where=ACTIVE_RESERVATION_DATE2)
+    op.create_index('ix_reservations_groom_status', 'reservations',
+                    ['groom_id', 'status'], unique=False)
+
+    # users
+    op.create_index('ix_users_clan_role', 'users',
+                    ['clan_id', 'role'], unique=False)
+    op.create_index('ix_users_county_role', 'users',
+                    ['county_id', 'role'], unique=False)
+
+    # notifications
+    op.create_index('ix_notifications_user_read_created', 'notifications',
+                    ['user_id', 'is_read', 'created_at'], unique=False)
+    op.create_index('ix_notifications_unread_user', 'notifications',
+                    ['user_id', 'created_at'], unique=False,
+                    postgresql_where=UNREAD_NOTIFICATION)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_unread_user', table_name='notifications')
+    op.drop_index('ix_notifications_user_read_created',
+                  table_name='notifications')
+    op.drop_index('ix_users_county_role', table_name='users')
+    op.drop_index('ix_users_clan_role', table_name='users')
+    op.drop_index('ix_reservations_groom_status', table_name='reservations')
+    op.drop_index('ix_reservations_active_clan_date2',
+                  table_name='reservations')
+    op.drop_index('ix_reservations_active_clan_date1',
+                  table_name='reservations')
+    op.drop_index('ix_reservations_county_clan_status_date1',
+                  table_name='reservations')
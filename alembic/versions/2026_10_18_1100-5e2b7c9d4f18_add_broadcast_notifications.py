@@ -0,0 +1,49 @@
+"""add broadcast notifications: one message row plus per-recipient read state
+
+Revision ID: 5e2b7c9d4f18
+Revises: c3a91f5e7d20
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b7c9d4f18'
+down_revision: Union[str, None] = 'c3a91f5e7d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('broadcast_notifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sender_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('is_groom', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['sender_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_broadcast_notifications_id'), 'broadcast_notifications', ['id'], unique=False)
+    op.create_table('broadcast_recipients',
+    sa.Column('broadcast_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('is_read', sa.Boolean(), nullable=False),
+    sa.Column('read_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['broadcast_id'], ['broadcast_notifications.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('broadcast_id', 'user_id')
+    )
+    op.create_index('ix_broadcast_recipients_user_read', 'broadcast_recipients', ['user_id', 'is_read'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_broadcast_recipients_user_read', table_name='broadcast_recipients')
+    op.drop_table('broadcast_recipients')
+    op.drop_index(op.f('ix_broadcast_notifications_id'), table_name='broadcast_notifications')
+    op.drop_table('broadcast_notifications')
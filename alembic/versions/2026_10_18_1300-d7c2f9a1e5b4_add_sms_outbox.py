@@ -0,0 +1,44 @@
+"""add sms outbox: queued outgoing SMS with delivery status and retries
+
+Revision ID: d7c2f9a1e5b4
+Revises: 8a4d1e6f2b93
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7c2f9a1e5b4'
+down_revision: Union[str, None] = '8a4d1e6f2b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sms_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('to_phone', sa.String(), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.Column('purpose', sa.String(length=32), nullable=True),
+    sa.Column('status', sa.Enum('queued', 'sending', 'sent', 'failed', name='smsstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('provider_id', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sms_outbox_id'), 'sms_outbox', ['id'], unique=False)
+    op.create_index('ix_sms_outbox_status_next_attempt', 'sms_outbox', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sms_outbox_status_next_attempt', table_name='sms_outbox')
+    op.drop_index(op.f('ix_sms_outbox_id'), table_name='sms_outbox')
+    op.drop_table('sms_outbox')
+    sa.Enum(name='smsstatus').drop(op.get_bind(), checkfirst=True)
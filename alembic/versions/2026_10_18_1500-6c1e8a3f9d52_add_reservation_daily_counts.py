@@ -0,0 +1,44 @@
+"""add reservation daily counts: rollup behind the statistics endpoints
+
+Revision ID: 6c1e8a3f9d52
+Revises: 2f6b8e4c1a97
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '6c1e8a3f9d52'
+down_revision: Union[str, None] = '2f6b8e4c1a97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('reservation_daily_counts',
+    sa.Column('county_id', sa.Integer(), nullable=False),
+    sa.Column('clan_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', postgresql.ENUM('pending_validation', 'validated', 'cancelled', name='reservationstatus', create_type=False), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['clan_id'], ['clans.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['county_id'], ['counties.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('county_id', 'clan_id', 'day', 'status')
+    )
+    op.create_index('ix_reservation_daily_counts_county_status_day', 'reservation_daily_counts', ['county_id', 'status', 'day'], unique=False)
+
+    # Backfill from the existing reservations
+    op.execute(
+        "INSERT INTO reservation_daily_counts (county_id, clan_id, day, status, count) "
+        "SELECT county_id, clan_id, date1, status, COUNT(*) FROM reservations "
+        "GROUP BY county_id, clan_id, date1, status"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservation_daily_counts_county_status_day', table_name='reservation_daily_counts')
+    op.drop_table('reservation_daily_counts')
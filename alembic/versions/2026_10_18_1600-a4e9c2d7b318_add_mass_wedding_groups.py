@@ -0,0 +1,54 @@
+"""add mass wedding groups: persisted groups joined with a versioned update
+
+Revision ID: a4e9c2d7b318
+Revises: 6c1e8a3f9d52
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e9c2d7b318'
+down_revision: Union[str, None] = '6c1e8a3f9d52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('mass_wedding_groups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('county_id', sa.Integer(), nullable=False),
+    sa.Column('clan_id', sa.Integer(), nullable=False),
+    sa.Column('date1', sa.Date(), nullable=False),
+    sa.Column('date2', sa.Date(), nullable=True),
+    sa.Column('leader_reservation_id', sa.Integer(), nullable=True),
+    sa.Column('member_count', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['clan_id'], ['clans.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['county_id'], ['counties.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['leader_reservation_id'], ['reservations.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_mass_wedding_groups_id'), 'mass_wedding_groups', ['id'], unique=False)
+    op.create_index('uq_mass_wedding_groups_clan_span', 'mass_wedding_groups',
+                    ['clan_id', 'date1', sa.text('coalesce(date2, date1)')], unique=True)
+
+    # Backfill from the existing non-cancelled mass-wedding reservations
+    op.execute(
+        "INSERT INTO mass_wedding_groups "
+        "(county_id, clan_id, date1, date2, leader_reservation_id, member_count, version, created_at) "
+        "SELECT MIN(county_id), clan_id, date1, date2, MIN(id), COUNT(*), 0, MIN(created_at) "
+        "FROM reservations "
+        "WHERE status != 'cancelled' AND (allow_others OR join_to_mass_wedding) "
+        "GROUP BY clan_id, date1, date2"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_mass_wedding_groups_clan_span', table_name='mass_wedding_groups')
+    op.drop_index(op.f('ix_mass_wedding_groups_id'), table_name='mass_wedding_groups')
+    op.drop_table('mass_wedding_groups')
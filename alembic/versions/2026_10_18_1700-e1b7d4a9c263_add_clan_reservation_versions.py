@@ -0,0 +1,30 @@
+"""add clan reservation versions: shared change counter behind the calendar ETag
+
+Revision ID: e1b7d4a9c263
+Revises: a4e9c2d7b318
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b7d4a9c263'
+down_revision: Union[str, None] = 'a4e9c2d7b318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('clan_reservation_versions',
+    sa.Column('clan_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['clan_id'], ['clans.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('clan_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('clan_reservation_versions')
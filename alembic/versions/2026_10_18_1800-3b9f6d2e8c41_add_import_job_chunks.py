@@ -0,0 +1,53 @@
+"""add import job chunks: per-chunk import report instead of one growing JSON
+
+Revision ID: 3b9f6d2e8c41
+Revises: e1b7d4a9c263
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9f6d2e8c41'
+down_revision: Union[str, None] = 'e1b7d4a9c263'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('import_job_chunks',
+    sa.Column('job_id', sa.String(length=32), nullable=False),
+    sa.Column('start_row', sa.Integer(), nullable=False),
+    sa.Column('details', postgresql.JSON(astext_type=sa.Text()), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['import_jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id', 'start_row')
+    )
+    # Existing reports become the first chunk of their job
+    op.execute("""
+        INSERT INTO import_job_chunks (job_id, start_row, details)
+        SELECT id, 0, details FROM import_jobs
+        WHERE json_array_length(details) > 0
+    """)
+    op.drop_column('import_jobs', 'details')
+
+
+def downgrade() -> None:
+    op.add_column('import_jobs', sa.Column(
+        'details', postgresql.JSON(astext_type=sa.Text()),
+        server_default=sa.text("'[]'::json"), nullable=False))
+    op.execute("""
+        UPDATE import_jobs SET details = chunks.details
+        FROM (
+            SELECT c.job_id, json_agg(line ORDER BY c.start_row, line_no) AS details
+            FROM import_job_chunks c,
+                 json_array_elements(c.details) WITH ORDINALITY AS lines(line, line_no)
+            GROUP BY c.job_id
+        ) AS chunks
+        WHERE import_jobs.id = chunks.job_id
+    """)
+    op.alter_column('import_jobs', 'details', server_default=None)
+    op.drop_table('import_job_chunks')
@@ -0,0 +1,81 @@
+"""add reservation day slots: per-day capacity counters, replacing mass wedding groups
+
+Revision ID: 7d3a5f1c9e62
+Revises: 3b9f6d2e8c41
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3a5f1c9e62'
+down_revision: Union[str, None] = '3b9f6d2e8c41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('reservation_day_slots',
+    sa.Column('clan_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('solo', sa.Integer(), nullable=False),
+    sa.Column('cross_clan', sa.Integer(), nullable=False),
+    sa.Column('same_clan_pending', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['clan_id'], ['clans.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('clan_id', 'day')
+    )
+
+    # Backfill from the existing non-cancelled reservations, one row per day
+    # they touch (date1 and date2)
+    op.execute("""
+        INSERT INTO reservation_day_slots (clan_id, day, total, solo, cross_clan, same_clan_pending)
+        SELECT r.clan_id, d.day,
+               COUNT(*),
+               COUNT(*) FILTER (WHERE NOT (r.allow_others OR r.join_to_mass_wedding)),
+               COUNT(*) FILTER (WHERE u.clan_id IS NOT NULL AND u.clan_id != r.clan_id),
+               COUNT(*) FILTER (WHERE u.clan_id = r.clan_id AND r.status = 'pending_validation')
+        FROM reservations r
+        LEFT JOIN users u ON u.id = r.groom_id
+        CROSS JOIN LATERAL (VALUES (r.date1), (r.date2)) AS d(day)
+        WHERE r.status != 'cancelled' AND d.day IS NOT NULL
+        GROUP BY r.clan_id, d.day
+    """)
+
+    op.drop_index('uq_mass_wedding_groups_clan_span', table_name='mass_wedding_groups')
+    op.drop_index(op.f('ix_mass_wedding_groups_id'), table_name='mass_wedding_groups')
+    op.drop_table('mass_wedding_groups')
+
+
+def downgrade() -> None:
+    op.create_table('mass_wedding_groups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('county_id', sa.Integer(), nullable=False),
+    sa.Column('clan_id', sa.Integer(), nullable=False),
+    sa.Column('date1', sa.Date(), nullable=False),
+    sa.Column('date2', sa.Date(), nullable=True),
+    sa.Column('leader_reservation_id', sa.Integer(), nullable=True),
+    sa.Column('member_count', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['clan_id'], ['clans.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['county_id'], ['counties.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['leader_reservation_id'], ['reservations.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_mass_wedding_groups_id'), 'mass_wedding_groups', ['id'], unique=False)
+    op.create_index('uq_mass_wedding_groups_clan_span', 'mass_wedding_groups',
+                    ['clan_id', 'date1', sa.text('coalesce(date2, date1)')], unique=True)
+    op.execute(
+        "INSERT INTO mass_wedding_groups "
+        "(county_id, clan_id, date1, date2, leader_reservation_id, member_count, version, created_at) "
+        "SELECT MIN(county_id), clan_id, date1, date2, MIN(id), COUNT(*), 0, MIN(created_at) "
+        "FROM reservations "
+        "WHERE status != 'cancelled' AND (allow_others OR join_to_mass_wedding) "
+        "GROUP BY clan_id, date1, date2"
+    )
+
+    op.drop_table('reservation_day_slots')
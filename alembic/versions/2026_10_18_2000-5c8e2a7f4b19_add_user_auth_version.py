@@ -0,0 +1,26 @@
+"""add users.auth_version: shared version of the columns the role guards read
+
+Revision ID: 5c8e2a7f4b19
+Revises: 7d3a5f1c9e62
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5c8e2a7f4b19'
+down_revision: Union[str, None] = '7d3a5f1c9e62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column(
+        'auth_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'auth_version')
@@ -0,0 +1,111 @@
+# benchmarks\docx_fill.py
+"""
+Per-document fill time of the wedding request DOCX template: the historical
+fill (re-open the file, every paragraph x every key) against the cached
+template with one substitution pass per placeholder paragraph.
+
+    python -m benchmarks.docx_fill --repeat 50
+
+Both fills must produce the same document.xml; the script checks it before
+timing anything. LibreOffice is not involved.
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+import zipfile
+
+# server.db builds its engine at import time; pdf_generator imports the models
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from docx import Document  # noqa: E402
+
+from server.utils.pdf_generator import fill_docx_template, find_template_path  # noqa: E402
+
+CONTEXT = {
+    "COUNTY": "غرداية",
+    "ORIGIN_CLAN": "آل مسعود",
+    "RESERVED_CLAN": "بني يسقن",
+    "groom_NAME": "محمد",
+    "last_name": "بن عمر",
+    "wakil_full_NAME": "عبد الله بن عمر",
+    "wakil_phone": "0661000000",
+    "GUARDIAN_NAME": "عمر",
+    "father_name": "عمر",
+    "guardian_birth_date": "1970-01-01",
+    "guardian_birth_address": "غرداية",
+    "guardian_home_address": "غرداية",
+    "grandfather_name": "صالح",
+    "birth_date": "2000-01-01",
+    "birth_address": "غرداية",
+    "home_address": "غرداية",
+    "phone_number": "0662000000",
+    "WEDDING_DATES": "2026-07-01 - 2026-07-02",
+    "haia_committee_id": "................",
+    "madaeh_committee_id": "................",
+    "GUARDIAN_phone": "0663000000",
+    "created_at": "2026-01-01",
+}
+
+
+def legacy_fill(template_path: str, output, context: dict):
+    """fill_docx_template before the template cache, kept for comparison"""
+    def replace_placeholder_in_runs(runs, key, value):
+        placeholder = f"{{{{{key}}}}}"
+        full_text = "".join(run.text for run in runs)
+        if placeholder in full_text:
+            full_text = full_text.replace(placeholder, str(value or ""))
+            for run in runs:
+                run.text = ""
+            runs[0].text = full_text
+
+    doc = Document(template_path)
+    for p in doc.paragraphs:
+        for key, value in context.items():
+            replace_placeholder_in_runs(p.runs, key, value)
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                for p in cell.paragraphs:
+                    for key, value in context.items():
+                        replace_placeholder_in_runs(p.runs, key, value)
+    doc.save(output)
+
+
+def document_xml(fill, template_path: str) -> bytes:
+    buffer = io.BytesIO()
+    fill(template_path, buffer, CONTEXT)
+    with zipfile.ZipFile(buffer) as archive:
+        return archive.read("word/document.xml")
+
+
+def time_fill(fill, template_path: str, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fill(template_path, io.BytesIO(), CONTEXT)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    template_path = find_template_path()
+    if document_xml(legacy_fill, template_path) != document_xml(fill_docx_template, template_path):
+        print("Fills differ: the cached template does not reproduce the legacy output")
+        return 1
+
+    for name, fill in (("legacy", legacy_fill), ("cached", fill_docx_template)):
+        timings = time_fill(fill, template_path, args.repeat)
+        print(f"{name:>7}: median {statistics.median(timings):8.2f} ms"
+              f"   min {min(timings):8.2f} ms   max {max(timings):8.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+# benchmarks\serialization.py
+"""
+Response time of large list payloads: FastAPI's default path (handler builds
+the models, response_model validates them again, stdlib JSONResponse) against
+ListSerializer (validate once, pydantic-core dumps the JSON) and the orjson
+default response class for plain read-model dicts.
+
+    python -m benchmarks.serialization --rows 1000 10000 --repeat 10
+
+Every pair of routes is called through the ASGI app with the same data, and
+the decoded bodies must be equal before anything is timed. No database is
+needed: rows are built in memory.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import List
+
+# server.db builds its engine at import time; the schemas import the models
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from server.models.notification import NotificationType  # noqa: E402
+from server.schemas.notification import NotificationOut  # noqa: E402
+from server.schemas.reservation import ReservationOut  # noqa: E402
+from server.utils.serialization import FastJSONResponse, ListSerializer  # noqa: E402
+
+notification_list = ListSerializer(NotificationOut)
+reservation_list = ListSerializer(ReservationOut)
+
+
+def notification_rows(count: int) -> List[dict]:
+    created = datetime(2026, 10, 1, 8, 30)
+    return [{
+        "id": i,
+        "user_id": 7,
+        "reservation_id": i // 3 or None,
+        "notification_type": NotificationType.new_reservation,
+        "title": "حجز جديد",
+        "message": f"قام العريس رقم {i} بحجز جديد في العشيرة",
+        "is_read": i % 4 == 0,
+        "is_groom": False,
+        "created_at": created - timedelta(minutes=i),
+        "read_at": None,
+    } for i in range(count)]
+
+
+def reservation_objects(count: int) -> list:
+    """Stand-ins for ORM rows (read with from_attributes, like the routes)"""
+    return [SimpleNamespace(
+        id=i, groom_id=1000 + i, clan_id=3, hall_id=None, county_id=1,
+        date1=date(2026, 6, 1) + timedelta(days=i % 120), date2=None, date2_bool=False,
+        join_to_mass_wedding=bool(i % 2), allow_others=False,
+        status="validated", payment_status="not_paid", payment=Decimal("1500.00"),
+        created_at=datetime(2026, 1, 1, 12, 0), haia_committee_id=2,
+        madaeh_committee_id=None, custom_madaeh_committee_name=None, tilawa_type=None,
+        first_name="محمد", last_name="بن أحمد", guardian_name="أحمد", father_name="أحمد",
+        grandfather_name="علي", birth_date=date(2000, 5, 17), birth_address="غرداية",
+        home_address="حي 5 جويلية", phone_number="0661000000", guardian_phone="0770000000",
+        pdf_url=None, message=None, reservation_id=None,
+    ) for i in range(count)]
+
+
+def read_model_rows(count: int) -> List[dict]:
+    """Plain dicts as produced by utils.reservation_views"""
+    return [{
+        "id": i, "groom_id": 1000 + i, "clan_id": 3, "county_id": 1,
+        "date1": str(date(2026, 6, 1) + timedelta(days=i % 120)), "date2": None,
+        "status": "validated", "payment_valid": "not_paid",
+        "created_at": datetime(2026, 1, 1, 12, 0).isoformat(),
+        "clan_name": "آل مسعود", "county_name": "غرداية", "hall_name": None,
+        "first_name": "محمد", "last_name": "بن أحمد", "phone_number": "0661000000",
+        "guardian_name": "أحمد", "guardian_birth_date": None,
+    } for i in range(count)]
+
+
+def build_app(rows: int) -> FastAPI:
+    notifications = notification_rows(rows)
+    reservations = reservation_objects(rows)
+    dicts = read_model_rows(rows)
+    app = FastAPI()
+
+    @app.get("/notifications/legacy", response_model=List[NotificationOut])
+    def notifications_legacy():
+        return [NotificationOut(**n, user_first_name="a", user_last_name="b",
+                                user_phone_number="0661000000") for n in notifications]
+
+    @app.get("/notifications/fast", response_model=List[NotificationOut])
+    def notifications_fast():
+        return notification_list.response(
+            [NotificationOut(**n, user_first_name="a", user_last_name="b",
+                             user_phone_number="0661000000") for n in notifications])
+
+    @app.get("/reservations/legacy", response_model=List[ReservationOut])
+    def reservations_legacy():
+        return reservations
+
+    @app.get("/reservations/fast", response_model=List[ReservationOut])
+    def reservations_fast():
+        return reservation_list.response(reservations, from_attributes=True)
+
+    @app.get("/read_model/legacy")
+    def read_model_legacy():
+        return JSONResponse(dicts)
+
+    @app.get("/read_model/fast")
+    def read_model_fast():
+        return FastJSONResponse(dicts)
+
+    return app
+
+
+def time_get(client: TestClient, url: str, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        client.get(url).raise_for_status()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        client = TestClient(build_app(rows))
+        print(f"--- {rows} rows")
+        for name in ("notifications", "reservations", "read_model"):
+            legacy, fast = client.get(f"/{name}/legacy"), client.get(f"/{name}/fast")
+            if legacy.json() != fast.json():
+                print(f"{name}: bodies differ")
+                return 1
+            medians = {}
+            for variant in ("legacy", "fast"):
+                timings = time_get(client, f"/{name}/{variant}", args.repeat)
+                medians[variant] = statistics.median(timings)
+                print(f"{name:>13} {variant:>6}: median {medians[variant]:8.2f} ms"
+                      f"   min {min(timings):8.2f} ms   max {max(timings):8.2f} ms")
+            print(f"{name:>13} speedup: {medians['legacy'] / medians['fast']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,7 +6,7 @@ import string
 import secrets
 import os
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from fastapi import Body, Depends, HTTPException, status
@@ -17,6 +17,7 @@ import hashlib
 
 from .db import SessionLocal
 from .models.user import User, UserRole
+from .utils.principal_cache import Principal, principal_cache
 
 load_dotenv()
 
@@ -128,22 +129,15 @@ def authenticate_user(db: Session, phone_number: str, password: str) -> Optional
     return user
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
+def _decode_token(token: str) -> Tuple[int, Optional[int]]:
     """
-    Get current user from JWT token
-
-    Args:
-        db: Database session
-        token: JWT token from Authorization header
+    Decode and validate a JWT access token
 
     Returns:
-        User object
+        (user_id, iat) tuple; iat is None for tokens issued without it
 
     Raises:
-        HTTPException: If token is invalid or user not found
+        HTTPException: If the token is invalid or misses the required claims
     """
     # Only log in development
     is_production = os.getenv("ENVIRONMENT") == "production"
@@ -196,6 +190,28 @@ def get_current_user(
             print(f"❌ JWT Error: {e}")
         raise credentials_exception
 
+    return user_id, payload.get("iat")
+
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    """
+    Get current user from JWT token
+
+    Args:
+        db: Database session
+        token: JWT token from Authorization header
+
+    Returns:
+        User object
+
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    user_id, iat = _decode_token(token)
+
     # Query user from database
     user = db.query(User).filter(User.id == user_id).first()
 
@@ -206,9 +222,53 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Refresh the snapshot used by the principal-only guards
+    principal_cache.put(iat, Principal.from_user(user))
+
     return user
 
 
+def get_current_principal(token: str = Depends(oauth2_scheme)) -> Principal:
+    """
+    Get a cached snapshot of the current user from JWT token
+
+    Unlike get_current_user no session is opened on a cache hit. Use it for
+    routes that only need the role / clan / county of the caller. Snapshots
+    are checked against users.auth_version, see utils.principal_cache.
+
+    Args:
+        token: JWT token from Authorization header
+
+    Returns:
+        Principal snapshot
+
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    user_id, iat = _decode_token(token)
+
+    principal_cache.revalidate_if_due()
+    principal = principal_cache.get(user_id, iat)
+    if principal is not None:
+        return principal
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        principal = Principal.from_user(user)
+    finally:
+        db.close()
+
+    principal_cache.put(iat, principal)
+    return principal
+
+
 def require_role(required_roles: List[UserRole]):
     """
     Dependency factory for role-based access control
@@ -245,6 +305,32 @@ def require_role(required_roles: List[UserRole]):
     return _require_role
 
 
+def require_principal_role(required_roles: List[UserRole]):
+    """
+    Same checks as require_role, on the cached principal instead of a User row.
+
+    Returns:
+        Dependency function returning the Principal of the caller
+    """
+    def _require_principal_role(principal: Principal = Depends(get_current_principal)) -> Principal:
+        if principal.role not in required_roles:
+            role_names = ', '.join([r.value for r in required_roles])
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Insufficient permissions. Required roles: {role_names}"
+            )
+
+        if not principal.phone_verified:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Phone number not verified. Please verify your phone to access this resource."
+            )
+
+        return principal
+
+    return _require_principal_role
+
+
 def phone_verified_required(current_user: User = Depends(get_current_user)) -> User:
     """
     Dependency to check if user's phone is verified
@@ -4,7 +4,7 @@ FastAPI app entry point with Railway Volume support and local development databa
 import os
 from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import re
@@ -12,7 +12,13 @@ from sqlalchemy import text
 
 from server.routes import pdf_route
 
-from .auth_utils import get_password_hash
+from .utils.password_service import password_service
+from .utils.pdf_worker import pdf_worker_pool
+from .utils.import_jobs import import_job_runner
+from .utils.sms_outbox import sms_outbox
+from .utils.query_stats import install_query_stats
+from .utils import metrics
+from .utils.serialization import FastJSONResponse
 from .db import engine, Base, SessionLocal
 
 # Import models
@@ -27,6 +33,12 @@ from .models.committee import HaiaCommittee, MadaehCommittee
 from .models.reservation import Reservation, ReservationStatus
 from .models.reservation_clan_admin import ReservationSpecial, ReservationSpecialStatus
 from .models.notification import Notification, NotificationType
+from .models.import_job import ImportJob, ImportJobChunk
+from .models.sms_message import SmsMessage
+from .models.rate_limit import RateLimitBucket
+from .models.reservation_daily_count import ReservationDailyCount
+from .models.reservation_day_slot import ReservationDaySlot
+from .models.clan_reservation_version import ClanReservationVersion
 
 
 # Import routes
@@ -39,6 +51,8 @@ from .routes import (
     food_route,
     public_routes,
     admin_utils,
+    diagnostics,
+    dashboard,
     pdf_route,
     notification
 )
@@ -178,7 +192,7 @@ def ensure_super_admin_exists():
             print(f"✅ Super admin already exists: {SUPER_ADMIN_PHONE}")
             # Optionally update password if it changed
             if os.getenv("RESET_SUPER_ADMIN_PASSWORD") == "true":
-                super_admin.password_hash = get_password_hash(
+                super_admin.password_hash = password_service.hash_sync(
                     SUPER_ADMIN_PASSWORD)
                 db.commit()
                 print("🔄 Super admin password updated")
@@ -215,7 +229,7 @@ def ensure_super_admin_exists():
         print(f"👤 Creating super admin: {SUPER_ADMIN_PHONE}")
         super_admin = User(
             phone_number=SUPER_ADMIN_PHONE,
-            password_hash=get_password_hash(SUPER_ADMIN_PASSWORD),
+            password_hash=password_service.hash_sync(SUPER_ADMIN_PASSWORD),
             role=UserRole.super_admin,
             phone_verified=True,
             first_name="Super",
@@ -270,7 +284,7 @@ def seed_initial_data():
 
         super_admin = User(
             phone_number=os.getenv("SUPER_ADMIN_PHONE"),
-            password_hash=get_password_hash(
+            password_hash=password_service.hash_sync(
                 os.getenv("SUPER_ADMIN_PASSWORD")),
             role=UserRole.super_admin,
             phone_verified=True,
@@ -353,6 +367,14 @@ async def lifespan(app: FastAPI):
         print("\n👤 Checking super admin...")
         ensure_super_admin_exists()
 
+        # Resume bulk imports interrupted by the previous shutdown
+        import_job_runner.start()
+        # Send SMS still queued from before the restart
+        sms_outbox.start()
+        if not pdf_worker_pool.stats()["uno_available"]:
+            print("⚠️ WARNING: python3-uno is not importable, PDF workers fall back "
+                  "to one `soffice --convert-to` process per document")
+
         print("\n" + "=" * 60)
         print("✅ Application ready!")
         print(f"🌍 Environment: {ENVIRONMENT}")
@@ -379,6 +401,11 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     print("\n Shutting down...")
+    password_service.shutdown()
+    pdf_worker_pool.shutdown()
+    import_job_runner.shutdown()
+    sms_outbox.shutdown()
+    metrics.mark_process_dead()
 
 
 app = FastAPI(
@@ -386,6 +413,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs" if not IS_PRODUCTION else None,
     redoc_url="/redoc" if not IS_PRODUCTION else None,
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
@@ -399,6 +427,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Statement counts per request: Server-Timing header and /admin/diagnostics/queries
+install_query_stats(app, engine)
+# Latency histograms, in-flight gauges and pool wait for /metrics
+metrics.install_metrics(app, engine)
+
 
 @app.get("/")
 async def root():
@@ -439,12 +472,22 @@ async def health_check():
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics(authorization: str = Header(None)):
+    """Prometheus text format, merged across the worker processes"""
+    if metrics.METRICS_TOKEN and authorization != f"Bearer {metrics.METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE_LATEST)
+
+
 # Register routers
 app.include_router(admin_utils.router)
+app.include_router(diagnostics.router)
 app.include_router(auth.router)
 app.include_router(super_admin.router)
 app.include_router(clan_admin.router)
 app.include_router(reservations.router)
+app.include_router(dashboard.router)
 app.include_router(grooms.router)
 app.include_router(food_route.router)
 app.include_router(public_routes.router)
@@ -0,0 +1,17 @@
+"""
+Clan reservation version: bumped with every change to a clan's reservations,
+kept by server/utils/clan_versions.py. Shared by every worker process.
+Path: server/models/clan_reservation_version.py
+"""
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer
+
+from ..db import Base
+
+
+class ClanReservationVersion(Base):
+    __tablename__ = "clan_reservation_versions"
+
+    clan_id = Column(Integer, ForeignKey(
+        "clans.id", ondelete="CASCADE"), primary_key=True)
+    # A missing row reads as version 0
+    version = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,67 @@
+"""
+Import job models: a bulk groom import (Excel upload) processed in the
+background, chunk by chunk, and the per-row report of each chunk.
+Path: server/models/import_job.py
+"""
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Index, LargeBinary, Text
+from sqlalchemy.dialects.postgresql import JSON
+from datetime import datetime
+import enum
+
+from ..db import Base
+
+
+class ImportJobStatus(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+    __table_args__ = (
+        # Workers pick the oldest queued (or abandoned running) job
+        Index("ix_import_jobs_status_created", "status", "created_at"),
+    )
+
+    id = Column(String(32), primary_key=True)
+
+    # Clan admin who uploaded the file
+    created_by = Column(Integer, ForeignKey(
+        "users.id", ondelete="SET NULL"), nullable=True)
+    county_id = Column(Integer, nullable=False)
+
+    filename = Column(String, nullable=True)
+    # The uploaded sheet, dropped once the job is finished
+    contents = Column(LargeBinary, nullable=True)
+
+    status = Column(Enum(ImportJobStatus),
+                    default=ImportJobStatus.queued, nullable=False)
+    # Worker currently holding the job; a chunk only commits under its owner
+    worker_id = Column(String(32), nullable=True)
+
+    # Progress: rows before processed_rows are committed
+    total_rows = Column(Integer, default=0, nullable=False)
+    processed_rows = Column(Integer, default=0, nullable=False)
+    successful = Column(Integer, default=0, nullable=False)
+    skipped = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    # Touched after every chunk; a running job idle for too long is resumed
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class ImportJobChunk(Base):
+    """Report lines of one committed chunk; a job's report is its chunks in order"""
+    __tablename__ = "import_job_chunks"
+
+    job_id = Column(String(32), ForeignKey(
+        "import_jobs.id", ondelete="CASCADE"), primary_key=True)
+    # Sheet row the chunk starts at
+    start_row = Column(Integer, primary_key=True)
+    details = Column(JSON, nullable=False, default=list)
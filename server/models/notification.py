@@ -1,8 +1,10 @@
 """
 Notification model: Stores notifications for clan admins about new reservations.
+Broadcasts (one message sent to many users) store the message once, with one
+compact read-state row per recipient.
 Path: server/models/notification.py
 """
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Enum, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Enum, Index, Text, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -17,8 +19,20 @@ class NotificationType(str, enum.Enum):
     general_notification = "general_notification"  # new column
 
 
+UNREAD_NOTIFICATION = text("is_read = false")
+
+
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Notification list of a user, newest first, optionally unread only
+        Index("ix_notifications_user_read_created",
+              "user_id", "is_read", "created_at"),
+        # Unread counters / badges
+        Index("ix_notifications_unread_user", "user_id", "created_at",
+              postgresql_where=UNREAD_NOTIFICATION,
+              sqlite_where=UNREAD_NOTIFICATION),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
 
@@ -54,3 +68,43 @@ class Notification(Base):
         """Mark notification as read"""
         self.is_read = True
         self.read_at = datetime.utcnow()
+
+
+class BroadcastNotification(Base):
+    """A general notification sent to many users, stored once"""
+    __tablename__ = "broadcast_notifications"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Admin who sent it
+    sender_id = Column(Integer, ForeignKey(
+        "users.id", ondelete="SET NULL"), nullable=True)
+
+    title = Column(String, nullable=False)
+    message = Column(Text, nullable=False)
+    is_groom = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    recipients = relationship(
+        "BroadcastRecipient", back_populates="broadcast",
+        cascade="all, delete-orphan", passive_deletes=True, lazy="select")
+
+
+class BroadcastRecipient(Base):
+    """Read state of a broadcast for one recipient"""
+    __tablename__ = "broadcast_recipients"
+    __table_args__ = (
+        # Inbox of a user (the primary key serves lookups by broadcast)
+        Index("ix_broadcast_recipients_user_read", "user_id", "is_read"),
+    )
+
+    broadcast_id = Column(Integer, ForeignKey(
+        "broadcast_notifications.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey(
+        "users.id", ondelete="CASCADE"), primary_key=True)
+
+    is_read = Column(Boolean, default=False, nullable=False)
+    read_at = Column(DateTime, nullable=True)
+
+    broadcast = relationship(
+        "BroadcastNotification", back_populates="recipients", lazy="select")
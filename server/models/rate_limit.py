@@ -0,0 +1,19 @@
+"""
+Rate limit model: one token bucket per (limiter, key), shared by every
+worker process.
+Path: server/models/rate_limit.py
+"""
+from sqlalchemy import Column, String, Float, DateTime
+
+from ..db import Base
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    # "<limiter name>:<key>", e.g. "otp_sms:+213661234567"
+    key = Column(String(255), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    # When the bucket is full again; past this the row carries no state
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -2,8 +2,8 @@
 """
 Reservation model: Each reservation is for a groom, in a clan, for 1 or 2 consecutive days.
 """
-from sqlalchemy import Column, Integer, Date, Boolean, ForeignKey, Null, Numeric, String, Enum, DateTime, null, true
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, Date, Boolean, ForeignKey, Index, Null, Numeric, String, Enum, DateTime, null, text, true
+from sqlalchemy.orm import column_property, relationship
 from datetime import datetime
 import enum
 
@@ -23,24 +23,54 @@ class PaymentStatus(str, enum.Enum):
     partially_paid = "partially_paid"
 
 
+# Partial index predicates, shared by postgres and sqlite
+ACTIVE_RESERVATION = text("status != 'cancelled'")
+ACTIVE_RESERVATION_DATE2 = text("status != 'cancelled' AND date2 IS NOT NULL")
+
+
 class Reservation(Base):
     __tablename__ = "reservations"
+    __table_args__ = (
+        # Status listings of a clan admin and the statistics endpoints
+        Index("ix_reservations_county_clan_status_date1",
+              "county_id", "clan_id", "status", "date1"),
+        # Conflict checks / calendar: non-cancelled reservations by clan and day
+        Index("ix_reservations_active_clan_date1", "clan_id", "date1",
+              postgresql_where=ACTIVE_RESERVATION,
+              sqlite_where=ACTIVE_RESERVATION),
+        Index("ix_reservations_active_clan_date2", "clan_id", "date2",
+              postgresql_where=ACTIVE_RESERVATION_DATE2,
+              sqlite_where=ACTIVE_RESERVATION_DATE2),
+        # "my reservations" lookups of a groom
+        Index("ix_reservations_groom_status", "groom_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     groom_id = Column(Integer, ForeignKey(
         "users.id", ondelete="SET NULL"), nullable=True)
 
-    clan_id = Column(Integer, ForeignKey("clans.id"), nullable=False)
-    county_id = Column(Integer, ForeignKey("counties.id"), nullable=False)
+    # active_history: the old value is loaded even when the instance was
+    # expired (e.g. changed after a commit), so the before_flush hooks of
+    # utils.reservation_stats / day_slots / clan_versions always
+    # see what is in the database
+    clan_id = column_property(
+        Column(Integer, ForeignKey("clans.id"), nullable=False), active_history=True)
+    county_id = column_property(
+        Column(Integer, ForeignKey("counties.id"), nullable=False), active_history=True)
 
-    date1 = Column(Date, nullable=False)
-    date2 = Column(Date, default=None, nullable=True)
+    date1 = column_property(Column(Date, nullable=False), active_history=True)
+    date2 = column_property(
+        Column(Date, default=None, nullable=True), active_history=True)
     date2_bool = Column(Boolean, default=False, nullable=True)
 
-    allow_others = Column(Boolean, default=False, nullable=False)
-    join_to_mass_wedding = Column(Boolean, default=False, nullable=False)
-    status = Column(Enum(ReservationStatus),
-                    default=ReservationStatus.pending_validation, nullable=False)
+    allow_others = column_property(
+        Column(Boolean, default=False, nullable=False), active_history=True)
+    join_to_mass_wedding = column_property(
+        Column(Boolean, default=False, nullable=False), active_history=True)
+    status = column_property(
+        Column(Enum(ReservationStatus),
+               default=ReservationStatus.pending_validation, nullable=False),
+        active_history=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     # payment_valid = Column(Boolean, default=False, nullable=True)  # added new
     # UPDATED: Changed from payment_valid (Boolean) to payment_status (Enum)
@@ -0,0 +1,27 @@
+"""
+Reservation rollup: number of reservations per (county, clan, date1, status),
+kept in step with the reservations table by server/utils/reservation_stats.py.
+Path: server/models/reservation_daily_count.py
+"""
+from sqlalchemy import Column, Date, Enum, ForeignKey, Index, Integer
+
+from ..db import Base
+from .reservation import ReservationStatus
+
+
+class ReservationDailyCount(Base):
+    __tablename__ = "reservation_daily_counts"
+    __table_args__ = (
+        # County dashboards: one status over a date range, all clans
+        Index("ix_reservation_daily_counts_county_status_day",
+              "county_id", "status", "day"),
+    )
+
+    county_id = Column(Integer, ForeignKey(
+        "counties.id", ondelete="CASCADE"), primary_key=True)
+    clan_id = Column(Integer, ForeignKey(
+        "clans.id", ondelete="CASCADE"), primary_key=True)
+    # Reservation.date1
+    day = Column(Date, primary_key=True)
+    status = Column(Enum(ReservationStatus), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,26 @@
+"""
+Reservation day slot: counters of the non-cancelled reservations touching one
+day of one clan, kept by server/utils/day_slots.py. New reservations claim
+their days with a conditional update of these rows.
+Path: server/models/reservation_day_slot.py
+"""
+from sqlalchemy import Column, Date, ForeignKey, Integer
+
+from ..db import Base
+
+
+class ReservationDaySlot(Base):
+    __tablename__ = "reservation_day_slots"
+
+    clan_id = Column(Integer, ForeignKey(
+        "clans.id", ondelete="CASCADE"), primary_key=True)
+    # date1 or date2 of the reservations counted
+    day = Column(Date, primary_key=True)
+
+    total = Column(Integer, nullable=False, default=0)
+    # Reservations that are not mass weddings
+    solo = Column(Integer, nullable=False, default=0)
+    # Grooms of another clan
+    cross_clan = Column(Integer, nullable=False, default=0)
+    # Pending reservations of the clan's own grooms (they have priority)
+    same_clan_pending = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,43 @@
+"""
+SMS outbox model: every outgoing SMS is stored here first and sent by the
+outbox worker, which records the delivery status and retries.
+Path: server/models/sms_message.py
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Enum, Index, Text
+from datetime import datetime
+import enum
+
+from ..db import Base
+
+
+class SmsStatus(str, enum.Enum):
+    queued = "queued"
+    sending = "sending"
+    sent = "sent"
+    failed = "failed"
+
+
+class SmsMessage(Base):
+    __tablename__ = "sms_outbox"
+    __table_args__ = (
+        # The worker picks due messages in order
+        Index("ix_sms_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # E.164 number (+213...)
+    to_phone = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    # What the message is for (otp, ...), for stats and support
+    purpose = Column(String(32), nullable=True)
+
+    status = Column(Enum(SmsStatus), default=SmsStatus.queued, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(Text, nullable=True)
+    # Message id given by the provider
+    provider_id = Column(String, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
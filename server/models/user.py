@@ -2,7 +2,7 @@
 User model: Super Admin, Clan Admin, Groom.
 """
 from datetime import datetime
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, Date, ForeignKey, Enum
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, Date, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 import enum
 
@@ -22,6 +22,11 @@ class UserStatus(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Grooms / admins of a clan or county
+        Index("ix_users_clan_role", "clan_id", "role"),
+        Index("ix_users_county_role", "county_id", "role"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     phone_number = Column(String, unique=True, index=True, nullable=False)
@@ -85,6 +90,10 @@ class User(Base):
 
     sms_to_groom_phone = Column(Boolean, default=False, nullable=False)
 
+    # Bumped with role / status / clan / county / phone_verified, see
+    # utils.principal_cache
+    auth_version = Column(Integer, default=0, server_default="0", nullable=False)
+
     # Relationships
     reservations = relationship(
         "Reservation", back_populates="groom", lazy="select",     cascade="all")
@@ -4,7 +4,11 @@ from pydantic import BaseModel
 
 from ..db import get_db
 from ..models.user import User, UserRole
-from ..auth_utils import get_password_hash, get_current_user
+from ..auth_utils import get_current_principal, require_principal_role
+from ..utils.password_service import password_service
+from ..utils.principal_cache import Principal
+from ..utils.pdf_worker import pdf_worker_pool
+from ..utils.sms_outbox import sms_outbox
 
 router = APIRouter(prefix="/admin_util", tags=["Admin Utils"])
 
@@ -18,7 +22,7 @@ class PasswordResetRequest(BaseModel):
 async def reset_superadmin_password(
     request: PasswordResetRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Reset super admin password - Only accessible by super admins
@@ -39,10 +43,34 @@ async def reset_superadmin_password(
             status_code=403, detail="Can only reset super admin passwords")
 
     # Update password
-    user.password_hash = get_password_hash(request.new_password)
+    user.password_hash = await password_service.hash(request.new_password)
     db.commit()
 
     return {
         "message": "Super admin password reset successfully",
         "phone_number": request.phone_number
     }
+
+
+@router.get("/password-pool", dependencies=[Depends(require_principal_role([UserRole.super_admin]))])
+def get_password_pool_stats():
+    """
+    Counters of the bcrypt pool (calls, rejections, queue wait) - super admins only
+    """
+    return password_service.stats()
+
+
+@router.get("/pdf-pool", dependencies=[Depends(require_principal_role([UserRole.super_admin]))])
+def get_pdf_pool_stats():
+    """
+    Queue depth and job counts of the PDF workers - super admins only
+    """
+    return pdf_worker_pool.stats()
+
+
+@router.get("/sms-outbox", dependencies=[Depends(require_principal_role([UserRole.super_admin]))])
+def get_sms_outbox_stats():
+    """
+    SMS transport in use and message counts by delivery status - super admins only
+    """
+    return sms_outbox.stats()
@@ -7,12 +7,14 @@ from server.schemas.user import AccessPasswordCreate, AccessPasswordResponse
 from server.auth_utils import generate_access_password, hash_access_password
 from datetime import datetime
 import logging
-from typing import List
+from typing import List, Union
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from httpx import HTTPStatusError, delete
 from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from sqlalchemy.orm import joinedload
+from starlette.background import BackgroundTask
 
 from server.CRUD import clan_rules_crud
 from server.models.reservation import PaymentStatus, Reservation, ReservationStatus
@@ -23,10 +25,15 @@ from server.schemas.haia_committe import HaiaCreate, HaiaOut, HaiaUpdate
 from server.schemas.madaih_committe import MadaihCreate, MadaihOut, MadaihUpdate
 from server.routes.reservations import create_reservation
 from server.schemas.reservation import ReservationCreate, ReservationsPaymentUpdate
+from server.schemas.pagination import CursorPage
 from server.schemas.reservations_special import ReservationSpecialCreate, ReservationSpecialOut
 from server.CRUD.clan_rules_crud import update
+from server.utils.groom_export import XLSX_MEDIA_TYPE, write_grooms_xlsx
+from server.utils.pagination import PageParams, page_response, paginate
+from server.utils.principal_cache import Principal
+from server.utils.serialization import ListSerializer
 from server.routes.auth import clan_admin_required
-from ..auth_utils import get_current_user, get_db, require_role
+from ..auth_utils import get_current_principal, get_db, require_principal_role
 from ..models.user import User, UserRole, UserStatus
 from ..models.hall import Hall
 from ..models.clan import Clan
@@ -42,11 +49,13 @@ router = APIRouter(
     tags=["clan-admin"]
 )
 
-clan_admin_required = require_role([UserRole.clan_admin])
+clan_admin_required = require_principal_role([UserRole.clan_admin])
+
+user_list = ListSerializer(UserOut)
 
 
 @router.get("/clan_info", response_model=ClanOut)
-def get_clan_info(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+def get_clan_info(db: Session = Depends(get_db), current: Principal = Depends(get_current_principal)):
     clan = db.query(Clan).filter(Clan.id == current.clan_id).first()
     if not clan:
         raise HTTPException(status_code=404, detail="العشيرة غير موجودة")
@@ -170,12 +179,30 @@ async def get_groom_status(
 ###
 
 
-@router.get("/grooms", response_model=list[UserOut], dependencies=[Depends(clan_admin_required)])
-def list_grooms(db: Session = Depends(get_db), current: User = Depends(clan_admin_required)):
-    return db.query(User).filter(
+@router.get("/grooms", response_model=Union[list[UserOut], CursorPage[UserOut]], dependencies=[Depends(clan_admin_required)])
+def list_grooms(db: Session = Depends(get_db), current: Principal = Depends(clan_admin_required),
+                page: PageParams = Depends()):
+    grooms, next_cursor = paginate(db.query(User).filter(
         User.role == UserRole.groom,
         User.clan_id == current.clan_id
-    ).all()
+    ), User.created_at, User.id, page)
+    return user_list.page_response(grooms, next_cursor, page, from_attributes=True)
+
+
+@router.get("/export.xlsx", dependencies=[Depends(clan_admin_required)])
+def export_grooms_xlsx(current: Principal = Depends(clan_admin_required)):
+    """
+    Grooms and their reservations as an Excel sheet in the bulk-import
+    layout (same Arabic headers), built from a server-side cursor.
+    """
+    output = write_grooms_xlsx(current.clan_id)
+    filename = f"grooms_clan_{current.clan_id}_{datetime.now().date()}.xlsx"
+    return StreamingResponse(
+        iter(lambda: output.read(64 * 1024), b""),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        background=BackgroundTask(output.close)
+    )
 
 
 # @router.delete("/grooms_deleted/{groom_phone}", response_model=UserOut, dependencies=[Depends(clan_admin_required)])
@@ -196,7 +223,7 @@ def list_grooms(db: Session = Depends(get_db), current: User = Depends(clan_admi
 
 
 @router.delete("/grooms_deleted/{groom_phone}", dependencies=[Depends(clan_admin_required)])
-def deleted_groom(groom_phone: str, db: Session = Depends(get_db), current: User = Depends(clan_admin_required)):
+def deleted_groom(groom_phone: str, db: Session = Depends(get_db), current: Principal = Depends(clan_admin_required)):
     groom = db.query(User).filter(
         User.phone_number == groom_phone,
         User.role == UserRole.groom,
@@ -234,10 +261,10 @@ def deleted_groom(groom_phone: str, db: Session = Depends(get_db), current: User
 
 # get status of the clan admin account
 
-@router.get("/admin-status", dependencies=[Depends(get_current_user)])
+@router.get("/admin-status", dependencies=[Depends(get_current_principal)])
 async def check_clan_admin_status(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Check if a clan has an active admin account.
@@ -285,7 +312,7 @@ async def check_clan_admin_status(
 
 # post new hall
 @router.post("/halls", response_model=HallOut, dependencies=[Depends(clan_admin_required)])
-def create_hall(hall: HallCreate, db: Session = Depends(get_db), current: User = Depends(clan_admin_required)):
+def create_hall(hall: HallCreate, db: Session = Depends(get_db), current: Principal = Depends(clan_admin_required)):
     # Ensure hall is for clan admin's clan
     if hall.clan_id != current.clan_id:
         raise HTTPException(
@@ -306,7 +333,7 @@ def create_hall(hall: HallCreate, db: Session = Depends(get_db), current: User =
 
 
 @router.get("/halls", response_model=list[HallOut])
-def list_halls(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+def list_halls(db: Session = Depends(get_db), current: Principal = Depends(get_current_principal)):
     return db.query(Hall).filter(Hall.clan_id == current.clan_id).all()
 
 
@@ -317,7 +344,7 @@ def update_hall(
     id: int,
     hall_update: HallCreate,
     db: Session = Depends(get_db),
-    current: User = Depends(clan_admin_required)
+    current: Principal = Depends(clan_admin_required)
 ):
     # Get the existing hall
     existing_hall = db.query(Hall).filter(
@@ -357,7 +384,7 @@ def update_hall(
 
 # delet a hall by id
 @router.delete("/hall/{id}", dependencies=[Depends(clan_admin_required)])
-def delete_a_hall(id: int, db: Session = Depends(get_db), current: User = Depends(clan_admin_required)):
+def delete_a_hall(id: int, db: Session = Depends(get_db), current: Principal = Depends(clan_admin_required)):
     hall = db.query(Hall).filter(
         Hall.id == id,
         Hall.clan_id == current.clan_id
@@ -374,8 +401,8 @@ def delete_a_hall(id: int, db: Session = Depends(get_db), current: User = Depend
 # ClanSettings CRUD (edit only own clan)
 
 
-@router.get("/settings", response_model=ClanSettingsOut, dependencies=[Depends(get_current_user)])
-def get_settings(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+@router.get("/settings", response_model=ClanSettingsOut, dependencies=[Depends(get_current_principal)])
+def get_settings(db: Session = Depends(get_db), current: Principal = Depends(get_current_principal)):
     return db.query(ClanSettings).filter(ClanSettings.clan_id == current.clan_id).first()
 
 
@@ -386,7 +413,7 @@ def get_settings(clan_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/settings/{clan__id}", response_model=ClanSettingsOut, dependencies=[Depends(clan_admin_required)])
-def update_settings(clan__id: int, settings: ClanSettingsUpdate, db: Session = Depends(get_db), current: User = Depends(clan_admin_required)):
+def update_settings(clan__id: int, settings: ClanSettingsUpdate, db: Session = Depends(get_db), current: Principal = Depends(clan_admin_required)):
     if clan__id != current.clan_id:
         raise HTTPException(status_code=403, detail="ليست عشيرتك")
 
@@ -508,7 +535,7 @@ def delete_clan_rules(
 @router.post("/update_payment", dependencies=[Depends(clan_admin_required)])
 def update_payment(
     data: ClanSettingUpdatePayment,
-    current: User = Depends(clan_admin_required),
+    current: Principal = Depends(clan_admin_required),
     db: Session = Depends(get_db)
 ):
     clansetting = db.query(ClanSettings).filter(
@@ -531,7 +558,7 @@ def update_payment(
 
 @router.get("/required_payment", dependencies=[Depends(clan_admin_required)])
 def get_required_payment(
-    current: User = Depends(clan_admin_required),
+    current: Principal = Depends(clan_admin_required),
     db: Session = Depends(get_db)
 ):
 
@@ -552,7 +579,7 @@ def change_payment_status(
     reservation_id: int,
     data: ReservationsPaymentUpdate,
     db: Session = Depends(get_db),
-    current: User = Depends(clan_admin_required)
+    current: Principal = Depends(clan_admin_required)
 ):
     # Find the reservation
     resv = db.query(Reservation).filter(
@@ -675,7 +702,7 @@ def change_payment_status(
 
 
 @router.get("/special_reservations/{clan_id}", response_model=List[ReservationSpecialOut])
-def get_special_reservations(clan_id: int, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+def get_special_reservations(clan_id: int, db: Session = Depends(get_db), current: Principal = Depends(get_current_principal)):
     special_reservations = db.query(ReservationSpecial).filter(
         ReservationSpecial.county_id == current.county_id,
         ReservationSpecial.clan_id == clan_id,
@@ -736,7 +763,7 @@ def get_special_reservations(clan_id: int, db: Session = Depends(get_db), curren
 def reserv_some_dates(
     reservation_create: ReservationSpecialCreate,
     db: Session = Depends(get_db),
-    current: User = Depends(clan_admin_required)
+    current: Principal = Depends(clan_admin_required)
 ):
 
     # Get admin's clan
@@ -786,24 +813,25 @@ def reserv_some_dates(
     return new_reservation
 
 
-@router.get("/special_reservrations", response_model=List[ReservationSpecialOut], dependencies=[Depends(clan_admin_required)])
+@router.get("/special_reservrations", response_model=Union[List[ReservationSpecialOut], CursorPage[ReservationSpecialOut]], dependencies=[Depends(clan_admin_required)])
 def get_all_special_reservations(
     db: Session = Depends(get_db),
-    current: User = Depends(clan_admin_required)
+    current: Principal = Depends(clan_admin_required),
+    page: PageParams = Depends()
 ):
-    special_reserv = db.query(ReservationSpecial).filter(
+    special_reserv, next_cursor = paginate(db.query(ReservationSpecial).filter(
         ReservationSpecial.clan_id == current.clan_id,
         ReservationSpecial.county_id == current.county_id
-    ).all()
+    ), ReservationSpecial.date, ReservationSpecial.id, page)
 
-    return special_reserv
+    return page_response(special_reserv, next_cursor, page)
 
 
 @router.put("/update_status_special_reserv/{reserv_id}", dependencies=[Depends(clan_admin_required)])
 def update_status_special_reservation(
     reserv_id: int,
     db: Session = Depends(get_db),
-    current: User = Depends(clan_admin_required)
+    current: Principal = Depends(clan_admin_required)
 ):
     reserv = db.query(ReservationSpecial).filter(
         ReservationSpecial.id == reserv_id,
@@ -846,7 +874,7 @@ def update_status_special_reservation(
 def generate_groom_access_password(
     groom_id: int,
     db: Session = Depends(get_db),
-    current: User = Depends(clan_admin_required)
+    current: Principal = Depends(clan_admin_required)
 ):
     """
     Generate access password for a groom in the admin's clan.
@@ -890,7 +918,7 @@ def set_groom_access_password(
     groom_id: int,
     password_data: AccessPasswordCreate,
     db: Session = Depends(get_db),
-    current: User = Depends(clan_admin_required)
+    current: Principal = Depends(clan_admin_required)
 ):
     """
     Manually set access password for groom.
@@ -0,0 +1,30 @@
+"""
+Dashboard route: the clan and county reservation counts and the unread
+notifications in one request, instead of the six valid_reservations_*
+endpoints plus /notifications/unread-count and /notifications/stats.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from ..auth_utils import get_current_principal, get_db
+from ..models.user import User
+from ..schemas.dashboard import DashboardSummary
+from ..utils.dashboard_summary import build_summary
+from ..utils.principal_cache import Principal
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+@router.get("/summary", response_model=DashboardSummary)
+def get_dashboard_summary(
+    fresh: bool = Query(False, description="Bypass the short-lived counts cache"),
+    db: Session = Depends(get_db),
+    current: Principal = Depends(get_current_principal)
+):
+    """
+    Validated reservations of today, this month and this year for the
+    current user's clan and county, plus unread notification counts
+    """
+    if current.county_id is None:
+        raise HTTPException(status_code=400, detail="المستخدم غير مرتبط بولاية")
+    return build_summary(db, current, use_cache=not fresh)
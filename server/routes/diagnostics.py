@@ -0,0 +1,30 @@
+"""
+Diagnostics routes for super admins: per-route SQL statement counts.
+"""
+from fastapi import APIRouter, Depends
+
+from ..auth_utils import require_principal_role
+from ..models.user import UserRole
+from ..utils import query_stats
+
+router = APIRouter(
+    prefix="/admin/diagnostics",
+    tags=["Admin Utils"],
+    dependencies=[Depends(require_principal_role([UserRole.super_admin]))],
+)
+
+
+@router.get("/queries")
+def get_query_report():
+    """
+    Statements and DB time per route since this worker started, with the
+    statements repeated often enough in one request to look like N+1
+    """
+    return query_stats.report()
+
+
+@router.delete("/queries")
+def reset_query_report():
+    """Start counting again (this worker only)"""
+    query_stats.reset()
+    return {"message": "تمت إعادة تعيين الإحصائيات"}
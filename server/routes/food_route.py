@@ -4,16 +4,20 @@ Path: server/routes/food_route.py
 """
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Union
 import json
 
 from server.models.clan import Clan
 
 from ..models.food import FoodMenu
-from ..auth_utils import get_current_user, require_role
+from ..auth_utils import get_current_principal, require_principal_role
 from ..models.user import User, UserRole
 
 from ..db import get_db
+from ..schemas.pagination import CursorPage
+from ..utils.pagination import PageParams, page_response, paginate
+from ..utils.principal_cache import Principal
+from ..utils.serialization import ListSerializer
 from ..schemas.food_type import (
     FoodMenuOut,
     FoodTypeListResponse,
@@ -27,9 +31,11 @@ from ..schemas.food_type import (
 
 router = APIRouter(prefix="/food", tags=["Food Management"])
 
+food_menu_list = ListSerializer(FoodMenuOut)
+
 # Role requirements
-clan_admin_required = require_role([UserRole.clan_admin])
-groom_access = require_role(
+clan_admin_required = require_principal_role([UserRole.clan_admin])
+groom_access = require_principal_role(
     [UserRole.groom, UserRole.clan_admin, UserRole.super_admin])
 
 
@@ -90,7 +96,7 @@ def get_filtered_menu(food_type: str, visitors: int, clan_id: int, db: Session =
         .all()
     )
 
-    return menus
+    return food_menu_list.response(menus, from_attributes=True)
 
 ########## groom and clan admin routes ##################
 # get all menus of a clan
@@ -99,7 +105,7 @@ def get_filtered_menu(food_type: str, visitors: int, clan_id: int, db: Session =
 @router.get("/my_menus", response_model=List[FoodMenuOut])
 def get_clan_menus(
     db: Session = Depends(get_db),
-    current: User = Depends(get_current_user)
+    current: Principal = Depends(get_current_principal)
 ):
     if current.role == UserRole.super_admin:
         raise HTTPException(
@@ -111,7 +117,7 @@ def get_clan_menus(
         FoodMenu.clan_id == current.clan_id
     ).all()
 
-    return menus
+    return food_menu_list.response(menus, from_attributes=True)
 
 ########  Caln admin routes ##################
 
@@ -122,7 +128,7 @@ def get_clan_menus(
 def create_food_menu(
     request: CreateFoodMenuRequest,
     db: Session = Depends(get_db),
-    current: User = Depends(clan_admin_required)
+    current: Principal = Depends(clan_admin_required)
 ):
     """Create a new food menu (Clan Admin only)"""
 
@@ -173,7 +179,7 @@ def create_food_menu(
 def get_menu_details(
     menu_id: int,
     db: Session = Depends(get_db),
-    current: User = Depends(clan_admin_required)
+    current: Principal = Depends(clan_admin_required)
 ):
     """Get detailed menu information for editing"""
     menu = db.query(FoodMenu).filter(
@@ -202,7 +208,7 @@ def update_food_menu(
     menu_id: int,
     update_request: UpdateFoodMenuRequest,
     db: Session = Depends(get_db),
-    current: User = Depends(clan_admin_required)
+    current: Principal = Depends(clan_admin_required)
 ):
     """Update an existing food menu (Clan Admin only)"""
 
@@ -241,7 +247,7 @@ def update_food_menu(
 def delete_food_menu(
     menu_id: int,
     db: Session = Depends(get_db),
-    current: User = Depends(clan_admin_required)
+    current: Principal = Depends(clan_admin_required)
 ):
     """Delete a food menu (Clan Admin only)"""
 
@@ -270,18 +276,19 @@ def delete_food_menu(
 # Add this route to your Python clan admin routes file
 
 
-@router.get("/menus", response_model=List[dict], dependencies=[Depends(clan_admin_required)])
+@router.get("/menus", response_model=Union[List[dict], CursorPage[dict]], dependencies=[Depends(clan_admin_required)])
 def list_food_menus(
     db: Session = Depends(get_db),
-    current: User = Depends(clan_admin_required)
+    current: Principal = Depends(clan_admin_required),
+    page: PageParams = Depends()
 ):
-    """List all food menus for the current clan admin's clan"""
+    """List all food menus for the current clan admin's clan (newest first, keyset paginated with limit/cursor)"""
 
-    menus = db.query(FoodMenu).filter(
+    menus, next_cursor = paginate(db.query(FoodMenu).filter(
         FoodMenu.clan_id == current.clan_id
-    ).all()
+    ), FoodMenu.id, FoodMenu.id, page)
 
-    return [
+    return page_response([
         {
             "id": menu.id,
             "food_type": menu.food_type,
@@ -290,7 +297,7 @@ def list_food_menus(
             "clan_id": menu.clan_id
         }
         for menu in menus
-    ]
+    ], next_cursor, page)
 
 
 ###
@@ -301,7 +308,7 @@ def list_food_menus(
 @router.get("/menu/unique-food-types")
 def get_unique_food_types(
     db: Session = Depends(get_db),
-    current: User = Depends(get_current_user)
+    current: Principal = Depends(get_current_principal)
 ):
     """Get unique food types from the current user's clan menus"""
     if current.role == UserRole.super_admin:
@@ -323,7 +330,7 @@ def get_unique_food_types(
 @router.get("/menu/unique-visitor-counts")
 def get_unique_visitor_counts(
     db: Session = Depends(get_db),
-    current: User = Depends(get_current_user)
+    current: Principal = Depends(get_current_principal)
 ):
     """Get unique visitor counts from the current user's clan menus"""
     if current.role == UserRole.super_admin:
@@ -18,13 +18,14 @@ from server.schemas.food_type import FoodMenuOut
 from server.schemas.haia_committe import HaiaOut
 from server.schemas.hall import HallOut
 from server.schemas.madaih_committe import MadaihOut
-from server.utils.otp_utils import generate_otp_code, send_otp_to_user_by_twilo
+from server.utils.otp_utils import generate_otp_code, queue_otp_sms
 from server.utils.phone_utils import validate_algerian_number, validate_algerian_number_for_guardian
+from server.utils.principal_cache import Principal
 from server.models.food import FoodMenu
 from ..models.reservation import Reservation, ReservationStatus
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session, joinedload
-from ..auth_utils import get_current_user, get_db, require_role
+from ..auth_utils import get_current_principal, get_current_user, get_db, require_principal_role
 from ..models.user import User, UserRole
 from ..schemas.user import UserOut, UserUpdate
 
@@ -33,11 +34,11 @@ router = APIRouter(
     tags=["groom"]
 )
 
-groom_required = require_role([UserRole.groom])
+groom_required = require_principal_role([UserRole.groom])
 
 
 @router.get("/profile", dependencies=[Depends(groom_required)])
-def get_profile(db: Session = Depends(get_db), current: User = Depends(groom_required)):
+def get_profile(db: Session = Depends(get_db), current: Principal = Depends(groom_required)):
 
     user = db.query(User).options(
         joinedload(User.county),
@@ -82,7 +83,7 @@ def get_profile(db: Session = Depends(get_db), current: User = Depends(groom_req
 def update_profile(
     user_update: UserUpdate,
     db: Session = Depends(get_db),
-    current: User = Depends(groom_required)
+    current: User = Depends(get_current_user)
 ):
     # Check if groom has any reservation (validated or pending)
     has_active_reservation = db.query(Reservation).filter(
@@ -127,7 +128,7 @@ def update_profile(
 
                 # Generate OTP and send to new number
                 temp_code = generate_otp_code()
-                send_otp_to_user_by_twilo(value, temp_code)
+                queue_otp_sms(db, value, temp_code)
 
                 current.temp_phone_number = value
                 current.temp_phone_otp_code = temp_code
@@ -152,7 +153,7 @@ def update_profile(
 
                 # Generate OTP and send to new number
                 temp_code = generate_otp_code()
-                send_otp_to_user_by_twilo(value, temp_code)
+                queue_otp_sms(db, value, temp_code)
 
                 current.temp_phone_number = value
                 current.temp_phone_otp_code = temp_code
@@ -178,7 +179,7 @@ def update_profile(
 @router.delete("/profile", dependencies=[Depends(groom_required)])
 def delete_profile(
     db: Session = Depends(get_db),
-    current: User = Depends(groom_required)
+    current: Principal = Depends(groom_required)
 ):
     groom = db.query(User).filter(User.id == current.id).first()
     if not groom:
@@ -191,7 +192,7 @@ def delete_profile(
 
 # get halls by groom
 @router.get("/halls", response_model=list[HallOut])
-def list_halls(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+def list_halls(db: Session = Depends(get_db), current: Principal = Depends(get_current_principal)):
     return db.query(Hall).filter(Hall.clan_id == current.clan_id).all()
 
 
@@ -204,7 +205,7 @@ def list_counties(db: Session = Depends(get_db)):
 
 
 @router.get("/clans", response_model=list[ClanOut])
-def list_clans(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+def list_clans(db: Session = Depends(get_db), current: Principal = Depends(get_current_principal)):
     clans = db.query(Clan).filter(Clan.county_id == current.county_id).all()
     if not clans:
         raise HTTPException(status_code=404, detail="لا توجد عشائر")
@@ -213,19 +214,19 @@ def list_clans(db: Session = Depends(get_db), current: User = Depends(get_curren
 
 # get  all haiats by county_id
 @router.get("/haia", response_model=list[HaiaOut])
-def list_of_all_haia(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+def list_of_all_haia(db: Session = Depends(get_db), current: Principal = Depends(get_current_principal)):
     return db.query(HaiaCommittee).filter(HaiaCommittee.county_id == current.county_id).all()
 
 
 # get  all Madaeh  by county_id
 @router.get("/madaih_committe", response_model=list[MadaihOut])
-def list_of_all_haia(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+def list_of_all_haia(db: Session = Depends(get_db), current: Principal = Depends(get_current_principal)):
     return db.query(MadaehCommittee).filter(MadaehCommittee.county_id == current.county_id).all()
 
 
 # get  all Rulse of this clan
 @router.get("/rules", response_model=list[MadaihOut])
-def list_of_all_haia(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+def list_of_all_haia(db: Session = Depends(get_db), current: Principal = Depends(get_current_principal)):
     return db.query(MadaehCommittee).filter(MadaehCommittee.county_id == current.county_id).all()
 
 ######## clan rules ##################
@@ -249,7 +250,7 @@ def get_clan_rules(
 @router.get("/clan-rules", response_model=ClanRulesResponse)
 def get_clan_rules(
     db: Session = Depends(get_db),
-    current: User = Depends(get_current_user)
+    current: Principal = Depends(get_current_principal)
 ):
     """Get clan rules by ID (Groom read-only access)"""
     rules = clan_rules_crud.get_by_clan_id(db, current.clan_id)
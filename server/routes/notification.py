@@ -7,14 +7,16 @@ import logging
 from re import U
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import datetime
 
-from server.auth_utils import get_current_user, get_db, require_role
+from server.auth_utils import get_current_principal, get_current_user, get_db, require_principal_role
 from server.models.user import User, UserRole
 from server.models.notification import Notification, NotificationType
 from server.models.reservation import Reservation, ReservationStatus
 from server.utils.notification_service import NotificationService
+from server.utils.principal_cache import Principal
 from server.schemas.notification import (
     NotifDataCreat,
     NotificationOut,
@@ -24,6 +26,7 @@ from server.schemas.notification import (
     BulkNotificationResponse
 )
 from server.routes.auth import super_admin_required
+from server.utils.serialization import ListSerializer
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -34,10 +37,13 @@ router = APIRouter(
     tags=["notifications"]
 )
 
+# Built once; the handlers validate each row, the response is not validated again
+notification_list = ListSerializer(NotificationOut)
+
 # Role-based dependencies
-groom_required = require_role([UserRole.groom,  UserRole.super_admin])
-clan_admin_required = require_role([UserRole.clan_admin, UserRole.super_admin])
-authenticated = require_role(
+groom_required = require_principal_role([UserRole.groom,  UserRole.super_admin])
+clan_admin_required = require_principal_role([UserRole.clan_admin, UserRole.super_admin])
+authenticated = require_principal_role(
     [UserRole.groom, UserRole.clan_admin, UserRole.super_admin])
 
 
@@ -139,66 +145,44 @@ Replace the get_notifications endpoint in server/routes/notifications.py
 #             }
 #         )
 
-@router.get("", response_model=List[NotificationOut])
+@router.get("", response_model=List[NotificationOut], dependencies=[Depends(authenticated)])
 def get_notifications(
     unread_only: bool = Query(
         False, description="Get only unread notifications"),
     limit: int = Query(
         50, ge=1, le=100, description="Maximum number of notifications to return"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(authenticated)
+    current_user: User = Depends(get_current_user)
 ):
-    """Get all notifications for the current user with user details."""
+    """Get all notifications (personal and broadcast) for the current user with user details."""
     try:
-        # Query with JOIN to User table to get user information
-        query = db.query(
-            Notification,
-            User.first_name,
-            User.last_name,
-            User.phone_number
-        ).join(
-            User, Notification.user_id == User.id
-        ).filter(
-            Notification.user_id == current_user.id
+        notifications = NotificationService.get_inbox(
+            db=db,
+            user_id=current_user.id,
+            unread_only=unread_only,
+            limit=limit
         )
 
-        if unread_only:
-            query = query.filter(Notification.is_read == False)
-
-        notifications_with_user = query.order_by(
-            Notification.created_at.desc()
-        ).limit(limit).all()
-
         logger.info(
-            f"Retrieved {len(notifications_with_user)} notifications for user {current_user.id}")
+            f"Retrieved {len(notifications)} notifications for user {current_user.id}")
 
         # Manually serialize each notification with user info
         result = []
-        for notif, first_name, last_name, phone_number in notifications_with_user:
+        for notif in notifications:
             try:
-                notification_dict = {
-                    "id": notif.id,
-                    "user_id": notif.user_id,
-                    "reservation_id": notif.reservation_id,  # Can be None now
-                    "notification_type": notif.notification_type,
-                    "title": notif.title,
-                    "message": notif.message,
-                    "is_read": notif.is_read,
-                    "is_groom": notif.is_groom,
-                    "created_at": notif.created_at,
-                    "read_at": notif.read_at,
-                    # Add user information
-                    "user_first_name": first_name,
-                    "user_last_name": last_name,
-                    "user_phone_number": phone_number
-                }
-                result.append(NotificationOut(**notification_dict))
+                result.append(NotificationOut(
+                    **notif,
+                    # The inbox only holds the current user's items
+                    user_first_name=current_user.first_name,
+                    user_last_name=current_user.last_name,
+                    user_phone_number=current_user.phone_number
+                ))
             except Exception as serialize_error:
                 logger.error(
-                    f"Error serializing notification {notif.id}: {serialize_error}")
+                    f"Error serializing notification {notif['id']}: {serialize_error}")
                 continue
 
-        return result
+        return notification_list.response(result)
 
     except Exception as e:
         logger.error(
@@ -266,66 +250,46 @@ def get_notifications(
 #         )
 
 
-@router.get("/sended", response_model=List[NotificationOut])
+@router.get("/sended", response_model=List[NotificationOut], dependencies=[Depends(authenticated)])
 def get_sended_notifications(
     unread_only: bool = Query(
         False, description="Get only unread notifications"),
     limit: int = Query(
         50, ge=1, le=100, description="Maximum number of notifications to return"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(authenticated)
+    current_user: User = Depends(get_current_user)
 ):
     """Get all sent notifications with recipient user details."""
     try:
-        # Query with JOIN to User table to get recipient information
-        query = db.query(
-            Notification,
-            User.first_name,
-            User.last_name,
-            User.phone_number
-        ).join(
-            User, Notification.user_id == User.id
-        ).filter(
-            Notification.user_id == current_user.id
+        # Personal notifications and received broadcasts (general notifications
+        # are stored as broadcasts), like /notifications
+        notifications = NotificationService.get_inbox(
+            db=db,
+            user_id=current_user.id,
+            unread_only=unread_only,
+            limit=limit
         )
 
-        if unread_only:
-            query = query.filter(Notification.is_read == False)
-
-        notifications_with_user = query.order_by(
-            Notification.created_at.desc()
-        ).limit(limit).all()
-
         logger.info(
-            f"Retrieved {len(notifications_with_user)} sent notifications for user {current_user.id}")
+            f"Retrieved {len(notifications)} sent notifications for user {current_user.id}")
 
         # Manually serialize each notification with user info
         result = []
-        for notif, first_name, last_name, phone_number in notifications_with_user:
+        for notif in notifications:
             try:
-                notification_dict = {
-                    "id": notif.id,
-                    "user_id": notif.user_id,
-                    "reservation_id": notif.reservation_id,
-                    "notification_type": notif.notification_type,
-                    "title": notif.title,
-                    "message": notif.message,
-                    "is_read": notif.is_read,
-                    "is_groom": notif.is_groom,
-                    "created_at": notif.created_at,
-                    "read_at": notif.read_at,
-                    # Add recipient user information
-                    "user_first_name": first_name,
-                    "user_last_name": last_name,
-                    "user_phone_number": phone_number
-                }
-                result.append(NotificationOut(**notification_dict))
+                result.append(NotificationOut(
+                    **notif,
+                    # Add recipient user information: the inbox is the current user's
+                    user_first_name=current_user.first_name,
+                    user_last_name=current_user.last_name,
+                    user_phone_number=current_user.phone_number
+                ))
             except Exception as serialize_error:
                 logger.error(
-                    f"Error serializing notification {notif.id}: {serialize_error}")
+                    f"Error serializing notification {notif['id']}: {serialize_error}")
                 continue
 
-        return result
+        return notification_list.response(result)
 
     except Exception as e:
         logger.error(
@@ -346,7 +310,7 @@ def get_sended_notifications(
 @router.get("/stats", response_model=NotificationStats)
 def get_notification_stats(
     db: Session = Depends(get_db),
-    current_user: User = Depends(authenticated)
+    current_user: Principal = Depends(authenticated)
 ):
     """
     Get notification statistics for the current user.
@@ -356,32 +320,19 @@ def get_notification_stats(
     - Breakdown by notification type
     """
     try:
-        # Count unread notifications
-        unread_count = db.query(Notification).filter(
-            Notification.user_id == current_user.id,
-            Notification.is_read == False
-        ).count()
-
-        # Get breakdown by type - avoid loading relationships
-        notifications = db.query(
-            Notification.notification_type
-        ).filter(
-            Notification.user_id == current_user.id,
-            Notification.is_read == False
-        ).all()
-
-        type_breakdown = {}
-        for (notif_type,) in notifications:
-            type_value = notif_type.value if hasattr(
-                notif_type, 'value') else str(notif_type)
-            type_breakdown[type_value] = type_breakdown.get(type_value, 0) + 1
+        # Unread notifications and received broadcasts, per type
+        type_breakdown = NotificationService.get_unread_by_type(
+            db=db,
+            user_id=current_user.id
+        )
+        unread_count = sum(type_breakdown.values())
 
         logger.info(
             f"Stats retrieved for user {current_user.id}: {unread_count} unread")
 
         return NotificationStats(
             unread_count=unread_count,
-            total_count=len(notifications),
+            total_count=unread_count,
             by_type=type_breakdown
         )
 
@@ -402,7 +353,7 @@ def get_notification_stats(
 def get_notifications_by_reservation(
     reservation_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(authenticated)
+    current_user: Principal = Depends(authenticated)
 ):
     """
     Get all notifications for a specific reservation.
@@ -475,7 +426,7 @@ def get_notifications_by_reservation(
 @router.get("/unread-count", response_model=dict)
 def get_unread_count(
     db: Session = Depends(get_db),
-    current_user: User = Depends(authenticated)
+    current_user: Principal = Depends(authenticated)
 ):
     """
     Get the count of unread notifications for quick polling.
@@ -497,11 +448,11 @@ def get_unread_count(
         raise HTTPException(500, f"خطأ في جلب عدد الإشعارات: {str(e)}")
 
 
-@router.get("/{notification_id}", response_model=NotificationOut)
+@router.get("/{notification_id}", response_model=NotificationOut, dependencies=[Depends(authenticated)])
 def get_notification_by_id(
     notification_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(authenticated)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Get a specific notification by ID.
@@ -509,6 +460,23 @@ def get_notification_by_id(
     - **notification_id**: The ID of the notification to retrieve
     """
     try:
+        if notification_id < 0:
+            # Received broadcast
+            notification = NotificationService.get_broadcast_item(
+                db=db,
+                notification_id=notification_id,
+                user_id=current_user.id
+            )
+            if not notification:
+                raise HTTPException(404, "الإشعار غير موجود")
+
+            return NotificationOut(
+                **notification,
+                user_first_name=current_user.first_name,
+                user_last_name=current_user.last_name,
+                user_phone_number=current_user.phone_number
+            )
+
         notification = db.query(Notification).filter(
             Notification.id == notification_id,
             Notification.user_id == current_user.id
@@ -530,7 +498,7 @@ def get_notification_by_id(
 def mark_notification_as_read(
     notification_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(authenticated)
+    current_user: Principal = Depends(authenticated)
 ):
     """
     Mark a specific notification as read.
@@ -567,7 +535,7 @@ def mark_notification_as_read(
 @router.patch("/mark-all-read", response_model=BulkNotificationResponse)
 def mark_all_notifications_as_read(
     db: Session = Depends(get_db),
-    current_user: User = Depends(authenticated)
+    current_user: Principal = Depends(authenticated)
 ):
     """
     Mark all notifications as read for the current user.
@@ -597,13 +565,34 @@ def mark_all_notifications_as_read(
 def delete_notification(
     notification_id: int,
     db: Session = Depends(get_db),
+    current_user: Principal = Depends(authenticated)
 ):
     """
     Delete a specific notification.
 
     - **notification_id**: The ID of the notification to delete
+      (negative: a received broadcast, removed from the current user's inbox only)
     """
     try:
+        if notification_id < 0:
+            count = NotificationService.delete_broadcast_receipts(
+                db=db,
+                user_ids=select(User.id).where(User.id == current_user.id),
+                broadcast_id=-notification_id
+            )
+            if not count:
+                raise HTTPException(404, "الإشعار غير موجود")
+            db.commit()
+
+            logger.info(
+                f"Broadcast {-notification_id} removed for user {current_user.id}")
+
+            return {
+                "message": "تم حذف الإشعار",
+                "notification_id": notification_id,
+                "success": True
+            }
+
         notification = db.query(Notification).filter(
             Notification.id == notification_id,
         ).first()
@@ -634,7 +623,7 @@ def delete_notification(
 @router.delete("/bulk-delete/2month", response_model=BulkNotificationResponse)
 def bulk_delete_old_notifications(  # Changed name
     db: Session = Depends(get_db),
-    current_user: User = Depends(authenticated)
+    current_user: Principal = Depends(authenticated)
 ):
     """Delete notifications older than 2 months"""
     two_months_ago = datetime.utcnow() - timedelta(days=60)
@@ -647,6 +636,12 @@ def bulk_delete_old_notifications(  # Changed name
         Notification.user_id.in_(user_ids),
         Notification.created_at < two_months_ago
     ).delete(synchronize_session=False)
+    count += NotificationService.delete_broadcast_receipts(
+        db=db,
+        user_ids=select(User.id).where(
+            User.clan_id == current_user.clan_id),
+        before=two_months_ago
+    )
 
     db.commit()
 
@@ -660,7 +655,7 @@ def bulk_delete_old_notifications(  # Changed name
 @router.delete("/bulk-delete/clan-admin", response_model=BulkNotificationResponse)
 def bulk_delete_clan_admin_notifications(  # Changed name
     db: Session = Depends(get_db),
-    current_user: User = Depends(authenticated)
+    current_user: Principal = Depends(authenticated)
 ):
     """Delete all clan admin notifications"""
     user_ids = [user_id[0] for user_id in db.query(User.id).filter(
@@ -671,6 +666,13 @@ def bulk_delete_clan_admin_notifications(  # Changed name
     count = db.query(Notification).filter(
         Notification.user_id.in_(user_ids)
     ).delete(synchronize_session=False)
+    count += NotificationService.delete_broadcast_receipts(
+        db=db,
+        user_ids=select(User.id).where(
+            User.clan_id == current_user.clan_id,
+            User.role == UserRole.clan_admin
+        )
+    )
 
     db.commit()
 
@@ -684,7 +686,7 @@ def bulk_delete_clan_admin_notifications(  # Changed name
 @router.delete("/bulk-delete/all", response_model=BulkNotificationResponse)
 def bulk_delete_all_clan_notifications(  # Changed name
     db: Session = Depends(get_db),
-    current_user: User = Depends(authenticated)
+    current_user: Principal = Depends(authenticated)
 ):
     """Delete all notifications for the clan"""
     user_ids = [user_id[0] for user_id in db.query(User.id).filter(
@@ -694,6 +696,11 @@ def bulk_delete_all_clan_notifications(  # Changed name
     count = db.query(Notification).filter(
         Notification.user_id.in_(user_ids)
     ).delete(synchronize_session=False)
+    count += NotificationService.delete_broadcast_receipts(
+        db=db,
+        user_ids=select(User.id).where(
+            User.clan_id == current_user.clan_id)
+    )
 
     db.commit()
 
@@ -767,7 +774,7 @@ def notify_reservation_validation(
     is_approved: bool = Query(...,
                               description="True if approved, False if rejected"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(clan_admin_required)
+    current_user: Principal = Depends(clan_admin_required)
 ):
     """
     Send validation notification to groom (Clan Admin only).
@@ -811,12 +818,12 @@ def notify_reservation_validation(
         raise HTTPException(500, f"خطأ في إرسال إشعار التحقق: {str(e)}")
 
 
-@router.get("/by-type/{notification_type}", response_model=List[NotificationOut])
+@router.get("/by-type/{notification_type}", response_model=List[NotificationOut], dependencies=[Depends(authenticated)])
 def get_notifications_by_type(
     notification_type: NotificationType,
     limit: int = Query(50, ge=1, le=100),
     db: Session = Depends(get_db),
-    current_user: User = Depends(authenticated)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Get notifications filtered by type.
@@ -825,17 +832,25 @@ def get_notifications_by_type(
     - **limit**: Maximum number of notifications to return
     """
     try:
-        notifications = db.query(Notification).filter(
-            Notification.user_id == current_user.id,
-            Notification.notification_type == notification_type
-        ).order_by(
-            Notification.created_at.desc()
-        ).limit(limit).all()
+        # Through the inbox: general notifications are stored as broadcasts
+        notifications = NotificationService.get_inbox(
+            db=db,
+            user_id=current_user.id,
+            limit=limit,
+            notification_type=notification_type
+        )
 
         logger.info(
             f"Retrieved {len(notifications)} notifications of type {notification_type} for user {current_user.id}")
 
-        return notifications
+        return notification_list.response([
+            NotificationOut(
+                **notif,
+                user_first_name=current_user.first_name,
+                user_last_name=current_user.last_name,
+                user_phone_number=current_user.phone_number
+            ) for notif in notifications
+        ])
 
     except Exception as e:
         logger.error(f"Error getting notifications by type: {e}")
@@ -851,7 +866,7 @@ def get_notifications_by_type(
 def get_latest_notification_for_reservation(
     reservation_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(authenticated)
+    current_user: Principal = Depends(authenticated)
 ):
     """
     Get the most recent notification for a specific reservation.
@@ -913,87 +928,67 @@ def get_latest_notification_for_reservation(
 
 # create general notification
 @router.post("/create_notification", dependencies=[Depends(clan_admin_required)])
-def create_notification(notif_data: NotifDataCreat, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
-    # Get all users from the database
+def create_notification(notif_data: NotifDataCreat, db: Session = Depends(get_db), current: Principal = Depends(get_current_principal)):
+    # Target users, as a SELECT of their ids: stored as one broadcast
 
     if current.role == UserRole.super_admin:
-        users = db.query(User).filter(
+        recipients = select(User.id).where(
             User.role == (
                 UserRole.groom if notif_data.is_groom else UserRole.clan_admin)
-        ).all()  # Replace 'User' with your actual user model
-
-        # Create notification for each user
-        for user in users:
-            NotificationService.create_general_notification(
-                db=db,
-                user_id=user.id,
-                title=notif_data.title,
-                message=notif_data.message,
-                is_groom=notif_data.is_groom
-            )
+        )
     elif current.role == UserRole.clan_admin:
-        users = db.query(User).filter(
+        recipients = select(User.id).where(
             User.role == UserRole.groom,
             User.clan_id == current.clan_id
-        ).all()  # Replace 'User' with your actual user model
-
-        # Create notification for each user
-        for user in users:
-            NotificationService.create_general_notification(
-                db=db,
-                user_id=user.id,
-                title=notif_data.title,
-                message=notif_data.message,
-                is_groom=notif_data.is_groom
-            )
+        )
     else:
         raise HTTPException(
             status_code=403, detail="غير مصرح لك بإرسال إشعارات عامة")
 
-    return {"message": f"Notification sent to {len(users)} users successfully"}
+    sent = NotificationService.broadcast_general_notification(
+        db=db,
+        recipients=recipients,
+        title=notif_data.title,
+        message=notif_data.message,
+        is_groom=notif_data.is_groom,
+        sender_id=current.id
+    )
+
+    return {"message": f"Notification sent to {sent} users successfully"}
 
 # create general notification
 
 
 @router.post("/create_notification_grooms_reserved", dependencies=[Depends(clan_admin_required)])
-def create_notification(notif_data: NotifDataCreat, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
+def create_notification(notif_data: NotifDataCreat, db: Session = Depends(get_db), current: Principal = Depends(get_current_principal)):
 
+    # Grooms with a non-cancelled reservation, each notified once. groom_id is
+    # SET NULL when a groom is deleted, and recipients are part of a primary key
     if current.role == UserRole.super_admin:
-        users_reserved = db.query(Reservation).filter(
+        recipients = select(Reservation.groom_id).where(
+            Reservation.groom_id.isnot(None),
             Reservation.status != ReservationStatus.cancelled
-        ).all()
-
-        # Create notification for each reservation's user
-        for reservation in users_reserved:
-            NotificationService.create_general_notification(
-                db=db,
-                user_id=reservation.groom_id,  # Changed from reservation.id
-                title=notif_data.title,
-                message=notif_data.message,
-                is_groom=notif_data.is_groom
-            )
-
+        )
     elif current.role == UserRole.clan_admin:
-        users_reserved = db.query(Reservation).filter(
+        recipients = select(Reservation.groom_id).where(
+            Reservation.groom_id.isnot(None),
             Reservation.clan_id == current.clan_id,
             Reservation.status != ReservationStatus.cancelled
-        ).all()
-
-        # Create notification for each reservation's user
-        for reservation in users_reserved:
-            NotificationService.create_general_notification(
-                db=db,
-                user_id=reservation.groom_id,  # Changed from reservation.id
-                title=notif_data.title,
-                message=notif_data.message,
-                is_groom=notif_data.is_groom
-            )
+        )
     else:
         raise HTTPException(
             status_code=403, detail="غير مصرح لك بإرسال إشعارات عامة")
 
-    # Changed from {len(users)}
-    return {"message": f"Notification sent to {len(users_reserved)} users successfully"}
+    sent = NotificationService.broadcast_general_notification(
+        db=db,
+        recipients=recipients,
+        title=notif_data.title,
+        message=notif_data.message,
+        is_groom=notif_data.is_groom,
+        sender_id=current.id
+    )
+
+    return {"message": f"Notification sent to {sent} users successfully"}
 # # create general notification
 # @router.post("/create_notification_grooms_reserved", dependencies=[Depends(super_admin_required)])
 # def create_notification(notif_data: NotifDataCreat, db: Session = Depends(get_db)):
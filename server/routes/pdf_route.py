@@ -16,11 +16,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 
-from server.utils.pdf_generator import generate_wedding_pdf
+from server.utils.pdf_worker import PdfJobStatus, pdf_worker_pool
+from server.utils.principal_cache import Principal
 from server.models.reservation import Reservation
 from server.models.user import User, UserRole
 from server.models.clan_rules import ClanRules
-from ..auth_utils import get_current_user, get_db
+from ..auth_utils import get_current_principal, get_db
 
 router = APIRouter(prefix="/pdf", tags=["pdf"])
 logger = logging.getLogger(__name__)
@@ -424,9 +425,9 @@ async def debug_clan_rules(clan_id: int, db: Session = Depends(get_db)):
 def generate_pdf(
     reservation_id: int,
     db: Session = Depends(get_db),
-    current: User = Depends(get_current_user)
+    current: Principal = Depends(get_current_principal)
 ):
-    """Generate PDF for a reservation."""
+    """Queue PDF generation for a reservation; poll /pdf/status for progress."""
     reservation = db.query(Reservation).filter(
         Reservation.id == reservation_id,
         Reservation.groom_id == current.id
@@ -442,28 +443,22 @@ def generate_pdf(
             "pdf_url": f"/pdf/download/{reservation.id}"
         }
 
-    # Generate PDF
-    try:
-        pdf_path = generate_wedding_pdf(reservation, "generated_pdfs", db)
-        reservation.pdf_url = pdf_path
-        db.commit()
-
-        return {
-            "message": "تم إنشاء PDF بنجاح",
-            "pdf_url": f"/pdf/download/{reservation.id}"
-        }
-    except Exception as e:
-        logger.error(f"PDF generation failed: {e}")
-        raise HTTPException(500, f"خطأ في إنشاء PDF: {str(e)}")
+    job = pdf_worker_pool.submit(reservation.id)
+    return {
+        "message": "جارٍ إنشاء PDF",
+        "job_id": job.id,
+        "status": job.status.value,
+        "status_url": f"/pdf/status/{reservation.id}"
+    }
 
 
 @router.post("/regenerate/{reservation_id}")
 def regenerate_pdf(
     reservation_id: int,
     db: Session = Depends(get_db),
-    current: User = Depends(get_current_user)
+    current: Principal = Depends(get_current_principal)
 ):
-    """Force regenerate PDF (overwrites existing)."""
+    """Force regenerate PDF (overwrites existing) in the background."""
     reservation = db.query(Reservation).filter(
         Reservation.id == reservation_id,
         Reservation.groom_id == current.id
@@ -472,25 +467,20 @@ def regenerate_pdf(
     if not reservation:
         raise HTTPException(404, "الحجز غير موجود")
 
-    try:
-        pdf_path = generate_wedding_pdf(reservation, "generated_pdfs", db)
-        reservation.pdf_url = pdf_path
-        db.commit()
-
-        return {
-            "message": "تم إعادة إنشاء PDF بنجاح",
-            "pdf_url": f"/pdf/download/{reservation.id}"
-        }
-    except Exception as e:
-        logger.error(f"PDF regeneration failed: {e}")
-        raise HTTPException(500, f"خطأ في إعادة إنشاء PDF: {str(e)}")
+    job = pdf_worker_pool.submit(reservation.id)
+    return {
+        "message": "جارٍ إعادة إنشاء PDF",
+        "job_id": job.id,
+        "status": job.status.value,
+        "status_url": f"/pdf/status/{reservation.id}"
+    }
 
 
 @router.get("/download/{reservation_id}")
 def download_pdf(
     reservation_id: int,
     db: Session = Depends(get_db),
-    current: User = Depends(get_current_user)
+    current: Principal = Depends(get_current_principal)
 ):
     """Download PDF for a reservation."""
     reservation = db.query(Reservation).filter(
@@ -525,9 +515,9 @@ def download_pdf(
 def check_pdf_status(
     reservation_id: int,
     db: Session = Depends(get_db),
-    current: User = Depends(get_current_user)
+    current: Principal = Depends(get_current_principal)
 ):
-    """Check if PDF exists for a reservation."""
+    """Check if PDF exists for a reservation, and the progress of its job."""
     reservation = db.query(Reservation).filter(
         Reservation.id == reservation_id,
         Reservation.groom_id == current.id
@@ -540,8 +530,19 @@ def check_pdf_status(
         reservation.pdf_url and os.path.exists(reservation.pdf_url)
     )
 
+    # Jobs are tracked per process: another worker's job shows up through
+    # pdf_exists once it is done
+    job = pdf_worker_pool.job_for_reservation(reservation_id)
+    if job:
+        job_status = job.status.value
+    else:
+        job_status = PdfJobStatus.done.value if pdf_exists else None
+
     return {
         "reservation_id": reservation_id,
         "pdf_exists": pdf_exists,
-        "pdf_url": f"/pdf/download/{reservation.id}" if pdf_exists else None
+        "pdf_url": f"/pdf/download/{reservation.id}" if pdf_exists else None,
+        "job_id": job.id if job else None,
+        "job_status": job_status,
+        "error": job.error if job and job.status == PdfJobStatus.failed else None
     }
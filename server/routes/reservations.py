@@ -8,40 +8,51 @@ from server.schemas.reservations_special import ReservationSpecialStatus
 import server.utils.notification_service
 import subprocess
 from typing import Dict, List, Optional
-from sqlalchemy import text
 from typing import List, Dict, Optional
 from calendar import monthrange
 from typing import List, Optional
-from sqlalchemy.orm import joinedload
 import os
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, case, or_, select, true, union_all
 from datetime import date, timedelta, datetime
 
 from server.models.clan import Clan
 from server.models.hall import Hall
-from server.utils.pdf_generator import generate_wedding_pdf, test_pdf_generation
 from server.models.user import User
-from ..auth_utils import get_current_user, get_db, require_role
+from ..auth_utils import get_current_principal, get_current_user, get_db, require_principal_role
 from ..models.user import User, UserRole
 from ..models.reservation import PaymentStatus, Reservation, ReservationStatus
 from ..models.clan_settings import ClanSettings
-from ..schemas.reservation import ReservationCreate, ReservationCreateResponse, ReservationOut
+from ..schemas.reservation import (
+    CalendarDayOut, CalendarDayStatus, ClanCalendarOut,
+    ReservationCreate, ReservationCreateResponse, ReservationOut)
 from ..utils.notification_service import NotificationService
+from ..utils.pagination import PageParams, page_response, paginate
+from ..utils.serialization import FastJSONResponse, ListSerializer
+from ..utils.reservation_export import stream_csv, stream_ndjson
+from ..utils.reservation_views import (
+    CLAN_RESERVATIONS_VIEW, GROOM_PENDING_VIEW, GROOM_RESERVATIONS_VIEW, RESERVATION_VIEW)
+from ..utils.reservation_stats import day_range, month_range, validated_summary, year_range
+from ..utils.clan_versions import etag as clan_etag
+from ..utils.conflict_evaluator import evaluate_conflicts, load_day_availability
+from ..utils.day_slots import claim_days
+from ..utils.principal_cache import Principal
 from datetime import datetime, date
-from sqlalchemy import extract, func
+from sqlalchemy import func
 
 router = APIRouter(
     prefix="/reservations",
     tags=["reservations"]
 )
 
-groom_required = require_role([UserRole.groom])
-clan_admin_required = require_role([UserRole.clan_admin])
+groom_required = require_principal_role([UserRole.groom])
+clan_admin_required = require_principal_role([UserRole.clan_admin])
+
+reservation_list = ListSerializer(ReservationOut)
 
 ##
 
@@ -66,232 +77,11 @@ def validate_guardian_completeness(user: User) -> bool:
     return all(field is not None and str(field).strip() for field in required_fields)
 
 
-def get_mass_wedding_groups_for_date(db: Session, base_filters: List, target_date: date) -> List[Dict]:
-    """Get all mass wedding groups for a specific date"""
-    mass_weddings = db.query(Reservation).filter(
-        *base_filters,
-        Reservation.status != ReservationStatus.cancelled,
-        or_(Reservation.allow_others == True,
-            Reservation.join_to_mass_wedding == True),
-        or_(Reservation.date1 == target_date, Reservation.date2 == target_date)
-    ).all()
-
-    # Group by wedding leader (first groom who created the mass wedding)
-    groups = {}
-    for wedding in mass_weddings:
-        # Find the earliest reservation for this date combination
-        key = f"{wedding.date1}_{wedding.date2}"
-        if key not in groups:
-            groups[key] = {
-                'leader_id': wedding.groom_id,
-                'date1': wedding.date1,
-                'date2': wedding.date2,
-                'reservations': []
-            }
-        groups[key]['reservations'].append(wedding)
-
-    return list(groups.values())
-
-
-def check_date_conflicts(db: Session, base_filters: List, date1: date, date2: Optional[date],
-                         settings: ClanSettings, clan_name: str) -> None:
-    """Comprehensive date conflict checking"""
-
-    dates_to_check = [date1] + ([date2] if date2 else [])
-
-    # Check solo wedding conflicts (validated and pending)
-    for check_date in dates_to_check:
-        solo_conflicts = db.query(Reservation).filter(
-            *base_filters,
-            Reservation.status != ReservationStatus.cancelled,
-            and_(
-                Reservation.allow_others == False,
-                Reservation.join_to_mass_wedding == False
-            ),
-            or_(Reservation.date1 == check_date,
-                Reservation.date2 == check_date)
-        ).all()
-
-        for solo in solo_conflicts:
-            if solo.status == ReservationStatus.validated:
-                raise HTTPException(
-                    400, f"التاريخ {check_date} محجوز بالفعل")
-            elif solo.status == ReservationStatus.pending_validation:
-                raise HTTPException(400,
-                                    f"التاريخ {check_date} محجوز لكن غير مصدق عليه. \n"
-                                    f"تحقق مرة أخرى خلال الايام القادمة\n")
-
-
-def check_mass_wedding_conflicts(db: Session, base_filters: List, date1: date,
-                                 date2: Optional[date], resv_in: ReservationCreate,
-                                 settings: ClanSettings, clan_name: str) -> None:
-    """Check mass wedding conflicts including two-day scenarios"""
-
-    dates_to_check = [date1] + ([date2] if date2 else [])
-
-    # Get all mass weddings for both dates
-    all_mass_weddings = {}
-    for check_date in dates_to_check:
-        groups = get_mass_wedding_groups_for_date(db, base_filters, check_date)
-        all_mass_weddings[check_date] = groups
-
-    if date2:  # Two-day reservation
-        day1_groups = all_mass_weddings.get(date1, [])
-        day2_groups = all_mass_weddings.get(date2, [])
-
-        # Handle asymmetric mass wedding joining cases
-        if day1_groups and not day2_groups:
-            # Day 1 has mass wedding, Day 2 is free
-            # This is allowed - extends the mass wedding
-            pass
-        elif not day1_groups and day2_groups:
-            # Day 1 is free, Day 2 has mass wedding
-            # CRITICAL CASE: Cannot join mass wedding as second day
-            if resv_in.join_to_mass_wedding or resv_in.allow_others:
-                raise HTTPException(400,
-                                    f"لا يمكن الانضمام لعرس جماعي كيوم ثاني. \n"
-                                    f"اجعل يومك الأول نفس يوم العرس الجماعي {date2}، \n"
-                                    f"أو احجز يوماً واحداً فقط في {date1}")
-            else:
-                # Solo reservation where day 2 has mass wedding - not allowed
-                raise HTTPException(400,
-                                    f"التاريخ {date2} محجوز لعرس جماعي. \n"
-                                    f"اختر تاريخاً آخر للحجز أو فعل خاصية الانضمام للعرس الجماعي")
-
-        elif day1_groups and day2_groups:
-            # Both days have mass weddings
-            day1_leaders = {group['leader_id'] for group in day1_groups}
-            day2_leaders = {group['leader_id'] for group in day2_groups}
-
-            # If there's no intersection, they're different mass weddings
-            if not day1_leaders.intersection(day2_leaders):
-                raise HTTPException(400,
-                                    f"لا يمكن الحجز في عرسين جماعيين مختلفين. \n"
-                                    f"يمكنك الحجز ليوم واحد فقط في {date1} أو {date2}")
-
-            # Same mass wedding group - check if trying to join
-            if not resv_in.join_to_mass_wedding and not resv_in.allow_others:
-                raise HTTPException(400,
-                                    f"التواريخ {date1} و {date2} محجوزة لعرس جماعي. \n"
-                                    f"فعل خاصية الانضمام لعرس جماعي")
-
-    # Check individual date mass wedding conflicts
-    for check_date in dates_to_check:
-        groups = all_mass_weddings.get(check_date, [])
-
-        for group in groups:
-            # Check capacity
-            current_count = len(group['reservations'])
-            if current_count >= settings.max_grooms_per_date:
-                raise HTTPException(
-                    400, f"التاريخ {check_date} محجوز بالكامل")
-
-            # Check if requesting solo when mass wedding exists
-            if not resv_in.join_to_mass_wedding and not resv_in.allow_others:
-                raise HTTPException(400,
-                                    f"التاريخ {check_date} محجوز لعرس جماعي. \n"
-                                    f"فعل خاصية الانضمام إذا كنت ترغب: {current_count}/{settings.max_grooms_per_date} عريس\n")
-
-            # # Check pending mass weddings
-            # pending_in_group = any(r.status == ReservationStatus.pending_validation
-            #                        for r in group['reservations'])
-
-            # if pending_in_group and resv_in.join_to_mass_wedding:
-            #     raise HTTPException(400,
-            #                         f"التاريخ {check_date} محجوز لكن غير مصدق عليه. "
-            #                         f"جرب مرة أخرى خلال {settings.validation_deadline_days} أيام كحد أقصى")
-
-
-def check_cross_clan_restrictions(db: Session, base_filters: List, current_user: User,
-                                  resv_in: ReservationCreate, target_clan: Optional[Clan],
-                                  settings: ClanSettings, date1: date, date2: Optional[date]) -> None:
-    """Check all cross-clan related restrictions"""
-
-    is_same_clan = resv_in.clan_id == current_user.clan_id
-    if is_same_clan:
-        return
-
-    clan_n = db.query(Clan).filter(
-        Clan.id == resv_in.clan_id,
-    ).first()
-    # Cross-clan permission check
-    if not getattr(settings, 'allow_cross_clan_reservations', False):
-        raise HTTPException(
-            400, f"هذه العشيرة ({clan_n.name}) لا تقبل الحجوزات من العشائر الأخرى")
-
-    dates_to_check = [date1] + ([date2] if date2 else [])
-
-    # Cross-clan capacity check
-    for check_date in dates_to_check:
-        cross_limit = getattr(
-            settings, 'max_cross_clan_per_date', settings.max_grooms_per_date // 2)
-
-        cross_count = db.query(Reservation).filter(
-            *base_filters,
-            Reservation.status != ReservationStatus.cancelled,
-            Reservation.groom_id.in_(
-                db.query(User.id).filter(User.clan_id != resv_in.clan_id)
-            ),
-            or_(Reservation.date1 == check_date,
-                Reservation.date2 == check_date)
-        ).count()
-
-        if cross_count >= cross_limit:
-            raise HTTPException(400,
-                                f"تم الوصول للحد الأقصى للحجوزات بين العشائر لتاريخ {check_date}: "
-                                f"{cross_count}/{cross_limit}")
-
-    # Same-clan priority check
-    if getattr(settings, 'prioritize_same_clan', True):
-        same_clan_pending = db.query(Reservation).filter(
-            *base_filters,
-            Reservation.groom_id.in_(
-                db.query(User.id).filter(User.clan_id == resv_in.clan_id)
-            ),
-            Reservation.status == ReservationStatus.pending_validation,
-            or_(
-                *[or_(Reservation.date1 == d, Reservation.date2 == d) for d in dates_to_check]
-            )
-        ).first()
-
-        if same_clan_pending:
-            raise HTTPException(400,
-                                f"حجوزات نفس العشيرة لها الأولوية. يوجد حجز معلق من أعضاء عشيرة {target_clan.name}")
-
-
-def check_capacity_limits(db: Session, base_filters: List, settings: ClanSettings,
-                          date1: date, date2: Optional[date], clan_name: str) -> None:
-    """Check capacity limits for all dates"""
-
-    dates_to_check = [date1] + ([date2] if date2 else [])
-
-    for check_date in dates_to_check:
-        # Total capacity check
-        total_count = db.query(Reservation).filter(
-            *base_filters,
-            Reservation.status != ReservationStatus.cancelled,
-            or_(Reservation.date1 == check_date,
-                Reservation.date2 == check_date)
-        ).count()
-
-        if total_count >= settings.max_grooms_per_date:
-            raise HTTPException(
-                400, f"التاريخ {check_date} محجوز بالكامل")
-
-
 @router.post("", response_model=ReservationCreateResponse, dependencies=[Depends(groom_required)])
 def create_reservation(resv_in: ReservationCreate, db: Session = Depends(get_db),
-                       current: User = Depends(groom_required)):
+                       current: User = Depends(get_current_user)):
 
     try:
-        # Test PDF generation capabilities on first run
-        try:
-            test_result = test_pdf_generation()
-            if not test_result:
-                logger.warning("PDF generation test failed, but proceeding...")
-        except Exception as e:
-            logger.warning(f"PDF generation test error: {e}")
-
         # BV004-BV005: Check for existing active reservation
         existing_active = db.query(Reservation).filter(
             Reservation.county_id == current.county_id,
@@ -353,35 +143,11 @@ def create_reservation(resv_in: ReservationCreate, db: Session = Depends(get_db)
             if date2.month != date1.month and date2.month not in allowed_months:
                 raise HTTPException(400, "الشهر الثاني لا يسمح بحجوزات يومين")
 
-        clan_name = f" في  {target_clan.name}" if not is_same_clan else ""
-
-        # Build base query filters
-        base_filters = [
-            Reservation.county_id == current.county_id,
-            Reservation.clan_id == resv_in.clan_id
-        ]
-
-        # Use SELECT FOR UPDATE to prevent race conditions
-        db.execute(text(
-            "SELECT 1 FROM reservations WHERE county_id = :county_id AND clan_id = :clan_id "
-            "AND status != 'cancelled' AND (date1 = :date1 OR date2 = :date1 "
-            + ("OR date1 = :date2 OR date2 = :date2" if date2 else "") + ") FOR UPDATE"
-        ), {
-            'county_id': current.county_id,
-            'clan_id': resv_in.clan_id,
-            'date1': date1,
-            'date2': date2
-        })
-
-        # Comprehensive conflict checking
-        check_date_conflicts(db, base_filters, date1,
-                             date2, settings, clan_name)
-        check_mass_wedding_conflicts(
-            db, base_filters, date1, date2, resv_in, settings, clan_name)
-        check_cross_clan_restrictions(
-            db, base_filters, current, resv_in, target_clan, settings, date1, date2)
-        check_capacity_limits(db, base_filters, settings,
-                              date1, date2, clan_name)
+        # Read the requested days in one query; claim_days() below settles races
+        days = load_day_availability(
+            db, current.county_id, resv_in.clan_id, [date1, date2])
+        evaluate_conflicts(days, date1, date2, resv_in,
+                           settings, is_same_clan, target_clan)
 
         # Get groom and clan info for reservation
         groom = db.query(User).filter(User.id == current.id).first()
@@ -432,6 +198,11 @@ def create_reservation(resv_in: ReservationCreate, db: Session = Depends(get_db)
         )
 
         db.add(resv)
+        try:
+            claim_days(db, resv, groom.clan_id, settings, is_same_clan)
+        except HTTPException:
+            db.rollback()
+            raise
         db.commit()
         db.refresh(resv)
         NotificationService.create_new_reservation_notification(
@@ -467,14 +238,6 @@ def create_reservation(groom_id: int, resv_in: ReservationCreate, db: Session =
         User.id == groom_id
     ).first()
     try:
-        # Test PDF generation capabilities on first run
-        try:
-            test_result = test_pdf_generation()
-            if not test_result:
-                logger.warning("PDF generation test failed, but proceeding...")
-        except Exception as e:
-            logger.warning(f"PDF generation test error: {e}")
-
         # BV004-BV005: Check for existing active reservation
         existing_active = db.query(Reservation).filter(
             Reservation.county_id == current.county_id,
@@ -536,35 +299,11 @@ def create_reservation(groom_id: int, resv_in: ReservationCreate, db: Session =
             if date2.month != date1.month and date2.month not in allowed_months:
                 raise HTTPException(400, "الشهر الثاني لا يسمح بحجوزات يومين")
 
-        clan_name = f" في  {target_clan.name}" if not is_same_clan else ""
-
-        # Build base query filters
-        base_filters = [
-            Reservation.county_id == current.county_id,
-            Reservation.clan_id == resv_in.clan_id
-        ]
-
-        # Use SELECT FOR UPDATE to prevent race conditions
-        db.execute(text(
-            "SELECT 1 FROM reservations WHERE county_id = :county_id AND clan_id = :clan_id "
-            "AND status != 'cancelled' AND (date1 = :date1 OR date2 = :date1 "
-            + ("OR date1 = :date2 OR date2 = :date2" if date2 else "") + ") FOR UPDATE"
-        ), {
-            'county_id': current.county_id,
-            'clan_id': resv_in.clan_id,
-            'date1': date1,
-            'date2': date2
-        })
-
-        # Comprehensive conflict checking
-        check_date_conflicts(db, base_filters, date1,
-                             date2, settings, clan_name)
-        check_mass_wedding_conflicts(
-            db, base_filters, date1, date2, resv_in, settings, clan_name)
-        check_cross_clan_restrictions(
-            db, base_filters, current, resv_in, target_clan, settings, date1, date2)
-        check_capacity_limits(db, base_filters, settings,
-                              date1, date2, clan_name)
+        # Read the requested days in one query; claim_days() below settles races
+        days = load_day_availability(
+            db, current.county_id, resv_in.clan_id, [date1, date2])
+        evaluate_conflicts(days, date1, date2, resv_in,
+                           settings, is_same_clan, target_clan)
 
         # Get groom and clan info for reservation
         groom = db.query(User).filter(User.id == current.id).first()
@@ -615,6 +354,11 @@ def create_reservation(groom_id: int, resv_in: ReservationCreate, db: Session =
         )
 
         db.add(resv)
+        try:
+            claim_days(db, resv, groom.clan_id, settings, is_same_clan)
+        except HTTPException:
+            db.rollback()
+            raise
         db.commit()
         db.refresh(resv)
         NotificationService.create_new_reservation_notification(
@@ -649,36 +393,39 @@ def get_settings_for_clan(db, clan_id):
 
 
 @router.get("/pending_reservations", response_model=list[ReservationOut])
-def list_clan_reservations(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
-    return db.query(Reservation).filter(
+def list_clan_reservations(db: Session = Depends(get_db), current: Principal = Depends(get_current_principal)):
+    reservations = db.query(Reservation).filter(
         Reservation.county_id == current.county_id,
         Reservation.clan_id == current.clan_id,
         Reservation.status == ReservationStatus.pending_validation
 
     ).all()
+    return reservation_list.response(reservations, from_attributes=True)
 
 # get all validated Reservations
 
 
 @router.get("/validated_reservations", response_model=list[ReservationOut])
-def list_clan_reservations(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
-    return db.query(Reservation).filter(
+def list_clan_reservations(db: Session = Depends(get_db), current: Principal = Depends(get_current_principal)):
+    reservations = db.query(Reservation).filter(
         Reservation.county_id == current.county_id,
         Reservation.clan_id == current.clan_id,
         Reservation.status == ReservationStatus.validated
 
     ).all()
+    return reservation_list.response(reservations, from_attributes=True)
 
 
 # get all pending Reservations
 @router.get("/cancled_reservations", response_model=list[ReservationOut])
-def list_clan_reservations(db: Session = Depends(get_db), current: User = Depends(get_current_user)):
-    return db.query(Reservation).filter(
+def list_clan_reservations(db: Session = Depends(get_db), current: Principal = Depends(get_current_principal)):
+    reservations = db.query(Reservation).filter(
         Reservation.county_id == current.county_id,
         Reservation.clan_id == current.clan_id,
         Reservation.status == ReservationStatus.cancelled
 
     ).all()
+    return reservation_list.response(reservations, from_attributes=True)
 
 
 @router.get("/download/{reservation_id}")
@@ -692,7 +439,7 @@ def download_pdf(reservation_id: int):
 
 # a groom cancel his reservation if is on status of pending validation
 @router.post("/{groom_id}/cancel", response_model=ReservationOut, dependencies=[Depends(groom_required)])
-def cancel_my_reservation(groom_id: int, db: Session = Depends(get_db), current: User = Depends(groom_required)):
+def cancel_my_reservation(groom_id: int, db: Session = Depends(get_db), current: User = Depends(get_current_user)):
     clan_admin = db.query(User).filter(
         User.clan_id == current.clan_id,
         User.role == UserRole.clan_admin
@@ -730,7 +477,7 @@ def cancel_my_reservation(groom_id: int, db: Session = Depends(get_db), current:
 
 # a clan admin valide a reservation by groom id
 @router.post("/{groom_id}/validate", response_model=ReservationOut, dependencies=[Depends(clan_admin_required)])
-def validate_reservation(groom_id: int, db: Session = Depends(get_db), current: User = Depends(clan_admin_required)):
+def validate_reservation(groom_id: int, db: Session = Depends(get_db), current: Principal = Depends(clan_admin_required)):
     resv_duplicated_check = db.query(Reservation).filter(
         Reservation.county_id == current.county_id,
         Reservation.groom_id == groom_id,
@@ -778,7 +525,7 @@ def validate_reservation(groom_id: int, db: Session = Depends(get_db), current:
 
 # a clan admin cancel a reservation by groom id
 @router.post("/{groom_id}/cancel_by_clan_admin", response_model=dict, dependencies=[Depends(clan_admin_required)])
-def cancel_a_groom_reservation(groom_id: int, db: Session = Depends(get_db), current: User = Depends(clan_admin_required)):
+def cancel_a_groom_reservation(groom_id: int, db: Session = Depends(get_db), current: Principal = Depends(clan_admin_required)):
 
     clan_name = db.query(Clan).filter(
         Clan.id == current.clan_id
@@ -817,7 +564,7 @@ def cancel_a_groom_reservation(groom_id: int, db: Session = Depends(get_db), cur
     }
 
 
-@router.delete("/delete_res/{reservation_id}", response_model=dict, dependencies=[Depends(get_current_user)])
+@router.delete("/delete_res/{reservation_id}", response_model=dict, dependencies=[Depends(get_current_principal)])
 def delete_reservation(reservation_id: int, db: Session = Depends(get_db)):
     resv = db.query(Reservation).filter(
         Reservation.id == reservation_id,
@@ -831,284 +578,63 @@ def delete_reservation(reservation_id: int, db: Session = Depends(get_db)):
 
 @router.get("/reservations/my_all_reservations")
 def get_my_all_reservations(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get all reservations for the current groom with joined data"""
-    reservations = db.query(Reservation).options(
-        joinedload(Reservation.groom).joinedload(
-            User.clan),  # Load groom and groom's clan
-        joinedload(Reservation.clan),
-        joinedload(Reservation.county),
-        joinedload(Reservation.hall),
-        joinedload(Reservation.haia_committee),
-        joinedload(Reservation.madaeh_committee)
-    ).filter(Reservation.groom_id == current_user.id).all()
-
-    result = []
-    for reservation in reservations:
-        reservation_dict = {
-            "id": reservation.id,
-            "groom_id": reservation.groom_id,
-            "clan_id_origin": reservation.groom.clan_id if reservation.groom else None,
-            "clan_name_origin": reservation.groom.clan.name if reservation.groom and reservation.groom.clan else None,
-            "clan_id": reservation.clan_id,
-            "county_id": reservation.county_id,
-            "date1": str(reservation.date1) if reservation.date1 else None,
-            "date2": str(reservation.date2) if reservation.date2 else None,
-            "date2_bool": reservation.date2_bool,
-            "allow_others": reservation.allow_others,
-            "join_to_mass_wedding": reservation.join_to_mass_wedding,
-            "status": reservation.status,
-            "created_at": reservation.created_at.isoformat() if reservation.created_at else None,
-
-            # Joined data
-            "clan_name": reservation.clan.name if reservation.clan else None,
-            "county_name": reservation.county.name if reservation.county else None,
-            "hall_name": reservation.hall.name if reservation.hall else None,
-            "hall_id": reservation.hall_id,
-
-            # Committee information
-            "haia_committee_id": reservation.haia_committee_id,
-            "haia_committee_name": reservation.haia_committee.name if reservation.haia_committee else None,
-            "madaeh_committee_id": reservation.madaeh_committee_id,
-            "custom_madaeh_committee_name": reservation.custom_madaeh_committee_name,
-            'tilawa_type': reservation.tilawa_type,
-            "madaeh_committee_name": reservation.madaeh_committee.name if reservation.madaeh_committee else None,
-
-            # Personal information
-            "pdf_url": reservation.pdf_url,
-            "first_name": reservation.first_name,
-            "last_name": reservation.last_name,
-            "father_name": reservation.father_name,
-            "grandfather_name": reservation.grandfather_name,
-            "birth_date": str(reservation.birth_date) if reservation.birth_date else None,
-            "birth_address": reservation.birth_address,
-            "home_address": reservation.home_address,
-            "phone_number": reservation.phone_number,
-            "payment_valid": reservation.payment_status,
-
-            # Guardian information
-            "guardian_name": reservation.guardian_name,
-            "guardian_phone": reservation.guardian_phone,
-            "guardian_home_address": reservation.guardian_home_address,
-            "guardian_birth_address": reservation.guardian_birth_address,
-            "guardian_birth_date": str(reservation.guardian_birth_date) if reservation.guardian_birth_date else None,
-        }
-        result.append(reservation_dict)
-
-    return result
+    rows = GROOM_RESERVATIONS_VIEW.query(db).filter(
+        Reservation.groom_id == current_user.id
+    ).all()
+    return FastJSONResponse(GROOM_RESERVATIONS_VIEW.to_dicts(rows))
 
 
 @router.get("/reservations/my_pending_reservation")
 def get_my_pending_reservation(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get pending reservation for the current groom with joined data"""
-    reservation = db.query(Reservation).options(
-        joinedload(Reservation.groom).joinedload(
-            User.clan),
-        joinedload(Reservation.clan),
-        joinedload(Reservation.county),
-        joinedload(Reservation.hall),
-        joinedload(Reservation.haia_committee),
-        joinedload(Reservation.madaeh_committee)
-    ).filter(
+    row = GROOM_PENDING_VIEW.query(db).filter(
         Reservation.groom_id == current_user.id,
         Reservation.status == ReservationStatus.pending_validation
     ).first()
 
-    if not reservation:
+    if not row:
         raise HTTPException(
             status_code=404, detail="لا يوجد حجز معلق")
 
-    return {
-        "id": reservation.id,
-        "groom_id": reservation.groom_id,
-        "clan_id_origin": reservation.groom.clan_id if reservation.groom else None,
-        "clan_name_origin": reservation.groom.clan.name if reservation.groom and reservation.groom.clan else None,
-        "clan_id": reservation.clan_id,
-        "county_id": reservation.county_id,
-        "date1": str(reservation.date1) if reservation.date1 else None,
-        "date2": str(reservation.date2) if reservation.date2 else None,
-        "date2_bool": reservation.date2_bool,
-        "allow_others": reservation.allow_others,
-        "join_to_mass_wedding": reservation.join_to_mass_wedding,
-        "status": reservation.status,
-        "created_at": reservation.created_at.isoformat() if reservation.created_at else None,
-
-        # Joined data
-        "clan_name": reservation.clan.name if reservation.clan else None,
-        "county_name": reservation.county.name if reservation.county else None,
-        "hall_name": reservation.hall.name if reservation.hall else None,
-        "hall_id": reservation.hall_id,
-
-        # Committee information
-        "haia_committee_id": reservation.haia_committee_id,
-        "haia_committee_name": reservation.haia_committee.name if reservation.haia_committee else None,
-        "madaeh_committee_id": reservation.madaeh_committee_id,
-        "custom_madaeh_committee_name": reservation.custom_madaeh_committee_name,
-        'tilawa_type': reservation.tilawa_type,
-        "madaeh_committee_name": reservation.madaeh_committee.name if reservation.madaeh_committee else None,
-
-        # Personal information
-        "pdf_url": reservation.pdf_url,
-        "first_name": reservation.first_name,
-        "last_name": reservation.last_name,
-        "father_name": reservation.father_name,
-        "grandfather_name": reservation.grandfather_name,
-        "birth_date": str(reservation.birth_date) if reservation.birth_date else None,
-        "birth_address": reservation.birth_address,
-        "home_address": reservation.home_address,
-        "phone_number": reservation.phone_number,
-
-        # Guardian information
-        "guardian_name": reservation.guardian_name,
-        "guardian_phone": reservation.guardian_phone,
-        "guardian_home_address": reservation.guardian_home_address,
-        "guardian_birth_address": reservation.guardian_birth_address,
-        "guardian_birth_date": str(reservation.guardian_birth_date) if reservation.guardian_birth_date else None,
-    }
+    return FastJSONResponse(GROOM_PENDING_VIEW.to_dict(row))
 
 
 @router.get("/reservations/my_validated_reservation")
 def get_my_validated_reservation(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get validated reservation for the current groom with joined data"""
-    reservation = db.query(Reservation).options(
-        joinedload(Reservation.clan),
-        joinedload(Reservation.county),
-        joinedload(Reservation.hall),
-        joinedload(Reservation.haia_committee),
-        joinedload(Reservation.madaeh_committee)
-    ).filter(
+    row = RESERVATION_VIEW.query(db).filter(
         Reservation.groom_id == current_user.id,
         Reservation.status == ReservationStatus.validated
     ).first()
 
-    if not reservation:
+    if not row:
         raise HTTPException(
             status_code=404, detail="لا يوجد حجز مؤكد")
 
-    return {
-        "id": reservation.id,
-        "groom_id": reservation.groom_id,
-        "clan_id": reservation.clan_id,
-        "county_id": reservation.county_id,
-        "date1": str(reservation.date1) if reservation.date1 else None,
-        "date2": str(reservation.date2) if reservation.date2 else None,
-        "date2_bool": reservation.date2_bool,
-        "allow_others": reservation.allow_others,
-        "join_to_mass_wedding": reservation.join_to_mass_wedding,
-        "status": reservation.status,
-        "created_at": reservation.created_at.isoformat() if reservation.created_at else None,
-
-        # Joined data
-        "clan_name": reservation.clan.name if reservation.clan else None,
-        "county_name": reservation.county.name if reservation.county else None,
-        "hall_name": reservation.hall.name if reservation.hall else None,
-        "hall_id": reservation.hall_id,
-
-        # Committee information
-        "haia_committee_id": reservation.haia_committee_id,
-        "haia_committee_name": reservation.haia_committee.name if reservation.haia_committee else None,
-        "madaeh_committee_id": reservation.madaeh_committee_id,
-        "custom_madaeh_committee_name": reservation.custom_madaeh_committee_name,
-        'tilawa_type': reservation.tilawa_type,
-        "madaeh_committee_name": reservation.madaeh_committee.name if reservation.madaeh_committee else None,
-
-        # Personal information
-        "pdf_url": reservation.pdf_url,
-        "first_name": reservation.first_name,
-        "last_name": reservation.last_name,
-        "father_name": reservation.father_name,
-        "grandfather_name": reservation.grandfather_name,
-        "birth_date": str(reservation.birth_date) if reservation.birth_date else None,
-        "birth_address": reservation.birth_address,
-        "home_address": reservation.home_address,
-        "phone_number": reservation.phone_number,
-        "payment_valid": reservation.payment_status,
-
-        # Guardian information
-        "guardian_name": reservation.guardian_name,
-        "guardian_phone": reservation.guardian_phone,
-        "guardian_home_address": reservation.guardian_home_address,
-        "guardian_birth_address": reservation.guardian_birth_address,
-        "guardian_birth_date": str(reservation.guardian_birth_date) if reservation.guardian_birth_date else None,
-    }
+    return FastJSONResponse(RESERVATION_VIEW.to_dict(row))
 
 
 @router.get("/reservations/my_cancelled_reservation")
 def get_my_cancelled_reservations(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get all cancelled reservations for the current groom with joined data"""
-    reservations = db.query(Reservation).options(
-        joinedload(Reservation.clan),
-        joinedload(Reservation.county),
-        joinedload(Reservation.hall),
-        joinedload(Reservation.haia_committee),
-        joinedload(Reservation.madaeh_committee)
-    ).filter(
+    rows = RESERVATION_VIEW.query(db).filter(
         Reservation.groom_id == current_user.id,
         Reservation.status == ReservationStatus.cancelled
     ).all()
-
-    result = []
-    for reservation in reservations:
-        reservation_dict = {
-            "id": reservation.id,
-            "groom_id": reservation.groom_id,
-            "clan_id": reservation.clan_id,
-            "county_id": reservation.county_id,
-            "date1": str(reservation.date1) if reservation.date1 else None,
-            "date2": str(reservation.date2) if reservation.date2 else None,
-            "date2_bool": reservation.date2_bool,
-            "allow_others": reservation.allow_others,
-            "join_to_mass_wedding": reservation.join_to_mass_wedding,
-            "status": reservation.status,
-            "created_at": reservation.created_at.isoformat() if reservation.created_at else None,
-
-            # Joined data
-            "clan_name": reservation.clan.name if reservation.clan else None,
-            "county_name": reservation.county.name if reservation.county else None,
-            "hall_name": reservation.hall.name if reservation.hall else None,
-            "hall_id": reservation.hall_id,
-
-            # Committee information
-            "haia_committee_id": reservation.haia_committee_id,
-            "haia_committee_name": reservation.haia_committee.name if reservation.haia_committee else None,
-            "madaeh_committee_id": reservation.madaeh_committee_id,
-            "custom_madaeh_committee_name": reservation.custom_madaeh_committee_name,
-            'tilawa_type': reservation.tilawa_type,
-            "madaeh_committee_name": reservation.madaeh_committee.name if reservation.madaeh_committee else None,
-
-            # Personal information
-            "pdf_url": reservation.pdf_url,
-            "first_name": reservation.first_name,
-            "last_name": reservation.last_name,
-            "father_name": reservation.father_name,
-            "grandfather_name": reservation.grandfather_name,
-            "birth_date": str(reservation.birth_date) if reservation.birth_date else None,
-            "birth_address": reservation.birth_address,
-            "home_address": reservation.home_address,
-            "phone_number": reservation.phone_number,
-            "payment_valid": reservation.payment_status,
-
-            # Guardian information
-            "guardian_name": reservation.guardian_name,
-            "guardian_phone": reservation.guardian_phone,
-            "guardian_home_address": reservation.guardian_home_address,
-            "guardian_birth_address": reservation.guardian_birth_address,
-            "guardian_birth_date": str(reservation.guardian_birth_date) if reservation.guardian_birth_date else None,
-        }
-        result.append(reservation_dict)
-
-    return result
+    return FastJSONResponse(RESERVATION_VIEW.to_dicts(rows))
 
 # Update the cancel reservation endpoint to use reservation ID instead of groom ID
 
@@ -1116,7 +642,7 @@ def get_my_cancelled_reservations(
 @router.post("/reservations/{reservation_id}/cancel")
 def cancel_reservation(
     reservation_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Cancel a reservation by its ID"""
@@ -1146,152 +672,68 @@ def cancel_reservation(
 
 @router.get("/reservations/all_reservations")
 def get_all_reservations(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+    page: PageParams = Depends()
 ):
-    """Get all reservations for the current clan admin's clan with joined data"""
-    reservations = db.query(Reservation).options(
-        joinedload(Reservation.clan),
-        joinedload(Reservation.county),
-        joinedload(Reservation.hall),
-        joinedload(Reservation.haia_committee),
-        joinedload(Reservation.madaeh_committee),
-        joinedload(Reservation.groom)
-    ).filter(Reservation.clan_id == current_user.clan_id).all()
-
-    result = []
-    for reservation in reservations:
-        reservation_dict = {
-            "id": reservation.id,
-            "groom_id": reservation.groom_id,
-            "clan_id": reservation.clan_id,
-            "county_id": reservation.county_id,
-            "date1": str(reservation.date1) if reservation.date1 else None,
-            "date2": str(reservation.date2) if reservation.date2 else None,
-            "date2_bool": reservation.date2_bool,
-            "allow_others": reservation.allow_others,
-            "join_to_mass_wedding": reservation.join_to_mass_wedding,
-            "status": reservation.status,
-            "created_at": reservation.created_at.isoformat() if reservation.created_at else None,
-
-            # Joined data
-            "clan_name": reservation.clan.name if reservation.clan else None,
-            "county_name": reservation.county.name if reservation.county else None,
-            "hall_name": reservation.hall.name if reservation.hall else None,
-            "hall_id": reservation.hall_id,
-
-            # Committee information
-            "haia_committee_id": reservation.haia_committee_id,
-            "haia_committee_name": reservation.haia_committee.name if reservation.haia_committee else None,
-            "madaeh_committee_id": reservation.madaeh_committee_id,
-            "custom_madaeh_committee_name": reservation.custom_madaeh_committee_name,
-            'tilawa_type': reservation.tilawa_type,
-            "madaeh_committee_name": reservation.madaeh_committee.name if reservation.madaeh_committee else None,
-
-            # Groom information
-            "groom_first_name": reservation.groom.first_name if reservation.groom else None,
-            "groom_last_name": reservation.groom.last_name if reservation.groom else None,
-            "groom_phone_number": reservation.groom.phone_number if reservation.groom else None,
-
-            # Personal information from reservation
-            "pdf_url": reservation.pdf_url,
-            "first_name": reservation.first_name,
-            "last_name": reservation.last_name,
-            "father_name": reservation.father_name,
-            "grandfather_name": reservation.grandfather_name,
-            "birth_date": str(reservation.birth_date) if reservation.birth_date else None,
-            "birth_address": reservation.birth_address,
-            "home_address": reservation.home_address,
-            "phone_number": reservation.phone_number,
-            "payment_valid": reservation.payment_status,
-
-            # Guardian information
-            "guardian_name": reservation.guardian_name,
-            "guardian_phone": reservation.guardian_phone,
-            "guardian_home_address": reservation.guardian_home_address,
-            "guardian_birth_address": reservation.guardian_birth_address,
-            "guardian_birth_date": str(reservation.guardian_birth_date) if reservation.guardian_birth_date else None,
-        }
-        result.append(reservation_dict)
-
-    return result
+    """Get all reservations for the current clan admin's clan with joined data (newest date1 first, keyset paginated with limit/cursor)"""
+    rows, next_cursor = paginate(CLAN_RESERVATIONS_VIEW.query(db).filter(
+        Reservation.clan_id == current_user.clan_id),
+        Reservation.date1, Reservation.id, page)
+    return FastJSONResponse(page_response(
+        CLAN_RESERVATIONS_VIEW.to_dicts(rows), next_cursor, page))
 
 
 @router.get("/clan_admin/all_reservations")
 def get_all_reservations_for_clan_admin(
-    current_user: User = Depends(clan_admin_required),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(clan_admin_required),
+    db: Session = Depends(get_db),
+    page: PageParams = Depends()
 ):
-    """Get all reservations for clan admin with explicit role check"""
+    """Get all reservations for clan admin with explicit role check (newest date1 first, keyset paginated with limit/cursor)"""
     if current_user.role != UserRole.clan_admin:
         raise HTTPException(
             status_code=403,
             detail="هذه الصفحة متاحة فقط لمديري العشائر"
         )
 
-    reservations = db.query(Reservation).options(
-        joinedload(Reservation.clan),
-        joinedload(Reservation.county),
-        joinedload(Reservation.hall),
-        joinedload(Reservation.haia_committee),
-        joinedload(Reservation.madaeh_committee),
-        joinedload(Reservation.groom)
-    ).filter(
+    rows, next_cursor = paginate(RESERVATION_VIEW.query(db).filter(
         Reservation.clan_id == current_user.clan_id,
         Reservation.county_id == current_user.county_id
-    ).all()
+    ), Reservation.date1, Reservation.id, page)
+    return FastJSONResponse(page_response(
+        RESERVATION_VIEW.to_dicts(rows), next_cursor, page))
 
-    result = []
-    for reservation in reservations:
-        reservation_dict = {
-            "id": reservation.id,
-            "groom_id": reservation.groom_id,
-            "clan_id": reservation.clan_id,
-            "county_id": reservation.county_id,
-            "date1": str(reservation.date1) if reservation.date1 else None,
-            "date2": str(reservation.date2) if reservation.date2 else None,
-            "date2_bool": reservation.date2_bool,
-            "allow_others": reservation.allow_others,
-            "join_to_mass_wedding": reservation.join_to_mass_wedding,
-            "status": reservation.status,
-            "payment_valid": reservation.payment_status,
-            "created_at": reservation.created_at.isoformat() if reservation.created_at else None,
-
-            # Joined data
-            "clan_name": reservation.clan.name if reservation.clan else None,
-            "county_name": reservation.county.name if reservation.county else None,
-            "hall_name": reservation.hall.name if reservation.hall else None,
-            "hall_id": reservation.hall_id,
-
-            # Committee information
-            "haia_committee_id": reservation.haia_committee_id,
-            "haia_committee_name": reservation.haia_committee.name if reservation.haia_committee else None,
-            "madaeh_committee_id": reservation.madaeh_committee_id,
-            "custom_madaeh_committee_name": reservation.custom_madaeh_committee_name,
-            'tilawa_type': reservation.tilawa_type,
-            "madaeh_committee_name": reservation.madaeh_committee.name if reservation.madaeh_committee else None,
 
-            # Personal information
-            "pdf_url": reservation.pdf_url,
-            "first_name": reservation.first_name,
-            "last_name": reservation.last_name,
-            "father_name": reservation.father_name,
-            "grandfather_name": reservation.grandfather_name,
-            "birth_date": str(reservation.birth_date) if reservation.birth_date else None,
-            "birth_address": reservation.birth_address,
-            "home_address": reservation.home_address,
-            "phone_number": reservation.phone_number,
+@router.get("/clan_admin/export")
+def export_reservations_for_clan_admin(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    current_user: Principal = Depends(clan_admin_required)
+):
+    """
+    Stream the clan's full reservation history as NDJSON (default) or CSV.
 
-            # Guardian information
-            "guardian_name": reservation.guardian_name,
-            "guardian_phone": reservation.guardian_phone,
-            "guardian_home_address": reservation.guardian_home_address,
-            "guardian_birth_address": reservation.guardian_birth_address,
-            "guardian_birth_date": str(reservation.guardian_birth_date) if reservation.guardian_birth_date else None,
-        }
-        result.append(reservation_dict)
+    Rows are read through a server-side cursor and sent as they are encoded,
+    so memory stays flat and the first bytes go out immediately.
+    """
+    if current_user.role != UserRole.clan_admin:
+        raise HTTPException(
+            status_code=403,
+            detail="هذه الصفحة متاحة فقط لمديري العشائر"
+        )
 
-    return result
+    filename = f"reservations_clan_{current_user.clan_id}_{date.today()}"
+    if export_format == "csv":
+        return StreamingResponse(
+            stream_csv(current_user.clan_id, current_user.county_id),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'}
+        )
+    return StreamingResponse(
+        stream_ndjson(current_user.clan_id, current_user.county_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}.ndjson"'}
+    )
 ##########
 
 
@@ -1372,36 +814,128 @@ def get_pending_dates(
         raise HTTPException(
             status_code=500, detail=f"خطأ في جلب التواريخ المعلقة: {str(e)}")
 
+
+@router.get("/calendar/{clan_id}", response_model=ClanCalendarOut)
+def get_clan_calendar(
+    clan_id: int,
+    request: Request,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    db: Session = Depends(get_db),
+):
+    """
+    Per-day availability of a clan between `from` and `to` (inclusive).
+
+    Only days that have at least one non-cancelled reservation are returned.
+    The response carries an ETag built from the clan's version, bumped by
+    every reservation or settings change, so a client polling with
+    If-None-Match gets a 304 after one primary-key lookup, whichever worker
+    serves it.
+    """
+    from_date = from_date or date.today()
+    to_date = to_date or from_date + timedelta(days=366)
+    if to_date < from_date:
+        raise HTTPException(
+            status_code=400, detail="تاريخ النهاية يجب أن يكون بعد تاريخ البداية")
+
+    etag = clan_etag(db, clan_id, from_date, to_date)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # date1 and date2 of every non-cancelled reservation in the range; a solo
+    # wedding (no mass-wedding flag) takes the whole day
+    is_solo = case((or_(Reservation.allow_others == True,
+                        Reservation.join_to_mass_wedding == True), 0), else_=1)
+    days_union = union_all(
+        select(Reservation.date1.label("day"), Reservation.status.label("status"),
+               is_solo.label("solo")).where(
+            Reservation.clan_id == clan_id,
+            Reservation.status != ReservationStatus.cancelled,
+            Reservation.date1.between(from_date, to_date)),
+        select(Reservation.date2.label("day"), Reservation.status.label("status"),
+               is_solo.label("solo")).where(
+            Reservation.clan_id == clan_id,
+            Reservation.status != ReservationStatus.cancelled,
+            Reservation.date2.between(from_date, to_date))
+    ).subquery()
+
+    # One statement: settings row joined to the per-day counts
+    rows = db.query(
+        ClanSettings.max_grooms_per_date,
+        days_union.c.day,
+        func.count(days_union.c.day).label("count"),
+        func.count(case(
+            (days_union.c.status == ReservationStatus.validated, 1))).label("validated"),
+        func.count(case((days_union.c.solo == 1, 1))).label("solo")
+    ).outerjoin(
+        days_union, true()
+    ).filter(
+        ClanSettings.clan_id == clan_id
+    ).group_by(
+        ClanSettings.max_grooms_per_date,
+        days_union.c.day
+    ).order_by(days_union.c.day).all()
+
+    if not rows:
+        raise HTTPException(
+            status_code=404, detail="إعدادات العشيرة غير موجودة")
+
+    max_grooms = rows[0].max_grooms_per_date
+    days = []
+    for row in rows:
+        if row.day is None:
+            continue
+        # Same rules as check_date_conflicts / check_mass_wedding_conflicts:
+        # a solo wedding, pending or validated, blocks every new booking
+        full = row.solo > 0 or row.count >= max_grooms
+        if full:
+            status = CalendarDayStatus.full
+        elif row.validated:
+            status = CalendarDayStatus.validated
+        else:
+            status = CalendarDayStatus.pending
+        days.append(CalendarDayOut(
+            day=row.day,
+            status=status,
+            count=row.count,
+            validated_count=row.validated,
+            pending_count=row.count - row.validated,
+            remaining_capacity=0 if full else max(max_grooms - row.count, 0)
+        ))
+
+    calendar = ClanCalendarOut(
+        clan_id=clan_id,
+        from_date=from_date,
+        to_date=to_date,
+        max_grooms_per_date=max_grooms,
+        days=days
+    )
+    return Response(
+        content=calendar.model_dump_json(),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "no-cache"}
+    )
+
 # routers for the statistics section
 
 
 # For a specific clan - by day
 @router.get("/valid_reservations_today")
 def get_valid_reservations_today(
+    include_reservations: bool = Query(True),
     db: Session = Depends(get_db),
-    current: User = Depends(get_current_user)
+    current: Principal = Depends(get_current_principal)
 ):
     """
     Get validated reservations for today for a specific clan
     """
     try:
         today = date.today()
-        reservations = db.query(Reservation).filter(
-            Reservation.county_id == current.county_id,
-            Reservation.clan_id == current.clan_id,
-            Reservation.status == ReservationStatus.validated,
-            func.date(Reservation.date1) == today
-        ).all()
-
+        summary = validated_summary(
+            db, current.county_id, *day_range(today),
+            clan_id=current.clan_id, include_reservations=include_reservations)
         return {
-            "count": len(reservations),
-            "reservations": [
-                {
-                    "id": res.id,
-                    "date1": res.date1.isoformat() if res.date1 else None
-                }
-                for res in reservations
-            ],
+            **summary,
             "date": today.isoformat(),
             "clan_id": current.clan_id
         }
@@ -1416,36 +950,22 @@ def get_valid_reservations_today(
 # For a specific clan - by month
 @router.get("/valid_reservations_month")
 def get_valid_reservations_month(
+    include_reservations: bool = Query(True),
     db: Session = Depends(get_db),
-    current: User = Depends(get_current_user)
+    current: Principal = Depends(get_current_principal)
 ):
     """
     Get validated reservations for current month for a specific clan
     """
     try:
         now = datetime.now()
-        current_month = now.month
-        current_year = now.year
-
-        reservations = db.query(Reservation).filter(
-            Reservation.county_id == current.county_id,
-            Reservation.clan_id == current.clan_id,
-            Reservation.status == ReservationStatus.validated,
-            extract('month', Reservation.date1) == current_month,
-            extract('year', Reservation.date1) == current_year
-        ).all()
-
+        summary = validated_summary(
+            db, current.county_id, *month_range(now.year, now.month),
+            clan_id=current.clan_id, include_reservations=include_reservations)
         return {
-            "count": len(reservations),
-            "reservations": [
-                {
-                    "id": res.id,
-                    "date1": res.date1.isoformat() if res.date1 else None
-                }
-                for res in reservations
-            ],
-            "month": current_month,
-            "year": current_year,
+            **summary,
+            "month": now.month,
+            "year": now.year,
             "clan_id": current.clan_id
         }
     except Exception as e:
@@ -1461,31 +981,20 @@ def get_valid_reservations_month(
 
 @router.get("/valid_reservations_year")
 def get_valid_reservations_year(
+    include_reservations: bool = Query(True),
     db: Session = Depends(get_db),
-    current: User = Depends(get_current_user)
+    current: Principal = Depends(get_current_principal)
 ):
     """
     Get validated reservations for current year for a specific clan
     """
     try:
         current_year = datetime.now().year
-
-        reservations = db.query(Reservation).filter(
-            Reservation.county_id == current.county_id,
-            Reservation.clan_id == current.clan_id,
-            Reservation.status == ReservationStatus.validated,
-            extract('year', Reservation.date1) == current_year
-        ).all()
-
+        summary = validated_summary(
+            db, current.county_id, *year_range(current_year),
+            clan_id=current.clan_id, include_reservations=include_reservations)
         return {
-            "count": len(reservations),
-            "reservations": [
-                {
-                    "id": res.id,
-                    "date1": res.date1.isoformat() if res.date1 else None
-                }
-                for res in reservations
-            ],
+            **summary,
             "year": current_year,
             "clan_id": current.clan_id
         }
@@ -1500,29 +1009,20 @@ def get_valid_reservations_year(
 # For entire county - by day
 @router.get("/valid_reservations_today_county")
 def get_valid_reservations_today_county(
+    include_reservations: bool = Query(True),
     db: Session = Depends(get_db),
-    current: User = Depends(get_current_user)
+    current: Principal = Depends(get_current_principal)
 ):
     """
     Get validated reservations for today for all clans in the county
     """
     try:
         today = date.today()
-        reservations = db.query(Reservation).filter(
-            Reservation.county_id == current.county_id,
-            Reservation.status == ReservationStatus.validated,
-            func.date(Reservation.date1) == today
-        ).all()
-
+        summary = validated_summary(
+            db, current.county_id, *day_range(today),
+            include_reservations=include_reservations)
         return {
-            "count": len(reservations),
-            "reservations": [
-                {
-                    "id": res.id,
-                    "date1": res.date1.isoformat() if res.date1 else None
-                }
-                for res in reservations
-            ],
+            **summary,
             "date": today.isoformat()
         }
     except Exception as e:
@@ -1536,35 +1036,22 @@ def get_valid_reservations_today_county(
 # For entire county - by month
 @router.get("/valid_reservations_month_county")
 def get_valid_reservations_month_county(
+    include_reservations: bool = Query(True),
     db: Session = Depends(get_db),
-    current: User = Depends(get_current_user)
+    current: Principal = Depends(get_current_principal)
 ):
     """
     Get validated reservations for current month for all clans in the county
     """
     try:
         now = datetime.now()
-        current_month = now.month
-        current_year = now.year
-
-        reservations = db.query(Reservation).filter(
-            Reservation.county_id == current.county_id,
-            Reservation.status == ReservationStatus.validated,
-            extract('month', Reservation.date1) == current_month,
-            extract('year', Reservation.date1) == current_year
-        ).all()
-
+        summary = validated_summary(
+            db, current.county_id, *month_range(now.year, now.month),
+            include_reservations=include_reservations)
         return {
-            "count": len(reservations),
-            "reservations": [
-                {
-                    "id": res.id,
-                    "date1": res.date1.isoformat() if res.date1 else None
-                }
-                for res in reservations
-            ],
-            "month": current_month,
-            "year": current_year
+            **summary,
+            "month": now.month,
+            "year": now.year
         }
     except Exception as e:
         print(f"Error in get_valid_reservations_month_county: {e}")
@@ -1577,30 +1064,22 @@ def get_valid_reservations_month_county(
 # For entire county - by year
 @router.get("/valid_reservations_year_county")
 def get_valid_reservations_year_county(
+    include_reservations: bool = Query(True),
     db: Session = Depends(get_db),
-    current: User = Depends(get_current_user)
+    current: Principal = Depends(get_current_principal)
 ):
     """
-    Get validated reservations for current year for all clans in the county
+    Get validated reservations for current year for all clans in the county.
+    With include_reservations=false only the count is returned, read from the
+    daily rollup.
     """
     try:
         current_year = datetime.now().year
-
-        reservations = db.query(Reservation).filter(
-            Reservation.county_id == current.county_id,
-            Reservation.status == ReservationStatus.validated,
-            extract('year', Reservation.date1) == current_year
-        ).all()
-
+        summary = validated_summary(
+            db, current.county_id, *year_range(current_year),
+            include_reservations=include_reservations)
         return {
-            "count": len(reservations),
-            "reservations": [
-                {
-                    "id": res.id,
-                    "date1": res.date1.isoformat() if res.date1 else None
-                }
-                for res in reservations
-            ],
+            **summary,
             "year": current_year
         }
     except Exception as e:
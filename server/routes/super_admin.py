@@ -4,6 +4,7 @@ Super Admin routes: manage counties, clans, clan admins.
 from server.auth_utils import generate_access_password, hash_access_password
 from server.schemas.user import AccessPasswordCreate, AccessPasswordResponse
 from datetime import datetime, timedelta
+from typing import Union
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
@@ -21,13 +22,17 @@ from ..models.committee import HaiaCommittee, MadaehCommittee
 from ..models.hall import Hall
 from ..schemas.haia_committe import HaiaCreate, HaiaOut, HaiaUpdate
 from ..schemas.madaih_committe import MadaihCreate, MadaihOut, MadaihUpdate
-from ..auth_utils import get_current_user, get_db, require_role, get_password_hash
+from ..auth_utils import get_current_user, get_db, require_principal_role, require_role, get_password_hash
 from ..models.user import UserRole, User, UserStatus
 from ..models.county import County
 from ..models.clan import Clan
 from ..schemas.county import CountyCreate, CountyOut, CountyUpdate
 from ..schemas.clan import ClanCreate, ClanOut, ClanUpdate
+from ..schemas.pagination import CursorPage
 from ..schemas.user import UserCreate, UserOut, UserUpdate
+from ..utils.clan_index import clan_name_index
+from ..utils.pagination import PageParams, page_response, paginate
+from ..utils.serialization import ListSerializer
 
 router = APIRouter(
     prefix="/super-admin",
@@ -35,7 +40,10 @@ router = APIRouter(
 )
 
 # super_admin_required = require_role([UserRole.super_admin])
-super_admin_required = require_role("super_admin")
+# Guard only: served from the principal cache, no user SELECT per request
+super_admin_required = require_principal_role([UserRole.super_admin])
+
+user_list = ListSerializer(UserOut)
 
 
 ####################### Counties CRUD  #####################
@@ -91,6 +99,8 @@ def deleat_a_county(county_id: int, db: Session = Depends(get_db)):
 
     db.delete(county)
     db.commit()
+    # Its clans are gone too (ON DELETE CASCADE)
+    clan_name_index.invalidate()
     return {"message": f"county id {county_id} has been deleted successfully."}
 # --------------------------------------------------------
 
@@ -120,6 +130,7 @@ def create_clan(clan: ClanCreate, db: Session = Depends(get_db)):
     db.add(clane)
     db.commit()
     db.refresh(clane)
+    clan_name_index.invalidate()
     settings = ClanSettings(clan_id=clane.id)
     db.add(settings)
     db.commit()
@@ -191,6 +202,7 @@ def update_clan(clan_id: int, clan_data: ClanUpdate, db: Session = Depends(get_d
 
     db.commit()
     db.refresh(clan)
+    clan_name_index.invalidate()
     return clan
 
 
@@ -204,6 +216,7 @@ def delet_a_clan(clan_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="clan not found")
     db.delete(clan)
     db.commit()
+    clan_name_index.invalidate()
 
     return {"message": f"Clan with ID {clan_id} has been deleted successfully."}
 
@@ -321,18 +334,19 @@ def create_clan_admin_account(user_in: UserCreate, db: Session = Depends(get_db)
 
 
 # get all clan admins by county_id
-@router.get("/clan-admins/{county__id}", response_model=list[UserOut], dependencies=[Depends(super_admin_required)])
-def list_clan_admins(county__id: int, db: Session = Depends(get_db)):
+@router.get("/clan-admins/{county__id}", response_model=Union[list[UserOut], CursorPage[UserOut]], dependencies=[Depends(super_admin_required)])
+def list_clan_admins(county__id: int, db: Session = Depends(get_db), page: PageParams = Depends()):
     check_county = db.query(County).filter(
         County.id == county__id
     ).first()
     if not check_county:
         raise HTTPException(
             status_code=404, detail=f"County with this id {county__id} dosnt exist !! ")
-    return db.query(User).filter(
+    clan_admins, next_cursor = paginate(db.query(User).filter(
         User.role == UserRole.clan_admin,
         User.county_id == county__id
-    ).all()
+    ), User.created_at, User.id, page)
+    return user_list.page_response(clan_admins, next_cursor, page, from_attributes=True)
 
 
 # delet a clan admin
@@ -0,0 +1,30 @@
+# server\schemas\dashboard.py
+
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .notification import NotificationStats
+
+
+class PeriodCounts(BaseModel):
+    """Validated reservations by date1"""
+    today: int
+    month: int
+    year: int
+
+
+class DashboardSummary(BaseModel):
+    """Everything the admin dashboard shows on load"""
+    date: date
+    month: int
+    year: int
+    county_id: Optional[int] = None
+    clan_id: Optional[int] = None
+    # None for users without a clan
+    clan: Optional[PeriodCounts] = None
+    county: PeriodCounts
+    notifications: NotificationStats
+    # Reservation counts served from the short-lived per-clan cache
+    cached: bool
@@ -0,0 +1,13 @@
+# server\schemas\pagination.py
+
+from typing import Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """One page of a list endpoint; pass next_cursor back to get the next one"""
+    items: List[T]
+    next_cursor: Optional[str] = None
@@ -2,7 +2,7 @@
 from decimal import Decimal
 from pydantic import BaseModel, Field
 from datetime import datetime, date
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
 
 
@@ -107,3 +107,27 @@ class ReservationCreateResponse(BaseModel):
     message: Optional[str] = None
     reservation_id: int
     pdf_url: Optional[str] = None
+
+
+class CalendarDayStatus(str, Enum):
+    pending = "pending"
+    validated = "validated"
+    full = "full"
+
+
+class CalendarDayOut(BaseModel):
+    day: date
+    status: CalendarDayStatus
+    count: int
+    validated_count: int
+    pending_count: int
+    remaining_capacity: int
+
+
+class ClanCalendarOut(BaseModel):
+    """Per-day availability of a clan, without any personal data"""
+    clan_id: int
+    from_date: date
+    to_date: date
+    max_grooms_per_date: int
+    days: List[CalendarDayOut]
@@ -196,3 +196,24 @@ class BulkRegistrationResult(BaseModel):
 class BulkRegisterResponse(BaseModel):
     message: str
     result: BulkRegistrationResult
+
+
+class BulkImportJobCreated(BaseModel):
+    message: str
+    job_id: str
+    status: str
+    total_rows: int
+    status_url: str
+
+
+class BulkImportJobOut(BaseModel):
+    job_id: str
+    status: str
+    filename: Optional[str] = None
+    processed_rows: int
+    # Report so far; details grows as chunks are committed
+    result: BulkRegistrationResult
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
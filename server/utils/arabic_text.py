@@ -0,0 +1,34 @@
+# server\utils\arabic_text.py
+"""
+Arabic text helpers shared by the clan-name matching code.
+"""
+import re
+
+
+def normalize_arabic_text(text: str) -> str:
+    """
+    Normalize Arabic text for better fuzzy matching.
+    - Removes diacritics (tashkeel)
+    - Normalizes different forms of alef, yaa, taa marbuta
+    - Removes extra spaces
+    """
+    if not text:
+        return ""
+
+    # Remove Arabic diacritics (harakat)
+    arabic_diacritics = re.compile(r'[\u0617-\u061A\u064B-\u0652]')
+    text = arabic_diacritics.sub('', text)
+
+    # Normalize Alef variations
+    text = re.sub(r'[إأآا]', 'ا', text)
+
+    # Normalize Yaa variations
+    text = re.sub(r'[ىي]', 'ي', text)
+
+    # Normalize Taa Marbuta
+    text = re.sub(r'[ةه]', 'ة', text)
+
+    # Remove extra spaces
+    text = ' '.join(text.split())
+
+    return text.strip()
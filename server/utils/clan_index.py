@@ -0,0 +1,132 @@
+# server\utils\clan_index.py
+"""
+Process-wide index of clan names for Arabic fuzzy matching.
+
+Clan names are loaded and normalized once and kept with an exact-match dict
+and a prepared rapidfuzz choice list. The super-admin clan routes invalidate
+the index; CLAN_INDEX_TTL_SECONDS bounds how long another worker keeps an old
+snapshot. A name without an exact match, or an unknown clan id, may be a clan
+another worker just added, so the snapshot is reloaded first (unless it is
+younger than CLAN_INDEX_MISS_RELOAD_SECONDS, which keeps typos from reloading
+on every request).
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from rapidfuzz import fuzz, process
+from sqlalchemy.orm import Session
+
+from server.models.clan import Clan
+from server.utils.arabic_text import normalize_arabic_text
+
+logger = logging.getLogger(__name__)
+
+CLAN_INDEX_TTL_SECONDS = int(os.getenv("CLAN_INDEX_TTL_SECONDS", 300))
+CLAN_INDEX_MISS_RELOAD_SECONDS = float(os.getenv("CLAN_INDEX_MISS_RELOAD_SECONDS", 5))
+CLAN_MATCH_THRESHOLD = 70
+
+
+@dataclass
+class _Snapshot:
+    ids: List[int]
+    # Normalized names, aligned with ids (the rapidfuzz choice list)
+    names: List[str]
+    exact: Dict[str, int]
+    county_by_id: Dict[int, int]
+    loaded_at: float
+
+
+class ClanNameIndex:
+    """Normalized clan names with exact and fuzzy lookups"""
+
+    def __init__(self, ttl_seconds: int = CLAN_INDEX_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session) -> _Snapshot:
+        rows = db.query(Clan.id, Clan.name, Clan.county_id).order_by(Clan.id).all()
+
+        ids, names, exact, county_by_id = [], [], {}, {}
+        for clan_id, name, county_id in rows:
+            normalized = normalize_arabic_text(name)
+            ids.append(clan_id)
+            names.append(normalized)
+            # First clan wins, like the historical linear scan
+            exact.setdefault(normalized, clan_id)
+            county_by_id[clan_id] = county_id
+
+        logger.info(f"Clan name index loaded: {len(ids)} clans")
+        return _Snapshot(ids=ids, names=names, exact=exact,
+                         county_by_id=county_by_id, loaded_at=time.monotonic())
+
+    def _get(self, db: Session, max_age: Optional[float] = None) -> _Snapshot:
+        """Current snapshot, reloaded when older than max_age (default the TTL)"""
+        if max_age is None:
+            max_age = self.ttl_seconds
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot and time.monotonic() - snapshot.loaded_at < max_age:
+            return snapshot
+
+        snapshot = self._load(db)
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    def _reloaded(self, db: Session) -> _Snapshot:
+        """Snapshot to retry a miss on"""
+        return self._get(db, CLAN_INDEX_MISS_RELOAD_SECONDS)
+
+    @staticmethod
+    def _match(snapshot: _Snapshot, clan_name: str, threshold: int) -> Optional[int]:
+        normalized_input = normalize_arabic_text(clan_name)
+
+        clan_id = snapshot.exact.get(normalized_input)
+        if clan_id is not None:
+            return clan_id
+
+        best_match = process.extractOne(
+            normalized_input,
+            snapshot.names,
+            scorer=fuzz.ratio,
+            score_cutoff=threshold
+        )
+        # extractOne on a list returns (matched_string, score, index)
+        return snapshot.ids[best_match[2]] if best_match else None
+
+    def resolve(self, db: Session, clan_name: str,
+                threshold: int = CLAN_MATCH_THRESHOLD) -> Optional[int]:
+        """Id of the clan best matching clan_name, or None"""
+        snapshot = self._get(db)
+        if normalize_arabic_text(clan_name) not in snapshot.exact:
+            snapshot = self._reloaded(db)
+        return self._match(snapshot, clan_name, threshold)
+
+    def resolve_many(self, db: Session, clan_names: Iterable[str],
+                     threshold: int = CLAN_MATCH_THRESHOLD) -> Dict[str, Optional[int]]:
+        """Resolve a batch of names; each distinct name is matched once"""
+        names = set(clan_names)
+        snapshot = self._get(db)
+        if any(normalize_arabic_text(name) not in snapshot.exact for name in names):
+            snapshot = self._reloaded(db)
+        return {name: self._match(snapshot, name, threshold) for name in names}
+
+    def county_of(self, db: Session, clan_id: int) -> Optional[int]:
+        """County of a clan id, or None if the clan does not exist"""
+        snapshot = self._get(db)
+        if clan_id not in snapshot.county_by_id:
+            snapshot = self._reloaded(db)
+        return snapshot.county_by_id.get(clan_id)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshot = None
+
+
+# Shared instance used by the auth routes and the bulk importer
+clan_name_index = ClanNameIndex()
@@ -0,0 +1,82 @@
+# server\utils\clan_versions.py
+"""
+Per-clan reservation version, shared by every worker process.
+
+clan_reservation_versions.version is bumped in the same transaction as the
+change it stands for:
+- a before_flush hook on SessionLocal bumps the clans of every Reservation
+  inserted, deleted or modified through the ORM, and of every ClanSettings
+  row (max_grooms_per_date and the other rules change the calendar too)
+- core bulk INSERTs (the groom import) call bump()
+
+Data derived from a clan's reservations and settings (the calendar ETag, see
+etag()) is keyed on it, so a change committed by one worker is seen by all of
+them at once.
+"""
+from typing import Iterable
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from server.db import SessionLocal
+from server.models.clan_reservation_version import ClanReservationVersion
+from server.models.clan_settings import ClanSettings
+from server.models.reservation import Reservation
+
+versions = ClanReservationVersion.__table__
+
+
+def get_version(db: Session, clan_id: int) -> int:
+    version = db.execute(
+        select(versions.c.version).where(versions.c.clan_id == clan_id)
+    ).scalar()
+    return int(version or 0)
+
+
+def etag(db: Session, clan_id: int, *parts) -> str:
+    """
+    Strong ETag for data derived from a clan's reservations: the same on
+    every worker, and only moves on a change.
+    """
+    tag = "-".join(str(p) for p in (clan_id, get_version(db, clan_id), *parts))
+    return f'"{tag}"'
+
+
+def bump(db: Session, clan_ids: Iterable[int]) -> None:
+    rows = [{"clan_id": clan_id, "version": 1}
+            for clan_id in sorted({c for c in clan_ids if c is not None})]
+    if not rows:
+        return
+    insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(versions)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["clan_id"],
+        set_={"version": versions.c.version + 1},
+    )
+    # Sorted: concurrent transactions lock the rows in the same order
+    db.connection().execute(stmt, rows)
+
+
+def _clan_ids(obj) -> set:
+    """Current clan, plus the one in the database if it was moved"""
+    history = inspect(obj).attrs.clan_id.history
+    return {obj.clan_id, *history.deleted}
+
+
+def _before_flush(session: Session, flush_context, instances) -> None:
+    clan_ids = set()
+    for obj in session.new:
+        if isinstance(obj, (Reservation, ClanSettings)):
+            clan_ids.add(obj.clan_id)
+    for obj in session.deleted:
+        if isinstance(obj, (Reservation, ClanSettings)):
+            clan_ids |= _clan_ids(obj)
+    for obj in session.dirty:
+        if isinstance(obj, (Reservation, ClanSettings)) and session.is_modified(obj):
+            clan_ids |= _clan_ids(obj)
+    bump(session, clan_ids)
+
+
+event.listen(SessionLocal, "before_flush", _before_flush)
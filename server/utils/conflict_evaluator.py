@@ -0,0 +1,261 @@
+# server\utils\conflict_evaluator.py
+"""
+Batched reservation conflict evaluator.
+
+All non-cancelled reservations touching the requested dates are fetched in
+one query; the solo, mass-wedding, cross-clan and capacity rules are then
+applied in Python over that result set. The rule functions only work on
+plain rows / DayAvailability objects so they can be exercised without a
+database.
+"""
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from server.models.reservation import Reservation, ReservationStatus
+from server.models.user import User
+
+# Origin of the groom relative to the clan being booked
+ORIGIN_UNKNOWN = 0
+ORIGIN_SAME_CLAN = 1
+ORIGIN_OTHER_CLAN = 2
+
+MassGroupKey = Tuple[date, Optional[date]]
+
+
+class ReservationRow(NamedTuple):
+    """The columns of a reservation the conflict rules need"""
+    id: int
+    groom_id: Optional[int]
+    date1: date
+    date2: Optional[date]
+    allow_others: bool
+    join_to_mass_wedding: bool
+    status: ReservationStatus
+    groom_clan_id: Optional[int]
+
+    @property
+    def is_mass(self) -> bool:
+        return bool(self.allow_others or self.join_to_mass_wedding)
+
+
+@dataclass
+class DayAvailability:
+    """Reservation counters for one day of one clan (cancelled rows excluded)"""
+    solo_pending: int = 0
+    solo_validated: int = 0
+    # Mass-wedding groups touching this day, keyed by (date1, date2)
+    mass_groups: Dict[MassGroupKey, int] = field(default_factory=dict)
+    pending: int = 0
+    validated: int = 0
+    cross_clan: int = 0
+    same_clan_pending: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.pending + self.validated
+
+    @property
+    def mass_leaders(self) -> int:
+        return len(self.mass_groups)
+
+    def add(self, group_key: MassGroupKey, is_mass: bool,
+            status: ReservationStatus, origin: int, count: int = 1) -> None:
+        """Add (or remove, with a negative count) reservations to the day"""
+        is_pending = status == ReservationStatus.pending_validation
+
+        if is_mass:
+            remaining = self.mass_groups.get(group_key, 0) + count
+            if remaining > 0:
+                self.mass_groups[group_key] = remaining
+            else:
+                self.mass_groups.pop(group_key, None)
+        elif is_pending:
+            self.solo_pending += count
+        else:
+            self.solo_validated += count
+
+        if is_pending:
+            self.pending += count
+            if origin == ORIGIN_SAME_CLAN:
+                self.same_clan_pending += count
+        else:
+            self.validated += count
+
+        if origin == ORIGIN_OTHER_CLAN:
+            self.cross_clan += count
+
+
+def origin_for(clan_id: int, groom_clan_id: Optional[int]) -> int:
+    """Classify a groom as same-clan, other-clan or unknown"""
+    if groom_clan_id is None:
+        return ORIGIN_UNKNOWN
+    return ORIGIN_SAME_CLAN if groom_clan_id == clan_id else ORIGIN_OTHER_CLAN
+
+
+def fetch_conflict_rows(db: Session, county_id: int, clan_id: int,
+                        dates: Iterable[date]) -> List[ReservationRow]:
+    """Single query: every non-cancelled reservation of the clan on the dates"""
+    dates = [d for d in dates if d]
+    rows = db.query(
+        Reservation.id,
+        Reservation.groom_id,
+        Reservation.date1,
+        Reservation.date2,
+        Reservation.allow_others,
+        Reservation.join_to_mass_wedding,
+        Reservation.status,
+        User.clan_id
+    ).outerjoin(
+        User, User.id == Reservation.groom_id
+    ).filter(
+        Reservation.county_id == county_id,
+        Reservation.clan_id == clan_id,
+        Reservation.status != ReservationStatus.cancelled,
+        or_(Reservation.date1.in_(dates), Reservation.date2.in_(dates))
+    ).all()
+
+    return [ReservationRow(*row) for row in rows]
+
+
+def build_day_availability(rows: Iterable[ReservationRow], clan_id: int,
+                           only_dates: Optional[Iterable[date]] = None) -> Dict[date, DayAvailability]:
+    """Fold reservation rows into per-day counters"""
+    only_dates = set(only_dates) if only_dates is not None else None
+    days: Dict[date, DayAvailability] = {}
+
+    for row in rows:
+        if row.status == ReservationStatus.cancelled:
+            continue
+        origin = origin_for(clan_id, row.groom_clan_id)
+        for day in (row.date1, row.date2):
+            if day is None or (only_dates is not None and day not in only_dates):
+                continue
+            days.setdefault(day, DayAvailability()).add(
+                (row.date1, row.date2), row.is_mass, row.status, origin)
+
+    return days
+
+
+def load_day_availability(db: Session, county_id: int, clan_id: int,
+                          dates: Iterable[Optional[date]]) -> Dict[date, DayAvailability]:
+    """Counters of the given days, read from the database in one query"""
+    dates = {d for d in dates if d}
+    return build_day_availability(
+        fetch_conflict_rows(db, county_id, clan_id, dates), clan_id, only_dates=dates)
+
+
+def check_date_conflicts(days: Dict[date, DayAvailability], dates_to_check: List[date]) -> None:
+    """Solo wedding conflicts (validated and pending)"""
+    empty = DayAvailability()
+    for check_date in dates_to_check:
+        day = days.get(check_date, empty)
+        if day.solo_validated:
+            raise HTTPException(
+                400, f"التاريخ {check_date} محجوز بالفعل")
+        if day.solo_pending:
+            raise HTTPException(400,
+                                f"التاريخ {check_date} محجوز لكن غير مصدق عليه. \n"
+                                f"تحقق مرة أخرى خلال الايام القادمة\n")
+
+
+def check_mass_wedding_conflicts(days: Dict[date, DayAvailability], date1: date,
+                                 date2: Optional[date], wants_mass: bool, max_grooms: int) -> None:
+    """Mass wedding conflicts including two-day scenarios"""
+    empty = DayAvailability()
+    dates_to_check = [date1] + ([date2] if date2 else [])
+
+    if date2:  # Two-day reservation
+        day1_groups = set(days.get(date1, empty).mass_groups)
+        day2_groups = set(days.get(date2, empty).mass_groups)
+
+        if not day1_groups and day2_groups:
+            # Day 1 is free, Day 2 has mass wedding
+            if wants_mass:
+                raise HTTPException(400,
+                                    f"لا يمكن الانضمام لعرس جماعي كيوم ثاني. \n"
+                                    f"اجعل يومك الأول نفس يوم العرس الجماعي {date2}، \n"
+                                    f"أو احجز يوماً واحداً فقط في {date1}")
+            raise HTTPException(400,
+                                f"التاريخ {date2} محجوز لعرس جماعي. \n"
+                                f"اختر تاريخاً آخر للحجز أو فعل خاصية الانضمام للعرس الجماعي")
+
+        if day1_groups and day2_groups:
+            # Groups are identified by their (date1, date2) span
+            if not day1_groups.intersection(day2_groups):
+                raise HTTPException(400,
+                                    f"لا يمكن الحجز في عرسين جماعيين مختلفين. \n"
+                                    f"يمكنك الحجز ليوم واحد فقط في {date1} أو {date2}")
+            if not wants_mass:
+                raise HTTPException(400,
+                                    f"التواريخ {date1} و {date2} محجوزة لعرس جماعي. \n"
+                                    f"فعل خاصية الانضمام لعرس جماعي")
+
+    for check_date in dates_to_check:
+        for current_count in days.get(check_date, empty).mass_groups.values():
+            if current_count >= max_grooms:
+                raise HTTPException(
+                    400, f"التاريخ {check_date} محجوز بالكامل")
+            if not wants_mass:
+                raise HTTPException(400,
+                                    f"التاريخ {check_date} محجوز لعرس جماعي. \n"
+                                    f"فعل خاصية الانضمام إذا كنت ترغب: {current_count}/{max_grooms} عريس\n")
+
+
+def check_cross_clan_restrictions(days: Dict[date, DayAvailability], dates_to_check: List[date],
+                                  settings, target_clan) -> None:
+    """Cross-clan permission, per-date quota and same-clan priority"""
+    empty = DayAvailability()
+
+    if not getattr(settings, 'allow_cross_clan_reservations', False):
+        raise HTTPException(
+            400, f"هذه العشيرة ({target_clan.name}) لا تقبل الحجوزات من العشائر الأخرى")
+
+    cross_limit = getattr(
+        settings, 'max_cross_clan_per_date', settings.max_grooms_per_date // 2)
+    for check_date in dates_to_check:
+        cross_count = days.get(check_date, empty).cross_clan
+        if cross_count >= cross_limit:
+            raise HTTPException(400,
+                                f"تم الوصول للحد الأقصى للحجوزات بين العشائر لتاريخ {check_date}: "
+                                f"{cross_count}/{cross_limit}")
+
+    if getattr(settings, 'prioritize_same_clan', True):
+        if any(days.get(d, empty).same_clan_pending for d in dates_to_check):
+            raise HTTPException(400,
+                                f"حجوزات نفس العشيرة لها الأولوية. يوجد حجز معلق من أعضاء عشيرة {target_clan.name}")
+
+
+def check_capacity_limits(days: Dict[date, DayAvailability], dates_to_check: List[date],
+                          max_grooms: int) -> None:
+    """Total capacity per date"""
+    empty = DayAvailability()
+    for check_date in dates_to_check:
+        if days.get(check_date, empty).total >= max_grooms:
+            raise HTTPException(
+                400, f"التاريخ {check_date} محجوز بالكامل")
+
+
+def evaluate_conflicts(days: Dict[date, DayAvailability], date1: date, date2: Optional[date],
+                       resv_in, settings, is_same_clan: bool, target_clan=None) -> None:
+    """
+    Apply every reservation rule for the requested dates.
+
+    Raises:
+        HTTPException: on the first violated rule, in the historical order
+        (solo, mass wedding, cross-clan, capacity)
+    """
+    dates_to_check = [date1] + ([date2] if date2 else [])
+    wants_mass = bool(resv_in.join_to_mass_wedding or resv_in.allow_others)
+
+    check_date_conflicts(days, dates_to_check)
+    check_mass_wedding_conflicts(
+        days, date1, date2, wants_mass, settings.max_grooms_per_date)
+    if not is_same_clan:
+        check_cross_clan_restrictions(
+            days, dates_to_check, settings, target_clan)
+    check_capacity_limits(days, dates_to_check, settings.max_grooms_per_date)
@@ -0,0 +1,110 @@
+# server\utils\dashboard_summary.py
+"""
+Data behind /dashboard/summary: the six validated-reservation counts (today,
+month and year, for the clan and for the county) and the unread notifications.
+
+The reservation counts are the same for every admin of a clan, so they are
+cached per (county, clan, day) for DASHBOARD_CACHE_SECONDS (0 disables the
+cache). When a refresh storm hits an expired entry, one request runs the
+query and the others wait for its result. The cache is per worker process, so
+a change can take up to DASHBOARD_CACHE_SECONDS to show. Notifications are
+per user and are always read fresh.
+"""
+import os
+import threading
+import time
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from server.utils.notification_service import NotificationService
+from server.utils.principal_cache import Principal
+from server.utils.reservation_stats import validated_period_counts
+
+DASHBOARD_CACHE_SECONDS = float(os.getenv("DASHBOARD_CACHE_SECONDS", 10))
+
+_Key = Tuple[int, Optional[int], date]
+
+
+class DashboardCache:
+    """Reservation counts per (county_id, clan_id, day), kept for ttl_seconds"""
+
+    def __init__(self, ttl_seconds: float = DASHBOARD_CACHE_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[_Key, Tuple[float, dict]] = {}
+        self._loading: Dict[_Key, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, key: _Key) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[0] < self.ttl_seconds:
+            return entry[1]
+        return None
+
+    def _store(self, key: _Key, counts: dict) -> None:
+        now = time.monotonic()
+        with self._lock:
+            # Drop expired entries (yesterday's keys, idle clans) on the way
+            for stale in [k for k, (loaded_at, _) in self._entries.items()
+                          if now - loaded_at >= self.ttl_seconds]:
+                del self._entries[stale]
+            self._entries[key] = (now, counts)
+
+    def get(self, db: Session, county_id: int, clan_id: Optional[int],
+            today: date) -> Tuple[dict, bool]:
+        """(counts, served from cache)"""
+        if self.ttl_seconds <= 0:
+            return validated_period_counts(db, county_id, clan_id, today), False
+
+        key = (county_id, clan_id, today)
+        counts = self._fresh(key)
+        if counts is not None:
+            return counts, True
+
+        with self._lock:
+            loading = self._loading.setdefault(key, threading.Lock())
+        with loading:
+            # Another request may have loaded it while we waited
+            counts = self._fresh(key)
+            if counts is not None:
+                return counts, True
+            counts = validated_period_counts(db, county_id, clan_id, today)
+            self._store(key, counts)
+        with self._lock:
+            self._loading.pop(key, None)
+        return counts, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+dashboard_cache = DashboardCache()
+
+
+def build_summary(db: Session, user: Principal, use_cache: bool = True) -> dict:
+    today = date.today()
+    if use_cache:
+        counts, cached = dashboard_cache.get(db, user.county_id, user.clan_id, today)
+    else:
+        counts, cached = validated_period_counts(
+            db, user.county_id, user.clan_id, today), False
+
+    by_type = NotificationService.get_unread_by_type(db=db, user_id=user.id)
+    unread_count = sum(by_type.values())
+    return {
+        "date": today,
+        "month": today.month,
+        "year": today.year,
+        "county_id": user.county_id,
+        "clan_id": user.clan_id,
+        **counts,
+        "notifications": {
+            "unread_count": unread_count,
+            "total_count": unread_count,
+            "by_type": by_type,
+        },
+        "cached": cached,
+    }
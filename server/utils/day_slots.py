@@ -0,0 +1,231 @@
+# server\utils\day_slots.py
+"""
+Per-day reservation counters, the authority for the capacity rules.
+
+reservation_day_slots holds, per (clan, day), the non-cancelled reservations
+touching the day: total, solo (not a mass wedding), cross_clan (grooms of
+another clan) and same_clan_pending. The create routes first apply every
+rule to a fresh read of the requested days (evaluate_conflicts, which gives
+the precise message), then claim each day with one conditional statement:
+
+    UPDATE reservation_day_slots
+    SET total = total + 1, solo = solo + :solo, ...
+    WHERE clan_id = :clan_id AND day = :day
+      AND solo = 0 AND total < :max       -- every request
+      AND total = 0                       -- a solo wedding
+      AND cross_clan < :cross_limit       -- a groom of another clan,
+      AND same_clan_pending = 0           -- when the clan has priority
+
+Two requests racing for the last place both pass the read but only one
+UPDATE matches; the other is refused. The row lock taken by the UPDATE lasts
+until the commit, so the reservations themselves are never locked. The days
+of a two-day reservation are claimed in date order. Which group a two-day
+mass-wedding request may join is only checked on the read.
+
+Every other change goes through a before_flush hook on SessionLocal, like the
+reservation rollup: cancelling, validating, deleting or editing a
+reservation, and ORM inserts that did not go through claim_days(). Core bulk
+INSERTs (the groom import) call record_reserved_days().
+
+The groom's clan is read when a reservation is counted; grooms cannot change
+clan while they hold an active reservation (grooms.update_profile).
+"""
+import logging
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from server.db import SessionLocal
+from server.models.reservation import Reservation, ReservationStatus
+from server.models.reservation_day_slot import ReservationDaySlot
+from server.models.user import User
+from server.utils.conflict_evaluator import ORIGIN_OTHER_CLAN, ORIGIN_SAME_CLAN, origin_for
+
+logger = logging.getLogger(__name__)
+
+# (clan_id, day)
+SlotKey = Tuple[int, date]
+
+COUNTERS = ("total", "solo", "cross_clan", "same_clan_pending")
+
+_SLOT_FIELDS = ("clan_id", "date1", "date2", "status",
+                "allow_others", "join_to_mass_wedding")
+
+# InstanceState.info flag of a new reservation already counted by claim_days()
+_CLAIMED = "day_slots_claimed"
+
+slots = ReservationDaySlot.__table__
+
+
+def _insert(db: Session):
+    insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    return insert(slots)
+
+
+def _counts(clan_id, date1, date2, status, allow_others, join_to_mass_wedding,
+            groom_clan_id) -> Dict[SlotKey, Dict[str, int]]:
+    """What one reservation adds to the counters of each of its days"""
+    if status == ReservationStatus.cancelled or clan_id is None or date1 is None:
+        return {}
+    origin = origin_for(clan_id, groom_clan_id)
+    is_pending = (status or ReservationStatus.pending_validation) == \
+        ReservationStatus.pending_validation
+    counts = {
+        "total": 1,
+        "solo": 0 if (allow_others or join_to_mass_wedding) else 1,
+        "cross_clan": 1 if origin == ORIGIN_OTHER_CLAN else 0,
+        "same_clan_pending": 1 if origin == ORIGIN_SAME_CLAN and is_pending else 0,
+    }
+    return {(clan_id, day): counts for day in (date1, date2) if day is not None}
+
+
+# ---- Claiming ----------------------------------------------------------
+
+def claim_days(db: Session, reservation: Reservation, groom_clan_id: Optional[int],
+               settings, is_same_clan: bool) -> None:
+    """
+    Count a new reservation in the slots of its days, unless a concurrent
+    request took the place since the conflicts were checked.
+
+    Raises:
+        HTTPException: 400 naming the first day that could not be claimed;
+        the caller rolls back
+    """
+    counts = _counts(*(getattr(reservation, name) for name in _SLOT_FIELDS),
+                     groom_clan_id)
+    keys = sorted(counts)
+    conn = db.connection()
+    conn.execute(
+        _insert(db).on_conflict_do_nothing(index_elements=["clan_id", "day"]),
+        [dict(clan_id=clan_id, day=day, **dict.fromkeys(COUNTERS, 0))
+         for clan_id, day in keys])
+
+    is_mass = bool(reservation.allow_others or reservation.join_to_mass_wedding)
+    max_grooms = settings.max_grooms_per_date
+    cross_limit = getattr(settings, 'max_cross_clan_per_date', max_grooms // 2)
+
+    for clan_id, day in keys:
+        conditions = [slots.c.clan_id == clan_id, slots.c.day == day,
+                      slots.c.solo == 0, slots.c.total < max_grooms]
+        if not is_mass:
+            conditions.append(slots.c.total == 0)
+        if not is_same_clan:
+            conditions.append(slots.c.cross_clan < cross_limit)
+            if getattr(settings, 'prioritize_same_clan', True):
+                conditions.append(slots.c.same_clan_pending == 0)
+
+        claimed = conn.execute(update(slots).where(*conditions).values({
+            name: slots.c[name] + counts[(clan_id, day)][name] for name in COUNTERS
+        }))
+        if claimed.rowcount != 1:
+            logger.info(f"Day {day} of clan {clan_id} was taken by a concurrent reservation")
+            raise HTTPException(400, f"التاريخ {day} محجوز بالكامل")
+
+    inspect(reservation).info[_CLAIMED] = True
+
+
+# ---- Counter maintenance -----------------------------------------------
+
+def _add(deltas: Dict[SlotKey, Counter], values: Optional[tuple],
+         groom_clan_id: Optional[int], sign: int) -> None:
+    if values is None:
+        return
+    for key, counts in _counts(*values, groom_clan_id).items():
+        for name, value in counts.items():
+            deltas[key][name] += sign * value
+
+
+def _apply(db: Session, deltas: Dict[SlotKey, Counter]) -> None:
+    rows = [
+        dict(clan_id=clan_id, day=day, **{name: delta[name] for name in COUNTERS})
+        for (clan_id, day), delta in sorted(deltas.items()) if any(delta.values())
+    ]
+    if not rows:
+        return
+    stmt = _insert(db)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["clan_id", "day"],
+        set_={name: slots.c[name] + stmt.excluded[name] for name in COUNTERS},
+    )
+    # Sorted: concurrent transactions lock the rows in the same order
+    db.connection().execute(stmt, rows)
+
+
+def _previous_values(reservation: Reservation) -> tuple:
+    """Slot fields of the reservation as it is in the database"""
+    attrs = inspect(reservation).attrs
+    values = []
+    for name in _SLOT_FIELDS:
+        history = attrs[name].history
+        values.append(history.deleted[0] if history.deleted else attrs[name].value)
+    return tuple(values)
+
+
+def _current_values(reservation: Reservation) -> tuple:
+    return tuple(getattr(reservation, name) for name in _SLOT_FIELDS)
+
+
+def _groom_clans(session: Session, reservations: List[Reservation]) -> dict:
+    """Clan of each reservation's groom: the loaded groom, or one query"""
+    clans, missing = {}, {}
+    for obj in reservations:
+        groom = inspect(obj).attrs.groom.loaded_value
+        if isinstance(groom, User):
+            clans[obj] = groom.clan_id
+        elif obj.groom_id is not None:
+            missing[obj] = obj.groom_id
+        else:
+            clans[obj] = None
+    if missing:
+        found = dict(session.connection().execute(
+            select(User.id, User.clan_id).where(User.id.in_(set(missing.values())))
+        ).all())
+        for obj, groom_id in missing.items():
+            clans[obj] = found.get(groom_id)
+    return clans
+
+
+def _before_flush(session: Session, flush_context, instances) -> None:
+    changed = []
+    for obj in session.new:
+        if isinstance(obj, Reservation) and not inspect(obj).info.get(_CLAIMED):
+            changed.append((obj, None, _current_values(obj)))
+    for obj in session.deleted:
+        if isinstance(obj, Reservation):
+            changed.append((obj, _previous_values(obj), None))
+    for obj in session.dirty:
+        if isinstance(obj, Reservation) and session.is_modified(obj):
+            old, new = _previous_values(obj), _current_values(obj)
+            if old != new:
+                changed.append((obj, old, new))
+    if not changed:
+        return
+
+    groom_clans = _groom_clans(session, [obj for obj, _, _ in changed])
+    deltas: Dict[SlotKey, Counter] = defaultdict(Counter)
+    for obj, old, new in changed:
+        _add(deltas, old, groom_clans[obj], -1)
+        _add(deltas, new, groom_clans[obj], 1)
+    _apply(session, deltas)
+
+
+def record_reserved_days(db: Session, reservations: Iterable[dict],
+                         groom_clans: Dict[int, Optional[int]]) -> None:
+    """
+    Count reservations inserted with a core INSERT (bypassing the ORM hook);
+    groom_clans maps their groom_id to the groom's clan.
+    """
+    deltas: Dict[SlotKey, Counter] = defaultdict(Counter)
+    for values in reservations:
+        _add(deltas, tuple(values.get(name) for name in _SLOT_FIELDS),
+             groom_clans.get(values.get("groom_id")), 1)
+    _apply(db, deltas)
+
+
+event.listen(SessionLocal, "before_flush", _before_flush)
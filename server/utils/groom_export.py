@@ -0,0 +1,130 @@
+# server\utils\groom_export.py
+"""
+XLSX export of a clan's grooms and their reservations, in the column layout
+the bulk importer (groom_import.COLUMNS) reads, so an exported sheet can be
+edited and fed back to /auth/RegisterBulk/GroomsFromExcel.
+
+One row per active reservation; grooms without one get a single row with the
+reservation columns empty. Rows come from one flat SELECT read through a
+server-side cursor and go straight into a write-only openpyxl workbook, which
+keeps only the current row in memory.
+"""
+import os
+import tempfile
+from typing import IO
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from sqlalchemy import and_, select
+from sqlalchemy.orm import aliased
+
+from server.db import SessionLocal
+from server.models.clan import Clan
+from server.models.reservation import Reservation, ReservationStatus
+from server.models.user import User, UserRole
+from server.utils.groom_import import COLUMNS
+from server.utils.reservation_export import EXPORT_BATCH_SIZE
+
+# Spill the finished workbook to disk past this size
+XLSX_SPOOL_BYTES = int(os.getenv("XLSX_SPOOL_BYTES", 8 * 1024 * 1024))
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+GroomClan = aliased(Clan)
+HostClan = aliased(Clan)
+
+# Importer field -> exported column; "clan" and "clan_selected" are written
+# as names, which the importer resolves through the clan-name index
+XLSX_COLUMNS = [
+    ("phone_number", User.phone_number),
+    ("guardian_phone", User.guardian_phone),
+    ("clan", GroomClan.name),
+    ("clan_selected", HostClan.name),
+    ("birth_date", User.birth_date),
+    ("guardian_birth_date", User.guardian_birth_date),
+    ("first_name", User.first_name),
+    ("last_name", User.last_name),
+    ("father_name", User.father_name),
+    ("grandfather_name", User.grandfather_name),
+    ("birth_address", User.birth_address),
+    ("home_address", User.home_address),
+    ("guardian_home_address", User.guardian_home_address),
+    ("guardian_birth_address", User.guardian_birth_address),
+    ("guardian_relation", User.guardian_relation),
+    ("wakil_full_name", User.wakil_full_name),
+    ("wakil_phone_number", User.wakil_phone_number),
+    ("guardian_name", User.guardian_name),
+    ("allow_others", Reservation.allow_others),
+    ("date1", Reservation.date1),
+    ("haia_committee_id", Reservation.haia_committee_id),
+    ("madaeh_committee_id", Reservation.madaeh_committee_id),
+    ("custom_madaeh_committee_name", Reservation.custom_madaeh_committee_name),
+    ("tilawa_type", Reservation.tilawa_type),
+]
+XLSX_HEADERS = [COLUMNS[key][0] for key, _ in XLSX_COLUMNS]
+
+# Kept as text so leading zeros survive a round trip through Excel
+_TEXT_KEYS = {"phone_number", "guardian_phone", "wakil_phone_number"}
+_DATE_KEYS = {"birth_date", "guardian_birth_date", "date1"}
+
+
+def groom_export_query(clan_id: int):
+    return select(
+        *(column.label(key) for key, column in XLSX_COLUMNS)
+    ).select_from(User).outerjoin(
+        GroomClan, GroomClan.id == User.clan_id
+    ).outerjoin(
+        Reservation, and_(
+            Reservation.groom_id == User.id,
+            Reservation.status != ReservationStatus.cancelled
+        )
+    ).outerjoin(
+        HostClan, HostClan.id == Reservation.clan_id
+    ).where(
+        User.role == UserRole.groom,
+        User.clan_id == clan_id
+    ).order_by(User.created_at, User.id, Reservation.date1, Reservation.id)
+
+
+def _sheet_row(sheet, row) -> list:
+    cells = []
+    for (key, _), value in zip(XLSX_COLUMNS, row):
+        if key == "allow_others":
+            # Only reservation rows carry the flag; the importer reads "نعم" as true
+            value = None if row.date1 is None else ("نعم" if value else "لا")
+        elif key in _TEXT_KEYS and value is not None:
+            value = str(value)
+        cell = WriteOnlyCell(sheet, value=value)
+        if key in _DATE_KEYS and value is not None:
+            cell.number_format = "yyyy-mm-dd"
+        elif key in _TEXT_KEYS:
+            cell.number_format = "@"
+        cells.append(cell)
+    return cells
+
+
+def write_grooms_xlsx(clan_id: int, batch_size: int = EXPORT_BATCH_SIZE) -> IO[bytes]:
+    """
+    Build the workbook and return it as a file object rewound to the start.
+    The caller owns (and closes) the returned file.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("العرسان")
+    sheet.sheet_view.rightToLeft = True
+    sheet.append(XLSX_HEADERS)
+
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            groom_export_query(clan_id).execution_options(
+                stream_results=True, yield_per=batch_size)
+        )
+        for partition in result.partitions():
+            for row in partition:
+                sheet.append(_sheet_row(sheet, row))
+    finally:
+        db.close()
+
+    output = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_BYTES)
+    workbook.save(output)
+    output.seek(0)
+    return output
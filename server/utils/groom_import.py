@@ -0,0 +1,705 @@
+# server\utils\groom_import.py
+"""
+Set-based bulk import of grooms (and optional reservations) from Excel.
+
+The importer works in four passes instead of querying and committing per row:
+1. normalize every column with pandas (one pass per column)
+2. resolve phones, clans, committees, settings and booked dates with a handful
+   of IN queries
+3. decide the outcome of every row in memory, in file order, so rows see the
+   grooms and reservations created by the rows above them
+4. insert the surviving users and reservations with bulk INSERTs in chunked
+   transactions
+
+The per-row `details` report is the same as the historical row-by-row import.
+"""
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from io import BytesIO
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import insert, or_
+from sqlalchemy.orm import Session
+
+from server.models.clan_settings import ClanSettings
+from server.models.committee import HaiaCommittee, MadaehCommittee
+from server.models.county import County
+from server.models.reservation import PaymentStatus, Reservation, ReservationStatus
+from server.models.reservation_clan_admin import ReservationSpecial
+from server.models.user import User, UserRole, UserStatus
+from server.schemas.reservations_special import ReservationSpecialStatus
+from server.utils.clan_index import clan_name_index
+from server.utils.password_service import password_service
+from server.utils.clan_versions import bump as bump_clan_versions
+from server.utils.day_slots import record_reserved_days
+from server.utils.reservation_stats import record_inserted
+
+logger = logging.getLogger(__name__)
+
+# Rows inserted per transaction
+IMPORT_CHUNK_SIZE = 200
+# Values per IN (...) list
+IN_CHUNK_SIZE = 1000
+CLAN_MATCH_THRESHOLD = 70
+DEFAULT_MAX_GROOMS_PER_DATE = 3
+ACCESS_PAGES_PASSWORD = "تعشيرت"
+NOT_SPECIFIED = "غير محدد"
+
+# field -> (Arabic header, English fallback header)
+COLUMNS = {
+    "phone_number": ("رقم هاتف العريس", "phone_number"),
+    "guardian_phone": ("رقم هاتف الولي", "guardian_phone"),
+    "clan": ("العشيرة التي ينتمي إليها", "clan_id"),
+    "clan_selected": ("العشيرة التي يقيم فيها العرس", "clan_id"),
+    "birth_date": ("تاريخ الميلاد العريس", "birth_date"),
+    "guardian_birth_date": ("تاريخ ميلاد الولي", "guardian_birth_date"),
+    "first_name": ("إسم العريس", "first_name"),
+    "last_name": ("اللقب", "last_name"),
+    "father_name": ("اسم الأب", "father_name"),
+    "grandfather_name": ("اسم الجد", "grandfather_name"),
+    "birth_address": ("مكان الميلاد العريس", "birth_address"),
+    "home_address": ("عنوان السكن للعريس", "home_address"),
+    "guardian_home_address": ("عنوان سكن الولي", "guardian_home_address"),
+    "guardian_birth_address": ("مكان ميلاد الولي", "guardian_birth_address"),
+    "guardian_relation": ("صلة القرابة بالولي", "guardian_relation"),
+    "wakil_full_name": ("اسم الكامل الوكيل", "wakil_full_name"),
+    "wakil_phone_number": ("رقم هاتف الوكيل", "wakil_phone_number"),
+    "guardian_name": ("اسم الكامل الولي", "guardian_name"),
+    "allow_others": ("السماح للآخرين بالانضمام", "allow_others"),
+    "date1": ("تاريخ الحجز", "date1"),
+    "haia_committee_id": ("الهيئة الدينية", "haia_committee_id"),
+    "madaeh_committee_id": ("لجنة المدائح", "madaeh_committee_id"),
+    "custom_madaeh_committee_name": ("اسم لجنة مداح مخصصة", "custom_madaeh_committee_name"),
+    "tilawa_type": ("نوع التلاوة", "tilawa_type"),
+}
+
+PHONE_FIELDS = ("phone_number", "guardian_phone", "wakil_phone_number")
+NAME_FIELDS = ("first_name", "last_name", "father_name", "grandfather_name")
+TEXT_FIELDS = (
+    "phone_number", "guardian_phone", "clan", "clan_selected",
+    "birth_address", "home_address", "guardian_home_address",
+    "guardian_birth_address", "guardian_relation", "wakil_full_name",
+    "wakil_phone_number", "guardian_name", "custom_madaeh_committee_name",
+    "tilawa_type",
+)
+
+
+# ----------------------------------------------------------------------
+# Pass 1: column normalization
+# ----------------------------------------------------------------------
+
+def read_grooms_excel(contents: bytes) -> pd.DataFrame:
+    """Read the clan sheet and drop the sub-header / legend rows"""
+    # Phones stay text: numeric inference drops leading zeros and turns
+    # phones in columns with blanks into floats ("661000001.0")
+    phone_headers = [header for name in PHONE_FIELDS for header in COLUMNS[name]]
+    df = pd.read_excel(BytesIO(contents),
+                       dtype={header: str for header in phone_headers})
+
+    # Row 0 after header=0 is the merged-cell sub-headers (العريس / الولي / الحجز)
+    # Row 1 after header=0 is the asterisk legend row (* = required)
+    # Drop any row whose phone column is not a plausible number.
+    phone_col = COLUMNS["phone_number"][0]
+    if phone_col in df.columns:
+        phones = df[phone_col].astype(object)
+        plausible = phones.notna() & phones.map(str).str.strip(
+        ).str.replace(' ', '', regex=False).str.isdigit()
+        df = df[plausible.fillna(False).astype(bool)].reset_index(drop=True)
+
+    df = df.where(pd.notna(df), None)
+
+    # The Excel has ' الهيئة الدينية' and ' لجنة المدائح' with a leading space.
+    df.columns = [c.strip() if isinstance(c, str) else c for c in df.columns]
+    return df
+
+
+def _as_list(series: pd.Series) -> List[Any]:
+    return [None if _is_missing(v) else v for v in series.tolist()]
+
+
+def _is_missing(value) -> bool:
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+
+def _raw_column(df: pd.DataFrame, name: str) -> Optional[pd.Series]:
+    """Arabic header first, English fallback, like row.get(ar, row.get(en))"""
+    arabic, english = COLUMNS[name]
+    if arabic in df.columns:
+        return df[arabic].astype(object)
+    if english in df.columns:
+        return df[english].astype(object)
+    return None
+
+
+def _text_column(df: pd.DataFrame, name: str) -> List[Optional[str]]:
+    """str(value).strip() for present cells, None otherwise"""
+    raw = _raw_column(df, name)
+    if raw is None:
+        return [None] * len(df)
+    stripped = raw.map(str).str.strip().astype(object)
+    return _as_list(stripped.where(raw.notna(), None))
+
+
+def _name_column(df: pd.DataFrame, name: str) -> List[str]:
+    """str(value).strip() for every cell, 'غير محدد' when the column is absent"""
+    raw = _raw_column(df, name)
+    if raw is None:
+        return [NOT_SPECIFIED] * len(df)
+    return raw.map(str).str.strip().tolist()
+
+
+def _date_column(df: pd.DataFrame, name: str) -> Tuple[List[Optional[date]], List[Optional[str]]]:
+    """
+    Parse each distinct cell once with pd.to_datetime, exactly like the
+    per-row parsing did; unparsable cells keep their error message.
+    """
+    raw = _raw_column(df, name)
+    if raw is None:
+        return [None] * len(df), [None] * len(df)
+
+    parsed: Dict[Any, Tuple[Optional[date], Optional[str]]] = {}
+    dates, errors = [], []
+    for value in raw.tolist():
+        if _is_missing(value):
+            dates.append(None)
+            errors.append(None)
+            continue
+        try:
+            key = (type(value), value)
+            hash(key)
+        except TypeError:
+            key = None
+        if key is None or key not in parsed:
+            try:
+                result = (pd.to_datetime(value).date(), None)
+            except Exception as e:
+                result = (None, str(e))
+            if key is not None:
+                parsed[key] = result
+        else:
+            result = parsed[key]
+        dates.append(result[0])
+        errors.append(result[1])
+    return dates, errors
+
+
+def _bool_column(df: pd.DataFrame, name: str) -> List[bool]:
+    raw = _raw_column(df, name)
+    if raw is None:
+        return [False] * len(df)
+    normalized = raw.map(str).str.strip().str.upper()
+    return (raw.notna() & normalized.isin(("TRUE", "نعم"))).astype(bool).tolist()
+
+
+def _id_column(df: pd.DataFrame, name: str) -> List[Optional[int]]:
+    """int(value) when the cell is a digit string, None otherwise"""
+    raw = _raw_column(df, name)
+    if raw is None:
+        return [None] * len(df)
+    stripped = raw.map(str).str.strip()
+    digits = (raw.notna() & stripped.str.isdigit()).astype(bool)
+    return [int(v) if ok else None for v, ok in zip(stripped.tolist(), digits.tolist())]
+
+
+@dataclass
+class _Rows:
+    """Column-oriented view of the normalized sheet"""
+    count: int
+    columns: Dict[str, list] = field(default_factory=dict)
+    date_errors: Dict[str, list] = field(default_factory=dict)
+
+    def get(self, name: str, i: int):
+        return self.columns[name][i]
+
+
+def normalize_frame(df: pd.DataFrame) -> _Rows:
+    rows = _Rows(count=len(df))
+    for name in TEXT_FIELDS:
+        rows.columns[name] = _text_column(df, name)
+    for name in NAME_FIELDS:
+        rows.columns[name] = _name_column(df, name)
+    for name in ("birth_date", "guardian_birth_date", "date1"):
+        rows.columns[name], rows.date_errors[name] = _date_column(df, name)
+    rows.columns["allow_others"] = _bool_column(df, "allow_others")
+    rows.columns["haia_committee_id"] = _id_column(df, "haia_committee_id")
+    rows.columns["madaeh_committee_id"] = _id_column(df, "madaeh_committee_id")
+    return rows
+
+
+# ----------------------------------------------------------------------
+# Pass 2: set-based lookups
+# ----------------------------------------------------------------------
+
+def _chunks(values: Iterable, size: int = IN_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _existing_phone_owners(db: Session, phones: set) -> Dict[str, int]:
+    """phone -> id of the first user holding it as phone or guardian phone"""
+    owners: Dict[str, int] = {}
+    for chunk in _chunks(sorted(phones)):
+        rows = db.query(User.id, User.phone_number, User.guardian_phone).filter(
+            or_(User.phone_number.in_(chunk), User.guardian_phone.in_(chunk))
+        ).order_by(User.id).all()
+        for user_id, phone, guardian in rows:
+            for value in (phone, guardian):
+                if value in phones:
+                    owners.setdefault(value, user_id)
+    return owners
+
+
+def _users_with_reservation(db: Session, user_ids: set) -> set:
+    """Same rule as has_reservation(): a non-cancelled reservation from now on"""
+    now = datetime.utcnow()
+    found = set()
+    for chunk in _chunks(sorted(user_ids)):
+        rows = db.query(Reservation.groom_id).filter(
+            Reservation.groom_id.in_(chunk),
+            Reservation.status != ReservationStatus.cancelled,
+            Reservation.date1 >= now,
+        ).distinct().all()
+        found.update(row[0] for row in rows)
+    return found
+
+
+def _booked_counters(db: Session, county_id: int, pairs: set):
+    """
+    Per (clan_id, day): non-cancelled reservations, mass-wedding ones among
+    them, special reservations, and each clan's max grooms per date.
+    """
+    totals: Dict[Tuple[int, date], int] = {}
+    mass: Dict[Tuple[int, date], int] = {}
+    special: set = set()
+    max_grooms: Dict[int, int] = {}
+    if not pairs:
+        return totals, mass, special, max_grooms
+
+    clan_ids = sorted({clan_id for clan_id, _ in pairs})
+    days = sorted({day for _, day in pairs})
+
+    for day_chunk in _chunks(days):
+        rows = db.query(
+            Reservation.clan_id, Reservation.date1, Reservation.date2,
+            Reservation.allow_others
+        ).filter(
+            Reservation.county_id == county_id,
+            Reservation.clan_id.in_(clan_ids),
+            Reservation.status != ReservationStatus.cancelled,
+            or_(Reservation.date1.in_(day_chunk),
+                Reservation.date2.in_(day_chunk))
+        ).all()
+        for clan_id, date1, date2, allow_others in rows:
+            for day in {date1, date2}:
+                if (clan_id, day) in pairs:
+                    totals[(clan_id, day)] = totals.get((clan_id, day), 0) + 1
+                    if allow_others:
+                        mass[(clan_id, day)] = mass.get((clan_id, day), 0) + 1
+
+        special_rows = db.query(ReservationSpecial.clan_id, ReservationSpecial.date).filter(
+            ReservationSpecial.county_id == county_id,
+            ReservationSpecial.clan_id.in_(clan_ids),
+            ReservationSpecial.status != ReservationSpecialStatus.cancelled,
+            ReservationSpecial.date.in_(day_chunk)
+        ).all()
+        special.update((clan_id, day) for clan_id, day in special_rows)
+
+    for clan_id, max_per_date in db.query(
+            ClanSettings.clan_id, ClanSettings.max_grooms_per_date).filter(
+            ClanSettings.clan_id.in_(clan_ids)).order_by(ClanSettings.id).all():
+        max_grooms.setdefault(clan_id, max_per_date)
+
+    return totals, mass, special, max_grooms
+
+
+def _existing_ids(db: Session, model, ids: set) -> set:
+    found = set()
+    for chunk in _chunks(sorted(ids)):
+        found.update(row[0] for row in db.query(model.id).filter(model.id.in_(chunk)).all())
+    return found
+
+
+# ----------------------------------------------------------------------
+# Pass 3/4: decisions and bulk inserts
+# ----------------------------------------------------------------------
+
+@dataclass
+class _NewGroom:
+    index: int
+    user: Dict[str, Any]
+    reservation: Optional[Dict[str, Any]] = None
+    # Set when the reservation could not be built; the user is still kept
+    reservation_error: Optional[str] = None
+
+
+def _detail(row_num, phone, status, reason, name=None) -> dict:
+    detail = {"row": row_num, "phone": phone, "status": status}
+    if name is not None:
+        detail["name"] = name
+    detail["reason"] = reason
+    return detail
+
+
+def _success_detail(row_num: int, groom: _NewGroom) -> dict:
+    user = groom.user
+    name = f"{user['first_name']} {user['last_name']}"
+    if groom.reservation_error is not None:
+        reason = f"  فشل إنشاء : {groom.reservation_error}"
+    else:
+        reason = "مع حجز" if groom.reservation else None
+    return _detail(row_num, user["phone_number"], "success", reason, name)
+
+
+def _insert_users(db: Session, chunk: List[_NewGroom]) -> None:
+    user_ids = db.scalars(
+        insert(User).returning(User.id, sort_by_parameter_order=True),
+        [groom.user for groom in chunk]
+    ).all()
+
+    reservations = []
+    groom_clans = {}
+    for groom, user_id in zip(chunk, user_ids):
+        if groom.reservation:
+            reservations.append(dict(groom.reservation, groom_id=user_id))
+            groom_clans[user_id] = groom.user["clan_id"]
+    if reservations:
+        reservation_ids = db.scalars(
+            insert(Reservation).returning(Reservation.id, sort_by_parameter_order=True),
+            reservations
+        ).all()
+        for values, reservation_id in zip(reservations, reservation_ids):
+            values["id"] = reservation_id
+        record_inserted(db, reservations)
+        record_reserved_days(db, reservations, groom_clans)
+        bump_clan_versions(db, (values["clan_id"] for values in reservations))
+
+
+def _insert_chunk(db: Session, chunk: List[_NewGroom], commit: bool = True) -> None:
+    """
+    Bulk insert the users, then their reservations: one transaction, or one
+    savepoint inside the caller's transaction when commit is False.
+    """
+    if not commit:
+        with db.begin_nested():
+            _insert_users(db, chunk)
+        return
+    _insert_users(db, chunk)
+    db.commit()
+
+
+async def import_rows(db: Session, df: pd.DataFrame, county_id: int,
+                      row_offset: int = 0, commit: bool = True) -> dict:
+    """
+    Import the rows of df (a slice of the sheet starting at row_offset).
+
+    With commit=False every insert runs in a savepoint and the caller commits,
+    so the rows and the caller's own bookkeeping land in one transaction.
+
+    Returns:
+        dict with total_rows, successful, skipped, failed and details
+    """
+    rows = normalize_frame(df)
+    total_rows = rows.count
+    today = date.today()
+
+    # ---- Pass 2: lookups ------------------------------------------------
+    phones = {p for p in rows.columns["phone_number"] if p}
+    phones.update(p for p in rows.columns["guardian_phone"] if p)
+    phone_owners = _existing_phone_owners(db, phones)
+    owners_with_reservation = _users_with_reservation(
+        db, set(phone_owners.values()))
+
+    # Every distinct clan name in the file is matched once against the index
+    clan_names = {n for n in rows.columns["clan_selected"] if n is not None}
+    clan_names.update(n for n in rows.columns["clan"]
+                      if n is not None and not n.isdigit())
+    clan_matches = clan_name_index.resolve_many(db, clan_names, CLAN_MATCH_THRESHOLD)
+    county_exists = db.query(County.id).filter(
+        County.id == county_id).first() is not None
+
+    committee_ids = {
+        "haia_committee_id": _existing_ids(
+            db, HaiaCommittee, {i for i in rows.columns["haia_committee_id"] if i is not None}),
+        "madaeh_committee_id": _existing_ids(
+            db, MadaehCommittee, {i for i in rows.columns["madaeh_committee_id"] if i is not None}),
+    }
+
+    selected_clans: List[Optional[int]] = []
+    for i in range(total_rows):
+        name = rows.get("clan_selected", i)
+        selected_clans.append(clan_matches[name] if name is not None else None)
+    pairs = {(selected_clans[i], rows.get("date1", i)) for i in range(total_rows)
+             if selected_clans[i] is not None and rows.get("date1", i) is not None}
+    totals, mass, special, max_grooms = _booked_counters(db, county_id, pairs)
+
+    # ---- Pass 3: decide every row in file order ---------------------------
+    successful = skipped = failed = 0
+    details: List[Optional[dict]] = []
+    new_grooms: List[_NewGroom] = []
+    # Phones taken by grooms this import keeps -> has a reservation from now on
+    new_phones: Dict[str, bool] = {}
+    now_date = datetime.utcnow().date()
+
+    def phone_taken(phone: str) -> Optional[bool]:
+        """None if free, otherwise whether its owner has a reservation"""
+        if phone in phone_owners:
+            return phone_owners[phone] in owners_with_reservation
+        if phone in new_phones:
+            return new_phones[phone]
+        return None
+
+    for i in range(total_rows):
+        row_num = row_offset + i + 2  # +2 because row 1 is the header in Excel
+        phone_number = rows.get("phone_number", i)
+        guardian_phone = rows.get("guardian_phone", i)
+
+        if not phone_number:
+            details.append({"row": row_num, "status": "failed",
+                            "reason": "رقم هاتف العريس مفقود"})
+            failed += 1
+            continue
+
+        owner_has_reservation = phone_taken(phone_number)
+        if owner_has_reservation is not None:
+            reason = "المستخدم موجود ولديه حجز" if owner_has_reservation else "المستخدم موجود "
+            details.append({"row": row_num, "phone": phone_number,
+                            "status": "skipped", "reason": reason})
+            skipped += 1
+            continue
+
+        if guardian_phone:
+            owner_has_reservation = phone_taken(guardian_phone)
+            if owner_has_reservation is not None:
+                reason = "رقم هاتف الولي موجود ولديه حجز" if owner_has_reservation else "رقم هاتف الولي موجود "
+                details.append({"row": row_num, "phone": phone_number,
+                                "status": "skipped", "reason": reason})
+                skipped += 1
+                continue
+
+        # Clan of the groom: an id or an (Arabic, fuzzy matched) name
+        clan_name_str = rows.get("clan", i)
+        if clan_name_str is None:
+            details.append(_detail(row_num, phone_number, "failed",
+                                   "العشيرة غير موجودة (لم يتم العثور على تطابق )"))
+            failed += 1
+            continue
+        if clan_name_str.isdigit():
+            clan_id = int(clan_name_str)
+            if clan_name_index.county_of(db, clan_id) is None:
+                details.append(_detail(row_num, phone_number, "failed",
+                                       f"العشيرة رقم {clan_id} غير موجودة"))
+                failed += 1
+                continue
+        else:
+            clan_id = clan_matches[clan_name_str]
+            if clan_id is None:
+                details.append(_detail(
+                    row_num, phone_number, "failed",
+                    f"العشيرة '{clan_name_str}' غير موجودة (لم يتم العثور على تطابق )"))
+                failed += 1
+                continue
+
+        if not county_exists:
+            details.append(_detail(row_num, phone_number, "failed",
+                                   f"المحافظة {county_id} غير موجودة"))
+            failed += 1
+            continue
+
+        if clan_name_index.county_of(db, clan_id) != county_id:
+            details.append(_detail(row_num, phone_number, "failed",
+                                   "العشيرة لا تنتمي إلى هذه المحافظة"))
+            failed += 1
+            continue
+
+        date_error = rows.date_errors["birth_date"][i] or rows.date_errors["guardian_birth_date"][i]
+        if date_error:
+            logger.error(f"Error processing row {row_num}: {date_error}")
+            details.append({"row": row_num, "phone": phone_number,
+                            "status": "failed", "reason": date_error})
+            failed += 1
+            continue
+
+        first_name = rows.get("first_name", i)
+        last_name = rows.get("last_name", i)
+        guardian_relation = rows.get("guardian_relation", i)
+        if guardian_relation == "الأب":
+            guardian_name = last_name + rows.get("father_name", i) + \
+                "بن" + rows.get("grandfather_name", i)
+        else:
+            guardian_name = rows.get("guardian_name", i)
+
+        user = {
+            "phone_number": phone_number,
+            "role": UserRole.groom,
+            "phone_verified": True,
+            "first_name": first_name,
+            "last_name": last_name,
+            "father_name": rows.get("father_name", i),
+            "grandfather_name": rows.get("grandfather_name", i),
+            "birth_date": rows.get("birth_date", i),
+            "birth_address": rows.get("birth_address", i),
+            "home_address": rows.get("home_address", i),
+            "clan_id": clan_id,
+            "county_id": county_id,
+            "guardian_name": guardian_name,
+            "guardian_phone": guardian_phone,
+            "guardian_home_address": rows.get("guardian_home_address", i),
+            "guardian_birth_address": rows.get("guardian_birth_address", i),
+            "guardian_birth_date": rows.get("guardian_birth_date", i),
+            "guardian_relation": guardian_relation,
+            "created_at": datetime.utcnow(),
+            "status": UserStatus.active,
+            "wakil_full_name": rows.get("wakil_full_name", i),
+            "wakil_phone_number": rows.get("wakil_phone_number", i),
+        }
+        name = f"{first_name} {last_name}"
+
+        # Clan hosting the wedding (name only)
+        clan_name_selected_str = rows.get("clan_selected", i)
+        clan_id_selected = selected_clans[i]
+        if clan_name_selected_str is None:
+            details.append(_detail(row_num, phone_number, "success",
+                                   "لم يتم الإنشاء لأن لم يتم تحديد عشيرة للحجز", name))
+            successful += 1
+            continue
+        if clan_id_selected is None:
+            details.append(_detail(
+                row_num, phone_number, "success",
+                f"لم يتم الإنشاء  لأن العشيرة '{clan_name_selected_str}' للحجز غير موجودة", name))
+            successful += 1
+            continue
+
+        groom = _NewGroom(index=row_offset + i, user=user)
+        date1 = rows.get("date1", i)
+        date1_error = rows.date_errors["date1"][i]
+
+        if date1_error:
+            logger.error(
+                f"Reservation creation failed for row {row_num}: {date1_error}")
+            groom.reservation_error = date1_error
+        elif date1 is not None:
+            if date1 < today:
+                details.append(_detail(row_num, phone_number, "success",
+                                       "لم يتم اللإنشاء , تاريخ الحجز في الماضي", name))
+                successful += 1
+                continue
+
+            allow_others = rows.get("allow_others", i)
+            key = (clan_id_selected, date1)
+            booked = totals.get(key, 0) > 0
+            if booked and allow_others:
+                limit = max_grooms.get(clan_id_selected, DEFAULT_MAX_GROOMS_PER_DATE)
+                booked = mass.get(key, 0) >= limit
+
+            if booked or key in special:
+                details.append(_detail(row_num, phone_number, "success",
+                                       "لم يتم إنشاء , التاريخ محجوز", name))
+                successful += 1
+                continue
+
+            missing_committee = next(
+                (column for column, known in committee_ids.items()
+                 if rows.get(column, i) is not None and rows.get(column, i) not in known),
+                None)
+            if missing_committee:
+                groom.reservation_error = f"{missing_committee} {rows.get(missing_committee, i)} غير موجود"
+            else:
+                groom.reservation = {
+                    "clan_id": clan_id_selected,
+                    "county_id": county_id,
+                    "hall_id": clan_id_selected,
+                    "date1": date1,
+                    "allow_others": allow_others,
+                    "join_to_mass_wedding": allow_others,
+                    "status": ReservationStatus.pending_validation,
+                    "payment_status": PaymentStatus.not_paid,
+                    "haia_committee_id": rows.get("haia_committee_id", i),
+                    "madaeh_committee_id": rows.get("madaeh_committee_id", i),
+                    "custom_madaeh_committee_name": rows.get("custom_madaeh_committee_name", i),
+                    "tilawa_type": rows.get("tilawa_type", i),
+                    "first_name": first_name,
+                    "last_name": last_name,
+                    "father_name": user["father_name"],
+                    "grandfather_name": user["grandfather_name"],
+                    "birth_date": user["birth_date"],
+                    "birth_address": user["birth_address"],
+                    "home_address": user["home_address"],
+                    "phone_number": phone_number,
+                    "guardian_name": guardian_name,
+                    "guardian_phone": guardian_phone,
+                    "guardian_home_address": user["guardian_home_address"],
+                    "guardian_birth_address": user["guardian_birth_address"],
+                    "guardian_birth_date": user["guardian_birth_date"],
+                    "created_at": datetime.utcnow(),
+                }
+                totals[key] = totals.get(key, 0) + 1
+                if allow_others:
+                    mass[key] = mass.get(key, 0) + 1
+
+        # Kept: later rows must see these phones as taken
+        has_future_reservation = bool(groom.reservation) and date1 > now_date
+        new_phones.setdefault(phone_number, has_future_reservation)
+        if guardian_phone:
+            new_phones.setdefault(guardian_phone, has_future_reservation)
+
+        new_grooms.append(groom)
+        details.append(None)  # filled in once the insert succeeded
+        successful += 1
+
+    # ---- Pass 4: hash and insert ----------------------------------------
+    if new_grooms:
+        hashed_access_password = await password_service.hash(ACCESS_PAGES_PASSWORD)
+        hashed_passwords = await password_service.hash_many(
+            [groom.user["phone_number"] for groom in new_grooms])
+        for groom, hashed_password in zip(new_grooms, hashed_passwords):
+            groom.user["password_hash"] = hashed_password
+            groom.user["access_pages_password_hash"] = hashed_access_password
+
+    # Row index -> position in details
+    detail_positions = [pos for pos, d in enumerate(details) if d is None]
+    for start in range(0, len(new_grooms), IMPORT_CHUNK_SIZE):
+        chunk = new_grooms[start:start + IMPORT_CHUNK_SIZE]
+        positions = detail_positions[start:start + IMPORT_CHUNK_SIZE]
+        try:
+            _insert_chunk(db, chunk, commit)
+            done = list(zip(chunk, positions))
+        except Exception as e:
+            if commit:
+                db.rollback()
+            logger.error(
+                f"Bulk insert failed, retrying rows one by one: {e}")
+            done = []
+            for groom, position in zip(chunk, positions):
+                try:
+                    _insert_chunk(db, [groom], commit)
+                    done.append((groom, position))
+                except Exception as row_error:
+                    if commit:
+                        db.rollback()
+                    row_num = groom.index + 2
+                    logger.error(f"Error processing row {row_num}: {row_error}")
+                    details[position] = {
+                        "row": row_num,
+                        "phone": groom.user["phone_number"],
+                        "status": "failed",
+                        "reason": str(row_error)
+                    }
+                    successful -= 1
+                    failed += 1
+
+        for groom, position in done:
+            details[position] = _success_detail(groom.index + 2, groom)
+
+    return {
+        "total_rows": total_rows,
+        "successful": successful,
+        "skipped": skipped,
+        "failed": failed,
+        "details": details,
+    }
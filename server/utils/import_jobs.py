@@ -0,0 +1,239 @@
+# server\utils\import_jobs.py
+"""
+Background bulk groom imports.
+
+/auth/RegisterBulk/GroomsFromExcel used to run the whole import inside the
+request; large sheets hit proxy timeouts and the client never saw the report.
+The upload is now stored as an ImportJob row and answered with its id. A
+worker thread per process claims queued jobs and imports IMPORT_JOB_CHUNK_ROWS
+rows at a time; each chunk's users, reservations, the job's counters and the
+chunk's report lines (one import_job_chunks row) are committed in one
+transaction, so /auth/RegisterBulk/jobs/{id}
+sees the report grow and a job interrupted by a restart resumes from the
+last committed chunk (its heartbeat goes stale and any worker picks it up).
+"""
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, func, or_
+
+from server.db import SessionLocal
+from server.models.import_job import ImportJob, ImportJobChunk, ImportJobStatus
+from server.utils.groom_import import import_rows, read_grooms_excel
+from server.utils.principal_cache import Principal
+
+logger = logging.getLogger(__name__)
+
+IMPORT_JOB_WORKERS = int(os.getenv("IMPORT_JOB_WORKERS", 1))
+IMPORT_JOB_CHUNK_ROWS = int(os.getenv("IMPORT_JOB_CHUNK_ROWS", 200))
+IMPORT_JOB_POLL_SECONDS = float(os.getenv("IMPORT_JOB_POLL_SECONDS", 5))
+# A running job without a heartbeat for this long is considered abandoned
+IMPORT_JOB_STALE_SECONDS = int(os.getenv("IMPORT_JOB_STALE_SECONDS", 300))
+
+
+class _LostJob(Exception):
+    """Another worker took the job over; stop without touching it"""
+
+
+def job_to_dict(db, job: ImportJob) -> dict:
+    details = []
+    for (chunk_details,) in db.query(ImportJobChunk.details).filter(
+            ImportJobChunk.job_id == job.id).order_by(ImportJobChunk.start_row):
+        details.extend(chunk_details)
+    return {
+        "job_id": job.id,
+        "status": job.status.value,
+        "filename": job.filename,
+        "processed_rows": job.processed_rows,
+        "result": {
+            "total_rows": job.total_rows,
+            "successful": job.successful,
+            "skipped": job.skipped,
+            "failed": job.failed,
+            "details": details,
+        },
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+class ImportJobRunner:
+    """Worker threads serving the import_jobs table"""
+
+    def __init__(self, workers: int = IMPORT_JOB_WORKERS,
+                 chunk_rows: int = IMPORT_JOB_CHUNK_ROWS):
+        self.workers = workers
+        self.chunk_rows = chunk_rows
+        self._threads: List[threading.Thread] = []
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the workers; also picks up jobs left over by a restart"""
+        with self._lock:
+            if self._threads:
+                return
+            for n in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f"import-{n}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+
+    def submit(self, db, contents: bytes, filename: str, admin: Principal) -> ImportJob:
+        """Store the upload as a queued job and wake a worker"""
+        total_rows = len(read_grooms_excel(contents))
+        job = ImportJob(
+            id=uuid.uuid4().hex,
+            created_by=admin.id,
+            county_id=admin.county_id,
+            filename=filename,
+            contents=contents,
+            status=ImportJobStatus.queued,
+            total_rows=total_rows,
+            created_at=datetime.utcnow(),
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        self.start()
+        self._wakeup.set()
+        return job
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def _claim(self, worker_id: str) -> Optional[str]:
+        """Take the oldest queued or abandoned job"""
+        db = SessionLocal()
+        try:
+            stale_before = datetime.utcnow() - timedelta(seconds=IMPORT_JOB_STALE_SECONDS)
+            job = db.query(ImportJob).filter(or_(
+                ImportJob.status == ImportJobStatus.queued,
+                and_(ImportJob.status == ImportJobStatus.running,
+                     ImportJob.heartbeat_at < stale_before)
+            )).order_by(ImportJob.created_at).with_for_update(skip_locked=True).first()
+            if job is None:
+                db.rollback()
+                return None
+            if job.status == ImportJobStatus.running:
+                logger.warning(
+                    f"Resuming import job {job.id} at row {job.processed_rows}")
+            job.status = ImportJobStatus.running
+            job.worker_id = worker_id
+            job.started_at = job.started_at or datetime.utcnow()
+            job.heartbeat_at = datetime.utcnow()
+            db.commit()
+            return job.id
+        finally:
+            db.close()
+
+    def _work(self):
+        worker_id = uuid.uuid4().hex
+        loop = asyncio.new_event_loop()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    job_id = self._claim(worker_id)
+                except Exception as e:
+                    logger.error(f"Import worker could not claim a job: {e}")
+                    job_id = None
+                if job_id is None:
+                    self._wakeup.wait(IMPORT_JOB_POLL_SECONDS)
+                    self._wakeup.clear()
+                    continue
+                self._run(job_id, worker_id, loop)
+        finally:
+            loop.close()
+
+    def _owned(self, db, job_id: str, worker_id: str) -> ImportJob:
+        """Lock the job row for this chunk, or raise if it changed hands"""
+        job = db.query(ImportJob).filter(
+            ImportJob.id == job_id).with_for_update().first()
+        if job is None or job.worker_id != worker_id or job.status != ImportJobStatus.running:
+            raise _LostJob(job_id)
+        return job
+
+    def _run(self, job_id: str, worker_id: str, loop: asyncio.AbstractEventLoop):
+        db = SessionLocal()
+        try:
+            job = db.get(ImportJob, job_id)
+            county_id = job.county_id
+            df = read_grooms_excel(job.contents)
+            db.rollback()
+
+            while not self._stopping.is_set():
+                job = self._owned(db, job_id, worker_id)
+                start = job.processed_rows
+                if start >= len(df):
+                    job.status = ImportJobStatus.done
+                    job.contents = None
+                    job.finished_at = datetime.utcnow()
+                    db.commit()
+                    return
+
+                chunk = df.iloc[start:start + self.chunk_rows].reset_index(drop=True)
+                result = loop.run_until_complete(
+                    import_rows(db, chunk, county_id, row_offset=start, commit=False))
+
+                job.processed_rows = start + len(chunk)
+                job.successful += result["successful"]
+                job.skipped += result["skipped"]
+                job.failed += result["failed"]
+                # Own row per chunk: the report is never rewritten
+                db.add(ImportJobChunk(
+                    job_id=job_id, start_row=start, details=result["details"]))
+                job.heartbeat_at = datetime.utcnow()
+                db.commit()
+
+            # Shutting down: hand the job back so the next start resumes it
+            job = self._owned(db, job_id, worker_id)
+            job.status = ImportJobStatus.queued
+            job.worker_id = None
+            db.commit()
+        except _LostJob:
+            db.rollback()
+            logger.warning(f"Import job {job_id} was taken over by another worker")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Import job {job_id} failed: {e}")
+            try:
+                job = self._owned(db, job_id, worker_id)
+                job.status = ImportJobStatus.failed
+                job.error = str(e)
+                job.contents = None
+                job.finished_at = datetime.utcnow()
+                db.commit()
+            except Exception:
+                db.rollback()
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        db = SessionLocal()
+        try:
+            counts = {status.value: 0 for status in ImportJobStatus}
+            for status, count in db.query(
+                    ImportJob.status, func.count(ImportJob.id)).group_by(ImportJob.status):
+                counts[status.value] = count
+        finally:
+            db.close()
+        return {"workers": self.workers, "chunk_rows": self.chunk_rows, "jobs": counts}
+
+    def shutdown(self) -> None:
+        """Workers stop after their current chunk; unfinished jobs resume later"""
+        self._stopping.set()
+        self._wakeup.set()
+
+
+# Shared instance used by the auth routes and the app lifespan
+import_job_runner = ImportJobRunner()
@@ -0,0 +1,119 @@
+# server\utils\metrics.py
+"""
+Prometheus metrics, aggregated across the uvicorn worker processes.
+
+prometheus_client runs in multiprocess mode: every worker writes its samples
+to memory-mapped files in PROMETHEUS_MULTIPROC_DIR and /metrics merges the
+files of all workers. When the variable is not set, the directory defaults to
+one per parent process (the uvicorn supervisor), so the workers of one server
+share it and a restart starts from empty files.
+
+Exposed:
+- http_request_duration_seconds{method, route, status} and
+  http_requests_in_flight{method}
+- db_pool_checkout_wait_seconds and db_pool_connections_checked_out
+- pdf_conversion_duration_seconds{outcome}
+- sms_send_duration_seconds{transport, outcome}
+"""
+import os
+import tempfile
+import time
+
+# Must be set before prometheus_client creates its first metric
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), f"prometheus_multiproc_{os.getppid()}"))
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+from fastapi import FastAPI, Request  # noqa: E402
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST, CollectorRegistry, Gauge, Histogram, generate_latest, multiprocess)
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+
+# Optional bearer token required on /metrics
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency",
+    ["method", "route", "status"], buckets=HTTP_BUCKETS)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "Requests being served",
+    ["method"], multiprocess_mode="livesum")
+
+db_pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30))
+db_pool_checked_out = Gauge(
+    "db_pool_connections_checked_out", "DB connections currently in use",
+    multiprocess_mode="livesum")
+
+pdf_conversion_duration = Histogram(
+    "pdf_conversion_duration_seconds", "Reservation PDF generation (fill + convert)",
+    ["outcome"], buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120))
+sms_send_duration = Histogram(
+    "sms_send_duration_seconds", "One SMS provider call",
+    ["transport", "outcome"], buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30))
+
+
+def route_template(request: Request) -> str:
+    """Path template of the matched route; one label for every unmatched path"""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def instrument_pool(engine: Engine) -> None:
+    """Time pool checkouts (Engine.connect waits here when the pool is exhausted)"""
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+
+    @event.listens_for(pool, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        db_pool_checked_out.inc()
+
+    @event.listens_for(pool, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        db_pool_checked_out.dec()
+
+
+def render() -> bytes:
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges (in-flight, checked out connections)"""
+    multiprocess.mark_process_dead(os.getpid())
+
+
+def install_metrics(app: FastAPI, engine: Engine) -> None:
+    instrument_pool(engine)
+
+    @app.middleware("http")
+    async def observe_requests(request: Request, call_next):
+        method = request.method
+        in_flight = http_requests_in_flight.labels(method)
+        in_flight.inc()
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            in_flight.dec()
+            http_request_duration.labels(
+                method, route_template(request), str(status)
+            ).observe(time.perf_counter() - started)
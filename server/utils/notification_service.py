@@ -1,10 +1,11 @@
 # Path: server\utils\notification_service.py
 
+from sqlalchemy import Boolean, Integer, Select, String, cast, func, insert, literal, null, select, union_all
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Dict, Optional
 from datetime import datetime
 
-from server.models.notification import Notification, NotificationType
+from server.models.notification import BroadcastNotification, BroadcastRecipient, Notification, NotificationType
 from server.models.user import User, UserRole
 from server.models.reservation import Reservation
 
@@ -216,13 +217,147 @@ class NotificationService:
 
         return notification
 
+    @staticmethod
+    def broadcast_general_notification(
+        db: Session,
+        recipients: Select,
+        title: str,
+        message: str,
+        is_groom: bool = False,
+        sender_id: Optional[int] = None
+    ) -> int:
+        """
+        Send the same general notification to many users at once.
+
+        The message is stored once in broadcast_notifications; every recipient
+        gets a compact read-state row, filled by a single INSERT ... SELECT.
+        No User / Reservation objects are loaded.
+
+        Args:
+            db: Database session
+            recipients: SELECT of one column of user ids (duplicates are ignored)
+            title: Notification title
+            message: Notification message
+            is_groom: Whether the notifications are for grooms
+            sender_id: Admin sending the broadcast
+
+        Returns:
+            Number of recipients
+        """
+        broadcast = BroadcastNotification(
+            sender_id=sender_id,
+            title=title,
+            message=message,
+            is_groom=is_groom,
+            created_at=datetime.utcnow()
+        )
+        db.add(broadcast)
+        db.flush()
+
+        recipient_ids = recipients.subquery()
+        rows = select(
+            literal(broadcast.id, Integer),
+            list(recipient_ids.c)[0],
+            literal(False, Boolean),
+        ).distinct()
+
+        result = db.execute(
+            insert(BroadcastRecipient).from_select(
+                ["broadcast_id", "user_id", "is_read"], rows)
+        )
+        if not result.rowcount:
+            # Nobody to notify: do not keep an empty broadcast
+            db.rollback()
+            return 0
+
+        db.commit()
+        return result.rowcount
+
+    # ------------------------------------------------------------------
+    # Inbox: personal notifications merged with received broadcasts.
+    # Broadcast items are exposed with id = -broadcast_id, so the per-id
+    # routes (read / get / delete) tell them apart without a new parameter.
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _inbox_query(user_id: int, unread_only: bool = False):
+        personal = select(
+            Notification.id.label("id"),
+            Notification.user_id.label("user_id"),
+            Notification.reservation_id.label("reservation_id"),
+            Notification.notification_type.label("notification_type"),
+            Notification.title.label("title"),
+            Notification.message.label("message"),
+            Notification.is_read.label("is_read"),
+            Notification.is_groom.label("is_groom"),
+            Notification.created_at.label("created_at"),
+            Notification.read_at.label("read_at"),
+        ).where(Notification.user_id == user_id)
+
+        broadcasts = select(
+            (-BroadcastNotification.id).label("id"),
+            BroadcastRecipient.user_id,
+            null(),
+            literal(NotificationType.general_notification,
+                    Notification.__table__.c.notification_type.type),
+            BroadcastNotification.title,
+            BroadcastNotification.message,
+            BroadcastRecipient.is_read,
+            BroadcastNotification.is_groom,
+            BroadcastNotification.created_at,
+            BroadcastRecipient.read_at,
+        ).join_from(
+            BroadcastRecipient, BroadcastNotification,
+            BroadcastRecipient.broadcast_id == BroadcastNotification.id
+        ).where(BroadcastRecipient.user_id == user_id)
+
+        if unread_only:
+            personal = personal.where(Notification.is_read == False)
+            broadcasts = broadcasts.where(BroadcastRecipient.is_read == False)
+
+        return union_all(personal, broadcasts).subquery()
+
+    @staticmethod
+    def get_inbox(
+        db: Session,
+        user_id: int,
+        unread_only: bool = False,
+        limit: int = 50,
+        notification_type: Optional[NotificationType] = None
+    ):
+        """Personal and broadcast notifications of a user, newest first"""
+        inbox = NotificationService._inbox_query(user_id, unread_only)
+        query = select(inbox)
+        if notification_type is not None:
+            query = query.where(inbox.c.notification_type == notification_type)
+        return db.execute(
+            query.order_by(inbox.c.created_at.desc()).limit(limit)
+        ).mappings().all()
+
+    @staticmethod
+    def get_broadcast_item(db: Session, notification_id: int, user_id: int):
+        """One received broadcast, by its inbox id (-broadcast_id), or None"""
+        inbox = NotificationService._inbox_query(user_id)
+        return db.execute(
+            select(inbox).where(inbox.c.id == notification_id)
+        ).mappings().first()
+
     @staticmethod
     def mark_notification_as_read(
         db: Session,
         notification_id: int,
         user_id: int
     ) -> bool:
-        """Mark a notification as read"""
+        """Mark a notification (or a received broadcast) as read"""
+        if notification_id < 0:
+            receipt = db.get(BroadcastRecipient, (-notification_id, user_id))
+            if not receipt:
+                return False
+            receipt.is_read = True
+            receipt.read_at = datetime.utcnow()
+            db.commit()
+            return True
+
         notification = db.query(Notification).filter(
             Notification.id == notification_id,
             Notification.user_id == user_id
@@ -239,13 +374,21 @@ class NotificationService:
         db: Session,
         user_id: int
     ) -> int:
-        """Mark all notifications as read for a user"""
+        """Mark all notifications and received broadcasts as read for a user"""
+        now = datetime.utcnow()
         count = db.query(Notification).filter(
             Notification.user_id == user_id,
             Notification.is_read == False
         ).update({
             "is_read": True,
-            "read_at": datetime.utcnow()
+            "read_at": now
+        })
+        count += db.query(BroadcastRecipient).filter(
+            BroadcastRecipient.user_id == user_id,
+            BroadcastRecipient.is_read == False
+        ).update({
+            "is_read": True,
+            "read_at": now
         })
         db.commit()
         return count
@@ -269,13 +412,80 @@ class NotificationService:
             Notification.created_at.desc()
         ).limit(limit).all()
 
+    @staticmethod
+    def get_unread_broadcast_count(db: Session, user_id: int) -> int:
+        """Get count of unread received broadcasts"""
+        return db.query(BroadcastRecipient).filter(
+            BroadcastRecipient.user_id == user_id,
+            BroadcastRecipient.is_read == False
+        ).count()
+
     @staticmethod
     def get_unread_count(db: Session, user_id: int) -> int:
-        """Get count of unread notifications"""
+        """Get count of unread notifications, broadcasts included"""
         return db.query(Notification).filter(
             Notification.user_id == user_id,
             Notification.is_read == False
-        ).count()
+        ).count() + NotificationService.get_unread_broadcast_count(db, user_id)
+
+    @staticmethod
+    def get_unread_by_type(db: Session, user_id: int) -> Dict[str, int]:
+        """
+        Unread notifications per type, received broadcasts counted as general
+        notifications, in one statement
+        """
+        notifications = select(
+            cast(Notification.notification_type, String).label("type"),
+            func.count().label("count")
+        ).where(
+            Notification.user_id == user_id,
+            Notification.is_read == False
+        ).group_by(Notification.notification_type)
+        broadcasts = select(
+            literal(NotificationType.general_notification.value, String).label("type"),
+            func.count().label("count")
+        ).where(
+            BroadcastRecipient.user_id == user_id,
+            BroadcastRecipient.is_read == False
+        )
+        by_type: Dict[str, int] = {}
+        for notif_type, count in db.execute(union_all(notifications, broadcasts)):
+            if count:
+                by_type[notif_type] = by_type.get(notif_type, 0) + count
+        return by_type
+
+    @staticmethod
+    def delete_broadcast_receipts(
+        db: Session,
+        user_ids: Select,
+        before: Optional[datetime] = None,
+        broadcast_id: Optional[int] = None
+    ) -> int:
+        """
+        Remove received broadcasts from the inboxes of user_ids (optionally
+        only one broadcast, or those sent before a date), then drop broadcasts
+        nobody holds anymore. The caller commits.
+        """
+        query = db.query(BroadcastRecipient).filter(
+            BroadcastRecipient.user_id.in_(user_ids)
+        )
+        if broadcast_id is not None:
+            query = query.filter(BroadcastRecipient.broadcast_id == broadcast_id)
+        if before is not None:
+            query = query.filter(BroadcastRecipient.broadcast_id.in_(
+                select(BroadcastNotification.id).where(
+                    BroadcastNotification.created_at < before)
+            ))
+        count = query.delete(synchronize_session=False)
+
+        if count:
+            db.query(BroadcastNotification).filter(
+                ~select(BroadcastRecipient.broadcast_id).where(
+                    BroadcastRecipient.broadcast_id == BroadcastNotification.id
+                ).exists()
+            ).delete(synchronize_session=False)
+
+        return count
 
     @staticmethod
     def notify_reservation_validation(
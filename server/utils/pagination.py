@@ -0,0 +1,128 @@
+# server\utils\pagination.py
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A page is ordered by (sort column, id); the cursor is the key of the last
+row returned, so the next page is a range scan from that key instead of an
+OFFSET, and memory per request is bounded by `limit`.
+
+Endpoints keep their historical full-list response when neither `limit` nor
+`cursor` is sent; with either, they answer {"items": [...], "next_cursor": ...}.
+"""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Query
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class PageParams:
+    """Query parameters shared by the paginated list endpoints"""
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(
+            None, ge=1, le=MAX_PAGE_SIZE, description="Page size (enables pagination)"),
+        cursor: Optional[str] = Query(
+            None, description="next_cursor of the previous page"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit is not None or self.cursor is not None
+
+
+def _encode_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Tuple[Any, ...]) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [_decode_value(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="مؤشر الصفحة غير صالح")
+
+
+def _after(sort_column, id_column, sort_value, id_value, descending: bool):
+    """Rows strictly after (sort_value, id_value) in the page order"""
+    if descending:
+        return or_(sort_column < sort_value,
+                   and_(sort_column == sort_value, id_column < id_value))
+    return or_(sort_column > sort_value,
+               and_(sort_column == sort_value, id_column > id_value))
+
+
+def paginate(query, sort_column, id_column, params: PageParams,
+             descending: bool = True) -> Tuple[list, Optional[str]]:
+    """
+    Apply the keyset order (and the page window when params.enabled) to a
+    query. Returns (rows, next_cursor); next_cursor is None on the last page.
+
+    sort_column may be id_column itself for tables without a better key.
+    """
+    same_key = sort_column is id_column
+    order = [sort_column.desc() if descending else sort_column.asc()]
+    if not same_key:
+        order.append(id_column.desc() if descending else id_column.asc())
+    query = query.order_by(*order)
+
+    if not params.enabled:
+        return query.all(), None
+
+    if params.cursor:
+        if same_key:
+            (id_value,) = decode_cursor(params.cursor, [id_column])
+            query = query.filter(
+                id_column < id_value if descending else id_column > id_value)
+        else:
+            sort_value, id_value = decode_cursor(
+                params.cursor, [sort_column, id_column])
+            query = query.filter(
+                _after(sort_column, id_column, sort_value, id_value, descending))
+
+    limit = params.limit or DEFAULT_PAGE_SIZE
+    # One extra row tells whether there is a next page
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    key_columns = [id_column] if same_key else [sort_column, id_column]
+    return rows, encode_cursor(tuple(getattr(last, c.key) for c in key_columns))
+
+
+def page_response(items: list, next_cursor: Optional[str], params: PageParams):
+    """Historical full list, or the paginated envelope"""
+    if not params.enabled:
+        return items
+    return {"items": items, "next_cursor": next_cursor}
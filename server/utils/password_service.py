@@ -0,0 +1,152 @@
+# server\utils\password_service.py
+"""
+Password hashing / verification off the request threads.
+
+bcrypt with 12 rounds costs ~250 ms of CPU per call. Running it inline blocks
+the event loop in async routes (register_grooms_bulk) and eats the shared
+threadpool in sync ones. Every call goes through a dedicated, bounded
+executor instead:
+- PASSWORD_POOL_WORKERS threads run bcrypt concurrently
+- at most PASSWORD_POOL_MAX_PENDING more calls may wait for a thread; past
+  that, callers wait up to PASSWORD_POOL_WAIT_SECONDS and then get a 503
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List
+
+from fastapi import HTTPException
+
+from server.auth_utils import get_password_hash, verify_password
+
+logger = logging.getLogger(__name__)
+
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", 2))
+PASSWORD_POOL_MAX_PENDING = int(os.getenv("PASSWORD_POOL_MAX_PENDING", 64))
+PASSWORD_POOL_WAIT_SECONDS = float(os.getenv("PASSWORD_POOL_WAIT_SECONDS", 10))
+
+
+class PasswordService:
+    """Bounded bcrypt executor with sync and async entry points"""
+
+    def __init__(self, workers: int = PASSWORD_POOL_WORKERS,
+                 max_pending: int = PASSWORD_POOL_MAX_PENDING,
+                 wait_seconds: float = PASSWORD_POOL_WAIT_SECONDS):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.wait_seconds = wait_seconds
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="bcrypt")
+        # Admission control: running + queued calls
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._lock = threading.Lock()
+        self._metrics = {
+            "hash_total": 0,
+            "verify_total": 0,
+            "rejected_total": 0,
+            "in_flight": 0,
+            "busy_seconds_total": 0.0,
+            "queue_wait_seconds_total": 0.0,
+            "queue_wait_seconds_max": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _reject(self) -> HTTPException:
+        with self._lock:
+            self._metrics["rejected_total"] += 1
+        logger.warning("Password pool saturated, rejecting request")
+        return HTTPException(
+            status_code=503, detail="الخادم مشغول حاليا، يرجى المحاولة بعد قليل")
+
+    def _run(self, kind: str, fn: Callable, args: tuple, submitted_at: float):
+        started = time.monotonic()
+        wait = started - submitted_at
+        with self._lock:
+            self._metrics["queue_wait_seconds_total"] += wait
+            self._metrics["queue_wait_seconds_max"] = max(
+                self._metrics["queue_wait_seconds_max"], wait)
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._metrics[f"{kind}_total"] += 1
+                self._metrics["in_flight"] -= 1
+                self._metrics["busy_seconds_total"] += time.monotonic() - started
+            self._slots.release()
+
+    def _submit(self, kind: str, fn: Callable, *args) -> Future:
+        """Caller must already hold a slot"""
+        with self._lock:
+            self._metrics["in_flight"] += 1
+        try:
+            return self._executor.submit(self._run, kind, fn, args, time.monotonic())
+        except Exception:
+            with self._lock:
+                self._metrics["in_flight"] -= 1
+            self._slots.release()
+            raise
+
+    def _call_sync(self, kind: str, fn: Callable, *args):
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            raise self._reject()
+        return self._submit(kind, fn, *args).result()
+
+    async def _call_async(self, kind: str, fn: Callable, *args):
+        deadline = time.monotonic() + self.wait_seconds
+        while not self._slots.acquire(blocking=False):
+            if time.monotonic() >= deadline:
+                raise self._reject()
+            await asyncio.sleep(0.05)
+        return await asyncio.wrap_future(self._submit(kind, fn, *args))
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def hash_sync(self, password: str) -> str:
+        """For sync routes / startup code (already off the event loop)"""
+        return self._call_sync("hash", get_password_hash, password)
+
+    def verify_sync(self, plain_password: str, hashed_password: str) -> bool:
+        return self._call_sync("verify", verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        """For async routes: the event loop stays free while bcrypt runs"""
+        return await self._call_async("hash", get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._call_async("verify", verify_password, plain_password, hashed_password)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """
+        Hash a batch concurrently. Only a few calls per worker are queued at a
+        time so logins keep getting slots during a large import.
+        """
+        batch_size = self.workers * 4
+        hashes: List[str] = []
+        for start in range(0, len(passwords), batch_size):
+            batch = passwords[start:start + batch_size]
+            hashes.extend(await asyncio.gather(*(self.hash(p) for p in batch)))
+        return hashes
+
+    def stats(self) -> dict:
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics.update({
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+        })
+        return metrics
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared instance used by the auth routes and startup code
+password_service = PasswordService()
@@ -1,10 +1,17 @@
 from docx import Document
+from docx.oxml.ns import qn
+from docx.text.paragraph import Paragraph
+import copy
 import os
+import re
 import subprocess
 import sys
 import logging
+import threading
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, List, Optional
 
 from server.models.clan import Clan
 from server.models.committee import HaiaCommittee, MadaehCommittee
@@ -14,13 +21,70 @@ from server.models.user import User
 logger = logging.getLogger(__name__)
 
 
-def replace_placeholder_in_runs(runs, key, value):
-    """Replace placeholder text inside runs while preserving formatting."""
-    placeholder = f"{{{{{key}}}}}"
+# No braces inside the key: in "{{x {{y}}" only {{y}} is a placeholder
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([^{}]+)\}\}")
+
+
+@dataclass
+class _ParsedTemplate:
+    mtime: float
+    document: object
+    # Positions, in document order of <w:p>, of the paragraphs holding a {{key}}
+    slots: List[int]
+
+
+# Parsed templates by path, re-read only when the file changes on disk
+_template_cache: Dict[str, _ParsedTemplate] = {}
+_template_lock = threading.Lock()
+
+
+def _searched_paragraphs(doc):
+    """Body paragraphs, then the paragraphs of table cells."""
+    yield from doc.paragraphs
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                yield from cell.paragraphs
+
+
+def _load_template(template_path: str) -> _ParsedTemplate:
+    mtime = os.path.getmtime(template_path)
+    with _template_lock:
+        cached = _template_cache.get(template_path)
+        if cached and cached.mtime == mtime:
+            return cached
+
+        doc = Document(template_path)
+        # The list keeps the lxml proxies alive, so their ids stay unique
+        paragraphs = list(doc.element.body.iter(qn("w:p")))
+        positions = {id(p): i for i, p in enumerate(paragraphs)}
+        slots = set()
+        for p in _searched_paragraphs(doc):
+            if PLACEHOLDER_PATTERN.search("".join(run.text for run in p.runs)):
+                slots.add(positions[id(p._p)])
+
+        cached = _ParsedTemplate(mtime=mtime, document=doc, slots=sorted(slots))
+        _template_cache[template_path] = cached
+        logger.info(f"تم تحميل القالب في الذاكرة: {template_path} ({len(slots)} فقرة)")
+        return cached
+
+
+def replace_placeholders_in_runs(runs, context: dict):
+    """Replace every {{key}} of context in one pass while preserving formatting."""
     # Merge all run text into one string
     full_text = "".join(run.text for run in runs)
-    if placeholder in full_text:
-        full_text = full_text.replace(placeholder, str(value or ""))
+    found = False
+
+    def substitute(match):
+        nonlocal found
+        key = match.group(1)
+        if key not in context:
+            return match.group(0)
+        found = True
+        return str(context[key] or "")
+
+    full_text = PLACEHOLDER_PATTERN.sub(substitute, full_text)
+    if found:
         # Clear all runs first
         for run in runs:
             run.text = ""
@@ -31,20 +95,12 @@ def replace_placeholder_in_runs(runs, key, value):
 def fill_docx_template(template_path: str, output_path: str, context: dict):
     """Fill DOCX template with context data."""
     try:
-        doc = Document(template_path)
-
-        # Replace in paragraphs
-        for p in doc.paragraphs:
-            for key, value in context.items():
-                replace_placeholder_in_runs(p.runs, key, value)
+        template = _load_template(template_path)
+        doc = copy.deepcopy(template.document)
 
-        # Replace in tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for p in cell.paragraphs:
-                        for key, value in context.items():
-                            replace_placeholder_in_runs(p.runs, key, value)
+        paragraphs = list(doc.element.body.iter(qn("w:p")))
+        for position in template.slots:
+            replace_placeholders_in_runs(Paragraph(paragraphs[position], None).runs, context)
 
         doc.save(output_path)
         logger.info(f"تم ملء قالب DOCX بنجاح: {output_path}")
@@ -53,8 +109,16 @@ def fill_docx_template(template_path: str, output_path: str, context: dict):
         raise
 
 
+# Resolved once per process: probing runs `--version` subprocesses
+_libreoffice_path = None
+
+
 def find_libreoffice():
-    """Find LibreOffice executable path."""
+    """Find LibreOffice executable path (cached after the first hit)."""
+    global _libreoffice_path
+    if _libreoffice_path:
+        return _libreoffice_path
+
     possible_paths = [
         "libreoffice",  # Linux in PATH
         "/usr/bin/libreoffice",  # Linux standard location
@@ -77,6 +141,7 @@ def find_libreoffice():
             if result.returncode == 0:
                 logger.info(f"تم العثور على LibreOffice في: {path}")
                 logger.info(f"الإصدار: {result.stdout.strip()}")
+                _libreoffice_path = path
                 return path
         except (subprocess.TimeoutExpired, FileNotFoundError, OSError):
             continue
@@ -85,8 +150,13 @@ def find_libreoffice():
     return None
 
 
-def convert_to_pdf(docx_path: str, pdf_path: str):
-    """Convert DOCX to PDF using LibreOffice."""
+def convert_to_pdf(docx_path: str, pdf_path: str, profile_dir: Optional[Path] = None):
+    """
+    Convert DOCX to PDF using a one-shot LibreOffice process.
+
+    profile_dir: reuse an already initialized LibreOffice user profile
+    instead of the default one (first start of a profile is the slow part).
+    """
     docx_path = Path(docx_path).resolve()
     pdf_path = Path(pdf_path).resolve()
 
@@ -112,6 +182,8 @@ def convert_to_pdf(docx_path: str, pdf_path: str):
             "--outdir", str(pdf_path.parent),
             str(docx_path)
         ]
+        if profile_dir is not None:
+            cmd.insert(1, f"-env:UserInstallation={Path(profile_dir).resolve().as_uri()}")
 
         logger.info(f"تنفيذ الأمر: {' '.join(cmd)}")
 
@@ -139,10 +211,6 @@ def convert_to_pdf(docx_path: str, pdf_path: str):
             error_msg = result.stderr or result.stdout or "خطأ غير معروف"
             raise Exception(f"فشل تحويل LibreOffice: {error_msg}")
 
-        # Wait a moment for file system to sync
-        import time
-        time.sleep(1)
-
         # If the expected PDF location is different from target, move it
         if expected_pdf != pdf_path:
             if expected_pdf.exists():
@@ -191,8 +259,13 @@ def find_template_path():
     )
 
 
-def generate_wedding_pdf(reservation, output_dir: str, db):
-    """Generate wedding PDF from reservation data."""
+def generate_wedding_pdf(reservation, output_dir: str, db, converter=None):
+    """
+    Generate wedding PDF from reservation data.
+
+    converter: object with convert(docx_path, pdf_path), e.g. a warm
+    LibreOffice process from utils.pdf_worker; defaults to convert_to_pdf.
+    """
     try:
         # Ensure output directory exists
         output_dir = Path(output_dir).resolve()
@@ -299,7 +372,10 @@ def generate_wedding_pdf(reservation, output_dir: str, db):
         logger.info(f"تم إنشاء DOCX بنجاح: {filled_docx_path}")
 
         # Convert to PDF
-        convert_to_pdf(str(filled_docx_path), str(pdf_path))
+        if converter is not None:
+            converter.convert(str(filled_docx_path), str(pdf_path))
+        else:
+            convert_to_pdf(str(filled_docx_path), str(pdf_path))
 
         # Verify PDF was created
         if not pdf_path.exists():
@@ -0,0 +1,323 @@
+# server\utils\pdf_worker.py
+"""
+Background PDF rendering for reservations.
+
+/pdf/generate used to fill the DOCX and spawn a fresh `soffice --headless`
+inside the request, blocking a request worker for seconds per document.
+Jobs now go to a bounded queue served by PDF_WORKERS threads. Each thread
+owns one long-lived LibreOffice process in listener mode and converts over
+UNO, so LibreOffice starts once per worker instead of once per document.
+
+The UNO bridge (python3-uno) is optional. Without it a worker falls back to
+`soffice --convert-to` with its own, already initialized profile.
+
+Job state lives in this process. /pdf/status also reads reservation.pdf_url,
+so a request served by another uvicorn worker still sees finished PDFs.
+"""
+import logging
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+
+from server.db import SessionLocal
+from server.models.reservation import Reservation
+from server.utils.metrics import pdf_conversion_duration
+from server.utils.pdf_generator import convert_to_pdf, find_libreoffice, generate_wedding_pdf
+
+try:
+    import uno
+except ImportError:  # python3-uno is shipped with LibreOffice, not on PyPI
+    uno = None
+
+logger = logging.getLogger(__name__)
+
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", 1))
+PDF_MAX_QUEUED = int(os.getenv("PDF_MAX_QUEUED", 100))
+PDF_CONVERT_TIMEOUT_SECONDS = int(os.getenv("PDF_CONVERT_TIMEOUT_SECONDS", 120))
+PDF_START_TIMEOUT_SECONDS = int(os.getenv("PDF_START_TIMEOUT_SECONDS", 30))
+# Restart a LibreOffice process after this many documents (memory growth)
+PDF_RECYCLE_AFTER = int(os.getenv("PDF_RECYCLE_AFTER", 200))
+# Finished jobs kept for /pdf/status
+PDF_JOB_HISTORY = int(os.getenv("PDF_JOB_HISTORY", 500))
+PDF_OUTPUT_DIR = "generated_pdfs"
+
+
+def _property(name: str, value):
+    prop = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+class LibreOfficeConverter:
+    """One warm LibreOffice process, used by a single worker thread"""
+
+    def __init__(self, name: str):
+        self.name = name
+        suffix = f"{os.getpid()}_{name}"
+        self.pipe_name = f"lo_pipe_{suffix}"
+        self.profile_dir = Path(tempfile.gettempdir()) / f"lo_profile_{suffix}"
+        self.conversions = 0
+        self._process: Optional[subprocess.Popen] = None
+        self._desktop = None
+
+    def _start(self):
+        office = find_libreoffice()
+        if not office:
+            raise Exception("لم يتم العثور على LibreOffice. الرجاء تثبيت LibreOffice.")
+
+        connection = f"pipe,name={self.pipe_name};urp;StarOffice.ComponentContext"
+        self._process = subprocess.Popen(
+            [office, "--headless", "--invisible", "--nologo", "--norestore",
+             "--nodefault", "--nolockcheck",
+             f"-env:UserInstallation={self.profile_dir.as_uri()}",
+             f"--accept={connection}"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context)
+        deadline = time.monotonic() + PDF_START_TIMEOUT_SECONDS
+        while True:
+            try:
+                context = resolver.resolve(f"uno:{connection}")
+                break
+            except Exception:
+                if self._process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise Exception("تعذر تشغيل LibreOffice في وضع الاستماع")
+                time.sleep(0.25)
+
+        self._desktop = context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context)
+        logger.info(f"LibreOffice worker {self.name} started (pid {self._process.pid})")
+
+    def _kill(self):
+        if self._process and self._process.poll() is None:
+            logger.error(f"LibreOffice worker {self.name} timed out, killing it")
+            self._process.kill()
+
+    def convert(self, docx_path: str, pdf_path: str):
+        if uno is None:
+            convert_to_pdf(docx_path, pdf_path, profile_dir=self.profile_dir)
+            return
+
+        docx_path = Path(docx_path).resolve()
+        pdf_path = Path(pdf_path).resolve()
+        pdf_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if self._desktop is None or self._process.poll() is not None:
+            self.stop()
+            self._start()
+
+        # A hung conversion cannot be interrupted over UNO: kill the process,
+        # which makes the pending call fail
+        watchdog = threading.Timer(PDF_CONVERT_TIMEOUT_SECONDS, self._kill)
+        watchdog.start()
+        try:
+            document = self._desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(str(docx_path)), "_blank", 0,
+                (_property("Hidden", True),))
+            try:
+                document.storeToURL(
+                    uno.systemPathToFileUrl(str(pdf_path)),
+                    (_property("FilterName", "writer_pdf_Export"),))
+            finally:
+                document.close(True)
+        except Exception as e:
+            # The process is in an unknown state: start a fresh one next time
+            self.stop()
+            logger.error(f"خطأ في تحويل LibreOffice: {e}")
+            raise Exception(f"فشل تحويل PDF: {str(e)}")
+        finally:
+            watchdog.cancel()
+
+        if not pdf_path.exists():
+            raise Exception(f"لم يتم إنشاء ملف PDF في: {pdf_path}")
+
+        self.conversions += 1
+        if self.conversions >= PDF_RECYCLE_AFTER:
+            self.stop()
+
+    def stop(self):
+        if self._desktop is not None:
+            try:
+                self._desktop.terminate()
+            except Exception:
+                pass
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._process = None
+        self._desktop = None
+        self.conversions = 0
+
+
+class PdfJobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    done = "done"
+    failed = "failed"
+
+
+@dataclass
+class PdfJob:
+    id: str
+    reservation_id: int
+    status: PdfJobStatus = PdfJobStatus.queued
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in (PdfJobStatus.queued, PdfJobStatus.running)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "reservation_id": self.reservation_id,
+            "status": self.status.value,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+        }
+
+
+class PdfWorkerPool:
+    """Job queue plus worker threads, each with its own LibreOffice"""
+
+    def __init__(self, workers: int = PDF_WORKERS, max_queued: int = PDF_MAX_QUEUED):
+        self.workers = workers
+        self._queue: "queue.Queue[Optional[PdfJob]]" = queue.Queue(maxsize=max_queued)
+        self._jobs: Dict[str, PdfJob] = {}
+        self._by_reservation: Dict[int, str] = {}
+        self._converters: List[LibreOfficeConverter] = []
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        """Caller holds the lock"""
+        if self._threads:
+            return
+        for n in range(self.workers):
+            converter = LibreOfficeConverter(str(n))
+            thread = threading.Thread(
+                target=self._work, args=(converter,), name=f"pdf-{n}", daemon=True)
+            self._converters.append(converter)
+            self._threads.append(thread)
+            thread.start()
+
+    def _prune(self):
+        """Drop the oldest finished jobs; caller holds the lock"""
+        finished = [job for job in self._jobs.values() if not job.active]
+        for job in finished[:max(0, len(finished) - PDF_JOB_HISTORY)]:
+            del self._jobs[job.id]
+            if self._by_reservation.get(job.reservation_id) == job.id:
+                del self._by_reservation[job.reservation_id]
+
+    def submit(self, reservation_id: int) -> PdfJob:
+        """Queue a PDF for the reservation, or return its pending job"""
+        with self._lock:
+            current = self._jobs.get(self._by_reservation.get(reservation_id))
+            if current and current.active:
+                return current
+
+            self._ensure_started()
+            self._prune()
+            job = PdfJob(id=uuid.uuid4().hex, reservation_id=reservation_id,
+                         created_at=datetime.utcnow())
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                logger.warning("PDF queue full, rejecting job")
+                raise HTTPException(
+                    status_code=503, detail="الخادم مشغول حاليا، يرجى المحاولة بعد قليل")
+            self._jobs[job.id] = job
+            self._by_reservation[reservation_id] = job.id
+            return job
+
+    def job_for_reservation(self, reservation_id: int) -> Optional[PdfJob]:
+        with self._lock:
+            return self._jobs.get(self._by_reservation.get(reservation_id))
+
+    def _work(self, converter: LibreOfficeConverter):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            try:
+                self._run(job, converter)
+            except Exception as e:
+                logger.error(f"PDF worker {converter.name} crashed on job {job.id}: {e}")
+        converter.stop()
+
+    def _run(self, job: PdfJob, converter: LibreOfficeConverter):
+        job.status = PdfJobStatus.running
+        job.started_at = datetime.utcnow()
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            reservation = db.get(Reservation, job.reservation_id)
+            if not reservation:
+                raise Exception("الحجز غير موجود")
+            pdf_path = generate_wedding_pdf(
+                reservation, PDF_OUTPUT_DIR, db, converter=converter)
+            reservation.pdf_url = pdf_path
+            db.commit()
+            job.status = PdfJobStatus.done
+        except Exception as e:
+            db.rollback()
+            logger.error(f"PDF generation failed for reservation {job.reservation_id}: {e}")
+            job.error = str(e)
+            job.status = PdfJobStatus.failed
+        finally:
+            db.close()
+            job.finished_at = datetime.utcnow()
+            pdf_conversion_duration.labels(job.status.value).observe(
+                time.perf_counter() - started)
+
+    def stats(self) -> dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {status.value: 0 for status in PdfJobStatus}
+        for job in jobs:
+            counts[job.status.value] += 1
+        return {
+            "workers": self.workers,
+            "uno_available": uno is not None,
+            "queued": self._queue.qsize(),
+            "jobs": counts,
+        }
+
+    def shutdown(self) -> None:
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+        # Do not leave soffice processes behind, even with a backlog queued
+        for converter in self._converters:
+            converter.stop()
+
+
+# Shared instance used by the pdf routes
+pdf_worker_pool = PdfWorkerPool()
@@ -0,0 +1,182 @@
+# server\utils\principal_cache.py
+"""
+Bounded TTL cache of authenticated principals.
+
+A principal is a small, detached snapshot of the user columns the role guards
+need (id, role, clan, county, status, phone verification). Entries are keyed
+by (user_id, token iat) so a new login never reuses an old snapshot.
+
+users.auth_version is the shared validity key: a before_flush hook on
+SessionLocal bumps it, in the same transaction, whenever one of those columns
+changes. Every PRINCIPAL_CACHE_REVALIDATE_SECONDS each worker reads the
+versions of the users it holds in one query and drops the snapshots that no
+longer match, or whose user was deleted; the worker that made the change
+drops them as soon as it commits. A demoted, disabled or deleted user loses
+access on every worker within PRINCIPAL_CACHE_REVALIDATE_SECONDS.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from server.db import SessionLocal
+from server.models.user import User, UserRole, UserStatus
+
+PRINCIPAL_CACHE_TTL_SECONDS = int(
+    os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", 5000))
+PRINCIPAL_CACHE_REVALIDATE_SECONDS = float(
+    os.getenv("PRINCIPAL_CACHE_REVALIDATE_SECONDS", 2))
+
+# User columns a Principal is built from; changing one bumps auth_version
+PRINCIPAL_FIELDS = ("role", "clan_id", "county_id", "status", "phone_verified")
+
+# Session.info key of the users changed in the current transaction
+_CHANGED = "principal_cache_changed"
+
+_REVALIDATE_CHUNK = 500
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Lightweight, session-independent view of the current user"""
+    id: int
+    role: UserRole
+    clan_id: Optional[int]
+    county_id: Optional[int]
+    status: Optional[UserStatus]
+    phone_verified: bool
+    version: int
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            role=user.role,
+            clan_id=user.clan_id,
+            county_id=user.county_id,
+            status=user.status,
+            phone_verified=bool(user.phone_verified),
+            version=user.auth_version or 0,
+        )
+
+
+class PrincipalCache:
+    """LRU of Principal snapshots with a per-entry TTL"""
+
+    def __init__(self, ttl_seconds: int = PRINCIPAL_CACHE_TTL_SECONDS,
+                 max_size: int = PRINCIPAL_CACHE_MAX_SIZE,
+                 revalidate_seconds: float = PRINCIPAL_CACHE_REVALIDATE_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.revalidate_seconds = revalidate_seconds
+        self._entries: "OrderedDict[Tuple[int, Optional[int]], Tuple[Principal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._revalidating = threading.Lock()
+        self._revalidated_at = time.monotonic()
+
+    def get(self, user_id: int, iat: Optional[int]) -> Optional[Principal]:
+        key = (user_id, iat)
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            principal, stored_at = item
+            if time.monotonic() - stored_at >= self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def put(self, iat: Optional[int], principal: Principal) -> None:
+        key = (principal.id, iat)
+        with self._lock:
+            self._entries[key] = (principal, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every snapshot of a user (all of their tokens)"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def revalidate(self, db: Session) -> None:
+        """Drop the snapshots whose auth_version moved, or whose user is gone"""
+        with self._lock:
+            user_ids = {user_id for user_id, _ in self._entries}
+
+        versions = {}
+        ordered = sorted(user_ids)
+        for start in range(0, len(ordered), _REVALIDATE_CHUNK):
+            chunk = ordered[start:start + _REVALIDATE_CHUNK]
+            versions.update(db.execute(
+                select(User.id, User.auth_version).where(User.id.in_(chunk))
+            ).all())
+
+        with self._lock:
+            for key, (principal, _) in list(self._entries.items()):
+                # Entries added since the read are checked on the next round
+                if principal.id in user_ids and versions.get(principal.id) != principal.version:
+                    del self._entries[key]
+
+    def revalidate_if_due(self) -> None:
+        """Run revalidate() at most every revalidate_seconds, in one thread"""
+        if time.monotonic() - self._revalidated_at < self.revalidate_seconds:
+            return
+        if not self._revalidating.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() - self._revalidated_at < self.revalidate_seconds:
+                return
+            db = SessionLocal()
+            try:
+                self.revalidate(db)
+            finally:
+                db.close()
+            self._revalidated_at = time.monotonic()
+        finally:
+            self._revalidating.release()
+
+
+# Shared instance used by auth_utils
+principal_cache = PrincipalCache()
+
+
+def _before_flush(session: Session, flush_context, instances) -> None:
+    changed = session.info.setdefault(_CHANGED, set())
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changed.add(obj.id)
+    for obj in session.dirty:
+        if not isinstance(obj, User) or obj.id is None:
+            continue
+        attrs = inspect(obj).attrs
+        if any(attrs[name].history.has_changes() for name in PRINCIPAL_FIELDS):
+            # Incremented in SQL: concurrent changes never share a version
+            obj.auth_version = User.auth_version + 1
+            changed.add(obj.id)
+
+
+def _after_commit(session: Session) -> None:
+    for user_id in session.info.pop(_CHANGED, ()):
+        principal_cache.invalidate_user(user_id)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED, None)
+
+
+event.listen(SessionLocal, "before_flush", _before_flush)
+event.listen(SessionLocal, "after_commit", _after_commit)
+event.listen(SessionLocal, "after_rollback", _after_rollback)
@@ -0,0 +1,168 @@
+# server\utils\query_stats.py
+"""
+Per-request SQL statement counting and N+1 detection.
+
+SQLAlchemy cursor events add every statement and its duration to the stats
+of the request being served (a ContextVar, which follows sync routes into
+the threadpool). The middleware then:
+- adds a Server-Timing header: db time and statement count, plus total time
+- flags statements run QUERY_REPEAT_THRESHOLD or more times with different
+  parameters in one request (the N+1 pattern) and logs them
+- folds the request into per-route totals for /admin/diagnostics/queries
+
+The totals are per worker process (the report says which one) and reset
+with it. Statements issued outside a request (workers, startup) are ignored.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from fastapi import FastAPI, Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "true").lower() != "false"
+# Identical statements per request from which the request is flagged as N+1
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", 5))
+# Repeated statements kept per route in the report
+QUERY_REPORT_TOP_STATEMENTS = 5
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class RequestQueries:
+    count: int = 0
+    seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def repeated(self) -> Dict[str, int]:
+        return {sql: n for sql, n in self.statements.items()
+                if n >= QUERY_REPEAT_THRESHOLD}
+
+
+@dataclass
+class RouteQueries:
+    requests: int = 0
+    queries: int = 0
+    max_queries: int = 0
+    db_seconds: float = 0.0
+    max_db_seconds: float = 0.0
+    n_plus_one_requests: int = 0
+    # statement -> highest repeat count seen in one request
+    repeated: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        top = sorted(self.repeated.items(), key=lambda item: -item[1])
+        return {
+            "requests": self.requests,
+            "queries_total": self.queries,
+            "queries_avg": round(self.queries / self.requests, 2) if self.requests else 0,
+            "queries_max": self.max_queries,
+            "db_ms_avg": round(self.db_seconds * 1000 / self.requests, 2) if self.requests else 0,
+            "db_ms_max": round(self.max_db_seconds * 1000, 2),
+            "n_plus_one_requests": self.n_plus_one_requests,
+            "repeated_statements": [
+                {"statement": sql, "max_per_request": n}
+                for sql, n in top[:QUERY_REPORT_TOP_STATEMENTS]
+            ],
+        }
+
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+_routes: Dict[str, RouteQueries] = {}
+_routes_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_started")
+    if started:
+        stats.seconds += time.perf_counter() - started.pop()
+    stats.count += 1
+    stats.statements[_WHITESPACE.sub(" ", statement).strip()] += 1
+
+
+def _record(route: str, stats: RequestQueries) -> Dict[str, int]:
+    repeated = stats.repeated()
+    with _routes_lock:
+        totals = _routes.setdefault(route, RouteQueries())
+        totals.requests += 1
+        totals.queries += stats.count
+        totals.max_queries = max(totals.max_queries, stats.count)
+        totals.db_seconds += stats.seconds
+        totals.max_db_seconds = max(totals.max_db_seconds, stats.seconds)
+        if repeated:
+            totals.n_plus_one_requests += 1
+            for sql, n in repeated.items():
+                totals.repeated[sql] = max(totals.repeated.get(sql, 0), n)
+    return repeated
+
+
+def route_key(request: Request) -> str:
+    """METHOD + path template (/reservations/{id}), "unmatched" for unrouted requests"""
+    route = request.scope.get("route")
+    path = getattr(route, "path", None) or "unmatched"
+    return f"{request.method} {path}"
+
+
+def report() -> dict:
+    with _routes_lock:
+        routes = {key: totals.to_dict() for key, totals in _routes.items()}
+    return {
+        "pid": os.getpid(),
+        "repeat_threshold": QUERY_REPEAT_THRESHOLD,
+        "routes": dict(sorted(routes.items(), key=lambda item: -item[1]["queries_total"])),
+    }
+
+
+def reset() -> None:
+    with _routes_lock:
+        _routes.clear()
+
+
+def install_query_stats(app: FastAPI, engine: Engine) -> None:
+    if not QUERY_STATS_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.middleware("http")
+    async def count_queries(request: Request, call_next):
+        stats = RequestQueries()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            _current.reset(token)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        route = route_key(request)
+        repeated = _record(route, stats)
+        if repeated:
+            worst = max(repeated.values())
+            logger.warning(
+                f"Possible N+1 on {route}: {stats.count} queries, "
+                f"{len(repeated)} statement(s) repeated up to {worst} times")
+
+        timing = (f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries", '
+                  f'app;dur={total_ms:.1f}')
+        existing = response.headers.get("server-timing")
+        response.headers["Server-Timing"] = f"{existing}, {timing}" if existing else timing
+        return response
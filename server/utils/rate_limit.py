@@ -0,0 +1,185 @@
+# server\utils\rate_limit.py
+"""
+Token-bucket rate limits shared by all worker processes.
+
+The OTP limit used to live in a module-level dict: it was split between the
+uvicorn workers, reset on every redeploy and grew with every phone number
+ever tried. Buckets now live in the rate_limit_buckets table:
+- a bucket holds `capacity` tokens and refills `capacity` per `window_seconds`
+- a hit creates the row with INSERT ... ON CONFLICT DO NOTHING, then locks it
+  (SELECT ... FOR UPDATE), so concurrent hits on one key are serialized
+- expires_at is when the bucket is full again; expired rows mean "full" and
+  are purged every RATE_LIMIT_PURGE_SECONDS, so the table stays small
+
+A limiter is used directly (hit / allow) or as a route dependency that
+answers 429 with Retry-After. If the table cannot be reached the request is
+let through: a rate limit must not take logins down with it.
+"""
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Request
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from server.db import SessionLocal
+from server.models.rate_limit import RateLimitBucket
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() != "false"
+RATE_LIMIT_PURGE_SECONDS = int(os.getenv("RATE_LIMIT_PURGE_SECONDS", 300))
+
+_last_purge = 0.0
+_purge_lock = threading.Lock()
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    remaining: int
+    # Seconds until the next token, when not allowed
+    retry_after: int = 0
+
+
+def _insert_ignore(db: Session, values: dict):
+    insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    return insert(RateLimitBucket).values(**values).on_conflict_do_nothing(
+        index_elements=["key"])
+
+
+def _purge_expired(db: Session, now: datetime) -> None:
+    """Drop full buckets, at most once per RATE_LIMIT_PURGE_SECONDS per process"""
+    global _last_purge
+    with _purge_lock:
+        if time.monotonic() - _last_purge < RATE_LIMIT_PURGE_SECONDS:
+            return
+        _last_purge = time.monotonic()
+    deleted = db.query(RateLimitBucket).filter(
+        RateLimitBucket.expires_at < now).delete(synchronize_session=False)
+    db.commit()
+    if deleted:
+        logger.info(f"Purged {deleted} expired rate limit buckets")
+
+
+class RateLimiter:
+    """`capacity` hits per `window_seconds` and per key, refilled continuously"""
+
+    def __init__(self, name: str, capacity: int, window_seconds: int,
+                 message: str = "لقد تجاوزت الحد الأقصى من المحاولات. حاول لاحقا"):
+        self.name = name
+        self.capacity = capacity
+        self.window_seconds = window_seconds
+        self.rate = capacity / window_seconds  # tokens per second
+        self.message = message
+
+    def _hit(self, db: Session, key: str, now: datetime) -> RateLimitResult:
+        bucket_key = f"{self.name}:{key}"[:255]
+        db.execute(_insert_ignore(db, {
+            "key": bucket_key,
+            "tokens": float(self.capacity),
+            "updated_at": now,
+            "expires_at": now,
+        }))
+        bucket = db.query(RateLimitBucket).filter(
+            RateLimitBucket.key == bucket_key).with_for_update().one()
+
+        if bucket.expires_at <= now:
+            tokens = float(self.capacity)
+        else:
+            elapsed = max(0.0, (now - bucket.updated_at).total_seconds())
+            tokens = min(float(self.capacity), bucket.tokens + elapsed * self.rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        bucket.tokens = tokens
+        bucket.updated_at = now
+        bucket.expires_at = now + timedelta(
+            seconds=(self.capacity - tokens) / self.rate)
+        db.commit()
+
+        retry_after = 0 if allowed else math.ceil((1 - tokens) / self.rate)
+        return RateLimitResult(allowed, int(tokens), retry_after)
+
+    def hit(self, key: str) -> RateLimitResult:
+        """Take one token for key; in its own short transaction"""
+        if not RATE_LIMIT_ENABLED:
+            return RateLimitResult(True, self.capacity)
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            result = self._hit(db, key, now)
+            _purge_expired(db, now)
+            return result
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Rate limiter {self.name} unavailable, allowing: {e}")
+            return RateLimitResult(True, self.capacity)
+        finally:
+            db.close()
+
+    def allow(self, key: str) -> bool:
+        return self.hit(key).allowed
+
+    def dependency(self, key_func: "Callable[[Request], Awaitable[str]]" = None):
+        """Route dependency taking one token per request (429 when empty)"""
+        key_func = key_func or phone_or_client_ip
+
+        async def check(request: Request):
+            key = await key_func(request)
+            # hit() talks to the database; keep it off the event loop
+            result = await run_in_threadpool(self.hit, key)
+            if not result.allowed:
+                logger.warning(f"Rate limit {self.name} exceeded for {key}")
+                raise HTTPException(
+                    status_code=429,
+                    detail=self.message,
+                    headers={"Retry-After": str(result.retry_after)}
+                )
+        return check
+
+
+def client_ip(request: Request) -> str:
+    """First hop of X-Forwarded-For (Railway's proxy), else the peer address"""
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded:
+        return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def phone_or_client_ip(request: Request) -> str:
+    """phone_number of the JSON body (the attacked account), else the client IP"""
+    phone: Optional[str] = None
+    try:
+        body = await request.json()
+        if isinstance(body, dict):
+            phone = body.get("phone_number")
+    except Exception:
+        pass
+    if phone:
+        return "phone:" + "".join(filter(str.isdigit, str(phone)))[-9:]
+    return "ip:" + client_ip(request)
+
+
+# Shared limiters
+otp_sms_limiter = RateLimiter(
+    "otp_sms", capacity=int(os.getenv("RATE_LIMIT_OTP_SMS_PER_HOUR", 3)),
+    window_seconds=3600, message="لقد تجاوزت الحد الأقصى. حاول بعد ساعة")
+login_limiter = RateLimiter(
+    "login", capacity=int(os.getenv("RATE_LIMIT_LOGIN_PER_15_MIN", 10)),
+    window_seconds=900)
+verify_phone_limiter = RateLimiter(
+    "verify_phone", capacity=int(os.getenv("RATE_LIMIT_VERIFY_PHONE_PER_15_MIN", 5)),
+    window_seconds=900)
+resend_verification_limiter = RateLimiter(
+    "resend_verification", capacity=int(os.getenv("RATE_LIMIT_RESEND_PER_HOUR", 5)),
+    window_seconds=3600)
@@ -0,0 +1,75 @@
+# server\utils\reservation_export.py
+"""
+Streaming export of a clan's reservation history.
+
+Rows come from one flat SELECT (reservation columns plus the names of the
+joined clan, county, hall, committees and groom) read through a server-side
+cursor in EXPORT_BATCH_SIZE batches, and are encoded as they arrive. Nothing
+holds more than one batch, so memory stays flat however long the history is.
+"""
+import csv
+import io
+import json
+import os
+from typing import Iterator
+
+from server.db import SessionLocal
+from server.models.reservation import Reservation
+from server.utils.reservation_views import EXPORT_VIEW
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 500))
+
+# Same keys as /reservations/clan_admin/all_reservations, plus groom details
+EXPORT_FIELDS = list(EXPORT_VIEW.fields)
+
+
+def reservation_export_query(clan_id: int, county_id: int):
+    return EXPORT_VIEW.select().where(
+        Reservation.clan_id == clan_id,
+        Reservation.county_id == county_id
+    ).order_by(Reservation.date1, Reservation.id)
+
+
+def iter_reservation_batches(clan_id: int, county_id: int,
+                             batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[list]:
+    """
+    Batches of export rows (tuples in EXPORT_FIELDS order).
+
+    Uses its own session: the generator outlives the request dependencies
+    while the response is streaming.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            reservation_export_query(clan_id, county_id).execution_options(
+                stream_results=True, yield_per=batch_size)
+        )
+        for partition in result.partitions():
+            yield [EXPORT_VIEW.row(row) for row in partition]
+    finally:
+        db.close()
+
+
+def stream_ndjson(clan_id: int, county_id: int) -> Iterator[str]:
+    """One JSON object per line"""
+    for batch in iter_reservation_batches(clan_id, county_id):
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False) + "\n"
+            for row in batch
+        )
+
+
+def stream_csv(clan_id: int, county_id: int) -> Iterator[str]:
+    """CSV with a header row; the BOM makes Excel read the Arabic text as UTF-8"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    buffer.write("\ufeff")
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue()
+
+    for batch in iter_reservation_batches(clan_id, county_id):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(batch)
+        yield buffer.getvalue()
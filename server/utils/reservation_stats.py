@@ -0,0 +1,219 @@
+# server\utils\reservation_stats.py
+"""
+Reservation statistics for the valid_reservations_* endpoints and the dashboard.
+
+- A period is a half-open date range (date1 >= start AND date1 < end). The
+  filter stays on the bare column, so it can use
+  ix_reservations_county_clan_status_date1. func.date() and extract() could not.
+- Listings select (id, date1) only, never whole Reservation rows.
+- Counts come from reservation_daily_counts, a rollup per (county, clan,
+  date1, status). A year of a county is a sum over a few hundred small rows
+  instead of a scan of its reservations.
+
+The rollup is written in the same transaction as the reservations it counts:
+- a before_flush hook on SessionLocal turns ORM inserts, deletes and changes
+  of status / date1 / clan into +1 / -1 deltas
+- core bulk INSERTs (the groom import) call record_inserted()
+"""
+import logging
+from collections import Counter
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, event, func, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from server.db import SessionLocal
+from server.models.reservation import Reservation, ReservationStatus
+from server.models.reservation_daily_count import ReservationDailyCount
+
+logger = logging.getLogger(__name__)
+
+# (county_id, clan_id, day, status)
+RollupKey = Tuple[int, int, date, ReservationStatus]
+
+_ROLLUP_FIELDS = ("county_id", "clan_id", "date1", "status")
+
+
+# ---- Periods -----------------------------------------------------------
+
+def day_range(day: date) -> Tuple[date, date]:
+    return day, day + timedelta(days=1)
+
+
+def month_range(year: int, month: int) -> Tuple[date, date]:
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def year_range(year: int) -> Tuple[date, date]:
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+# ---- Queries -----------------------------------------------------------
+
+def reservations_in_range(db: Session, county_id: int, start: date, end: date,
+                          clan_id: Optional[int] = None,
+                          status: ReservationStatus = ReservationStatus.validated) -> List[dict]:
+    """(id, date1) of the reservations with start <= date1 < end"""
+    query = db.query(Reservation.id, Reservation.date1).filter(
+        Reservation.county_id == county_id,
+        Reservation.status == status,
+        Reservation.date1 >= start,
+        Reservation.date1 < end,
+    )
+    if clan_id is not None:
+        query = query.filter(Reservation.clan_id == clan_id)
+    return [
+        {"id": res_id, "date1": date1.isoformat() if date1 else None}
+        for res_id, date1 in query.order_by(Reservation.date1, Reservation.id)
+    ]
+
+
+def count_in_range(db: Session, county_id: int, start: date, end: date,
+                   clan_id: Optional[int] = None,
+                   status: ReservationStatus = ReservationStatus.validated) -> int:
+    """Number of reservations with start <= date1 < end, read from the rollup"""
+    query = db.query(func.coalesce(func.sum(ReservationDailyCount.count), 0)).filter(
+        ReservationDailyCount.county_id == county_id,
+        ReservationDailyCount.status == status,
+        ReservationDailyCount.day >= start,
+        ReservationDailyCount.day < end,
+    )
+    if clan_id is not None:
+        query = query.filter(ReservationDailyCount.clan_id == clan_id)
+    return int(query.scalar())
+
+
+def validated_summary(db: Session, county_id: int, start: date, end: date,
+                      clan_id: Optional[int] = None,
+                      include_reservations: bool = True) -> dict:
+    """
+    count and reservations of the validated reservations of a period.
+    Without the listing the count is a rollup lookup only.
+    """
+    if not include_reservations:
+        return {"count": count_in_range(db, county_id, start, end, clan_id),
+                "reservations": []}
+    reservations = reservations_in_range(db, county_id, start, end, clan_id)
+    return {"count": len(reservations), "reservations": reservations}
+
+
+def validated_period_counts(db: Session, county_id: int, clan_id: Optional[int],
+                            today: date) -> dict:
+    """
+    Validated reservations of today, this month and this year, for the clan
+    and for the whole county: one conditional aggregate over the rollup rows
+    of the year (SUM(count) FILTER (WHERE ...)).
+    """
+    rollup = ReservationDailyCount
+    year_start, year_end = year_range(today.year)
+    month_start, month_end = month_range(today.year, today.month)
+    in_today = rollup.day == today
+    in_month = and_(rollup.day >= month_start, rollup.day < month_end)
+    in_clan = rollup.clan_id == clan_id
+
+    def total(*conditions):
+        return func.coalesce(func.sum(rollup.count).filter(and_(*conditions)), 0)
+
+    row = db.query(
+        total(in_clan, in_today),
+        total(in_clan, in_month),
+        total(in_clan),
+        total(in_today),
+        total(in_month),
+        func.coalesce(func.sum(rollup.count), 0),
+    ).filter(
+        rollup.county_id == county_id,
+        rollup.status == ReservationStatus.validated,
+        rollup.day >= year_start,
+        rollup.day < year_end,
+    ).one()
+    counts = [int(value) for value in row]
+    return {
+        "clan": dict(zip(("today", "month", "year"), counts[:3])) if clan_id else None,
+        "county": dict(zip(("today", "month", "year"), counts[3:])),
+    }
+
+
+# ---- Rollup maintenance ------------------------------------------------
+
+def _upsert(db: Session):
+    insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(ReservationDailyCount.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=["county_id", "clan_id", "day", "status"],
+        set_={"count": ReservationDailyCount.__table__.c.count + stmt.excluded.count},
+    )
+
+
+def _apply(db: Session, deltas: Counter) -> None:
+    rows = [
+        {"county_id": county_id, "clan_id": clan_id, "day": day,
+         "status": status, "count": delta}
+        for (county_id, clan_id, day, status), delta in deltas.items() if delta
+    ]
+    if rows:
+        # Core statement on the session's connection: no autoflush, same transaction
+        db.connection().execute(_upsert(db), rows)
+
+
+def _key(county_id, clan_id, day, status) -> Optional[RollupKey]:
+    if county_id is None or clan_id is None or day is None:
+        return None
+    return county_id, clan_id, day, ReservationStatus(
+        status or ReservationStatus.pending_validation)
+
+
+def _previous_key(reservation: Reservation) -> Optional[RollupKey]:
+    """Rollup key of the reservation as it is in the database"""
+    attrs = inspect(reservation).attrs
+    values = []
+    for name in _ROLLUP_FIELDS:
+        history = attrs[name].history
+        values.append(history.deleted[0] if history.deleted else attrs[name].value)
+    return _key(*values)
+
+
+def _current_key(reservation: Reservation) -> Optional[RollupKey]:
+    return _key(*(getattr(reservation, name) for name in _ROLLUP_FIELDS))
+
+
+def _before_flush(session: Session, flush_context, instances) -> None:
+    deltas: Counter = Counter()
+    for obj in session.new:
+        if isinstance(obj, Reservation):
+            key = _current_key(obj)
+            if key:
+                deltas[key] += 1
+    for obj in session.deleted:
+        if isinstance(obj, Reservation):
+            key = _previous_key(obj)
+            if key:
+                deltas[key] -= 1
+    for obj in session.dirty:
+        if isinstance(obj, Reservation) and session.is_modified(obj):
+            old, new = _previous_key(obj), _current_key(obj)
+            if old != new:
+                if old:
+                    deltas[old] -= 1
+                if new:
+                    deltas[new] += 1
+    _apply(session, deltas)
+
+
+def record_inserted(db: Session, reservations: Iterable[dict]) -> None:
+    """Count reservations inserted with a core INSERT (bypassing the ORM hook)"""
+    deltas: Counter = Counter()
+    for values in reservations:
+        key = _key(values.get("county_id"), values.get("clan_id"),
+                   values.get("date1"), values.get("status"))
+        if key:
+            deltas[key] += 1
+    _apply(db, deltas)
+
+
+event.listen(SessionLocal, "before_flush", _before_flush)
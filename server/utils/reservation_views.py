@@ -0,0 +1,172 @@
+# server\utils\reservation_views.py
+"""
+Read models for the reservation list endpoints and the export.
+
+A view is a named list of fields. It is read with one flat SELECT of exactly
+those columns: reservation columns plus the names of the clan, county, hall,
+committees, groom and groom's clan. Only the tables the view needs are
+outer-joined. No ORM objects are built, and each row becomes a dict with
+plain JSON values (dates as str, enums as their value) in one pass.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Iterable, List, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
+
+from server.models.clan import Clan
+from server.models.committee import HaiaCommittee, MadaehCommittee
+from server.models.county import County
+from server.models.hall import Hall
+from server.models.reservation import Reservation
+from server.models.user import User
+
+Groom = aliased(User, name="groom")
+GroomClan = aliased(Clan, name="groom_clan")
+
+COLUMNS = {
+    "id": Reservation.id,
+    "groom_id": Reservation.groom_id,
+    "clan_id_origin": Groom.clan_id,
+    "clan_name_origin": GroomClan.name,
+    "clan_id": Reservation.clan_id,
+    "county_id": Reservation.county_id,
+    "date1": Reservation.date1,
+    "date2": Reservation.date2,
+    "date2_bool": Reservation.date2_bool,
+    "allow_others": Reservation.allow_others,
+    "join_to_mass_wedding": Reservation.join_to_mass_wedding,
+    "status": Reservation.status,
+    "payment_valid": Reservation.payment_status,
+    "payment": Reservation.payment,
+    "created_at": Reservation.created_at,
+    "clan_name": Clan.name,
+    "county_name": County.name,
+    "hall_id": Reservation.hall_id,
+    "hall_name": Hall.name,
+    "haia_committee_id": Reservation.haia_committee_id,
+    "haia_committee_name": HaiaCommittee.name,
+    "madaeh_committee_id": Reservation.madaeh_committee_id,
+    "madaeh_committee_name": MadaehCommittee.name,
+    "custom_madaeh_committee_name": Reservation.custom_madaeh_committee_name,
+    "tilawa_type": Reservation.tilawa_type,
+    "groom_first_name": Groom.first_name,
+    "groom_last_name": Groom.last_name,
+    "groom_phone_number": Groom.phone_number,
+    "pdf_url": Reservation.pdf_url,
+    "first_name": Reservation.first_name,
+    "last_name": Reservation.last_name,
+    "father_name": Reservation.father_name,
+    "grandfather_name": Reservation.grandfather_name,
+    "birth_date": Reservation.birth_date,
+    "birth_address": Reservation.birth_address,
+    "home_address": Reservation.home_address,
+    "phone_number": Reservation.phone_number,
+    "guardian_name": Reservation.guardian_name,
+    "guardian_phone": Reservation.guardian_phone,
+    "guardian_home_address": Reservation.guardian_home_address,
+    "guardian_birth_address": Reservation.guardian_birth_address,
+    "guardian_birth_date": Reservation.guardian_birth_date,
+}
+
+# Outer joins, in dependency order: (entity, on clause, entity it goes through)
+_JOINS = [
+    (Clan, Clan.id == Reservation.clan_id, None),
+    (County, County.id == Reservation.county_id, None),
+    (Hall, Hall.id == Reservation.hall_id, None),
+    (HaiaCommittee, HaiaCommittee.id == Reservation.haia_committee_id, None),
+    (MadaehCommittee, MadaehCommittee.id == Reservation.madaeh_committee_id, None),
+    (Groom, Groom.id == Reservation.groom_id, None),
+    (GroomClan, GroomClan.id == Groom.clan_id, Groom),
+]
+
+
+def plain(value):
+    """JSON / CSV friendly value, formatted like the list endpoints always were"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, date):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+class ReservationView:
+    """A named set of reservation fields, read with one flat SELECT"""
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = tuple(fields)
+        self.columns = [COLUMNS[field].label(field) for field in self.fields]
+
+        entities = {COLUMNS[field].parent.entity for field in self.fields}
+        for entity, _, through in reversed(_JOINS):
+            if entity in entities and through is not None:
+                entities.add(through)
+        self._joins = [(entity, on) for entity, on, _ in _JOINS if entity in entities]
+
+    def _join(self, query):
+        for entity, on in self._joins:
+            query = query.outerjoin(entity, on)
+        return query
+
+    def select(self):
+        """Core SELECT, for streaming with db.execute"""
+        return self._join(select(*self.columns).select_from(Reservation))
+
+    def query(self, db: Session):
+        """ORM Query of rows, for filter / paginate"""
+        return self._join(db.query(*self.columns).select_from(Reservation))
+
+    def row(self, row) -> tuple:
+        return tuple(plain(value) for value in row)
+
+    def to_dict(self, row) -> dict:
+        return {field: plain(value) for field, value in zip(self.fields, row)}
+
+    def to_dicts(self, rows: Iterable) -> List[dict]:
+        fields = self.fields
+        return [{field: plain(value) for field, value in zip(fields, row)}
+                for row in rows]
+
+
+# Fields every reservation listing returns
+BASE_FIELDS = (
+    "id", "groom_id", "clan_id", "county_id", "date1", "date2", "date2_bool",
+    "allow_others", "join_to_mass_wedding", "status", "created_at",
+    "clan_name", "county_name", "hall_name", "hall_id",
+    "haia_committee_id", "haia_committee_name", "madaeh_committee_id",
+    "custom_madaeh_committee_name", "tilawa_type", "madaeh_committee_name",
+    "pdf_url", "first_name", "last_name", "father_name", "grandfather_name",
+    "birth_date", "birth_address", "home_address", "phone_number",
+    "guardian_name", "guardian_phone", "guardian_home_address",
+    "guardian_birth_address", "guardian_birth_date",
+)
+ORIGIN_FIELDS = ("clan_id_origin", "clan_name_origin")
+GROOM_FIELDS = ("groom_first_name", "groom_last_name", "groom_phone_number")
+
+# /reservations/my_all_reservations
+GROOM_RESERVATIONS_VIEW = ReservationView(BASE_FIELDS + ORIGIN_FIELDS + ("payment_valid",))
+# /reservations/my_pending_reservation
+GROOM_PENDING_VIEW = ReservationView(BASE_FIELDS + ORIGIN_FIELDS)
+# my_validated / my_cancelled and /reservations/clan_admin/all_reservations
+RESERVATION_VIEW = ReservationView(BASE_FIELDS + ("payment_valid",))
+# /reservations/reservations/all_reservations
+CLAN_RESERVATIONS_VIEW = ReservationView(BASE_FIELDS + GROOM_FIELDS + ("payment_valid",))
+# /reservations/clan_admin/export
+EXPORT_VIEW = ReservationView((
+    "id", "groom_id", "clan_id", "county_id", "date1", "date2", "date2_bool",
+    "allow_others", "join_to_mass_wedding", "status", "payment_valid", "payment",
+    "created_at", "clan_name", "county_name", "hall_id", "hall_name",
+    "haia_committee_id", "haia_committee_name", "madaeh_committee_id",
+    "madaeh_committee_name", "custom_madaeh_committee_name", "tilawa_type",
+    "groom_first_name", "groom_last_name", "groom_phone_number", "pdf_url",
+    "first_name", "last_name", "father_name", "grandfather_name", "birth_date",
+    "birth_address", "home_address", "phone_number", "guardian_name",
+    "guardian_phone", "guardian_home_address", "guardian_birth_address",
+    "guardian_birth_date",
+))
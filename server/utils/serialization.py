@@ -0,0 +1,79 @@
+# server\utils\serialization.py
+"""
+Fast JSON responses.
+
+- FastJSONResponse renders with orjson and is the app's default response
+  class. Routes returning plain dicts / lists go through it unchanged.
+- ListSerializer wraps a TypeAdapter(List[Model]) (and the CursorPage
+  envelope) built once at import. A large list endpoint validates its rows
+  once, from ORM attributes or dicts, then pydantic-core dumps them straight
+  to JSON bytes.
+- The result is returned as a Response, so FastAPI does not validate the
+  rows a second time against response_model or walk them with
+  jsonable_encoder. response_model stays on the route for the OpenAPI
+  schema. Model instances the handler already built (trusted read models)
+  pass through the adapter without being validated again.
+"""
+from decimal import Decimal
+from typing import Any, Generic, Iterable, List, Optional, Type, TypeVar
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from starlette.responses import Response
+
+from server.schemas.pagination import CursorPage
+
+M = TypeVar("M", bound=BaseModel)
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson (UTF-8, no ASCII escaping, like FastAPI's)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class ListSerializer(Generic[M]):
+    """Serializer for List[model] and CursorPage[model] responses"""
+
+    def __init__(self, model: Type[M]):
+        self.model = model
+        self.list_adapter = TypeAdapter(List[model])
+        self.page_adapter = TypeAdapter(CursorPage[model])
+
+    def validate(self, items: Iterable[Any], from_attributes: bool = False) -> List[M]:
+        return self.list_adapter.validate_python(
+            list(items), from_attributes=from_attributes)
+
+    def dump(self, items: Iterable[Any], from_attributes: bool = False) -> bytes:
+        return self.list_adapter.dump_json(self.validate(items, from_attributes))
+
+    def response(self, items: Iterable[Any], from_attributes: bool = False,
+                 status_code: int = 200) -> Response:
+        return Response(self.dump(items, from_attributes), status_code=status_code,
+                        media_type="application/json")
+
+    def page_response(self, items: Iterable[Any], next_cursor: Optional[str], params,
+                      from_attributes: bool = False) -> Response:
+        """Like utils.pagination.page_response: full list, or the cursor envelope"""
+        if not params.enabled:
+            return self.response(items, from_attributes)
+        page = self.page_adapter.validate_python(
+            {"items": list(items), "next_cursor": next_cursor},
+            from_attributes=from_attributes)
+        return Response(self.page_adapter.dump_json(page), media_type="application/json")
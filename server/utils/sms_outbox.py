@@ -0,0 +1,261 @@
+# server\utils\sms_outbox.py
+"""
+Outbound SMS queue.
+
+Routes used to build a Twilio client and send inside the request, so a slow
+provider showed up as registration / login latency. They now only insert a
+row in sms_outbox (after the same phone validation and rate limit as
+before). A worker thread per process, with one reused transport:
+- claims due messages in batches of SMS_BATCH_SIZE (FOR UPDATE SKIP LOCKED)
+- sends at most SMS_RATE_PER_SECOND messages per second. The pacing is per
+  process: with N uvicorn workers the provider sees up to
+  N x SMS_RATE_PER_SECOND, so set it to the account limit divided by N
+- marks them sent, or retries with a delay doubling from
+  SMS_RETRY_BASE_SECONDS (capped at SMS_RETRY_MAX_SECONDS) up to
+  SMS_MAX_ATTEMPTS, or fails them at once when the provider says a retry
+  cannot help
+Messages stuck in "sending" by a crashed worker are picked up again after
+SMS_SENDING_TIMEOUT_SECONDS.
+Bodies hold OTP codes, so once a message is sent or failed for good its body
+is blanked after SMS_BODY_RETENTION_SECONDS (checked from the idle loop every
+SMS_REDACT_INTERVAL_SECONDS). The row itself is kept for the stats.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from server.db import SessionLocal
+from server.models.sms_message import SmsMessage, SmsStatus
+from server.utils.metrics import sms_send_duration
+from server.utils.sms_transport import SmsSendError, SmsTransport, make_transport
+
+logger = logging.getLogger(__name__)
+
+SMS_BATCH_SIZE = int(os.getenv("SMS_BATCH_SIZE", 20))
+# Per worker process, see the module docstring
+SMS_RATE_PER_SECOND = float(os.getenv("SMS_RATE_PER_SECOND", 5))
+SMS_MAX_ATTEMPTS = int(os.getenv("SMS_MAX_ATTEMPTS", 5))
+SMS_RETRY_BASE_SECONDS = float(os.getenv("SMS_RETRY_BASE_SECONDS", 10))
+SMS_RETRY_MAX_SECONDS = float(os.getenv("SMS_RETRY_MAX_SECONDS", 900))
+SMS_POLL_SECONDS = float(os.getenv("SMS_POLL_SECONDS", 5))
+SMS_SENDING_TIMEOUT_SECONDS = int(os.getenv("SMS_SENDING_TIMEOUT_SECONDS", 300))
+SMS_BODY_RETENTION_SECONDS = int(os.getenv("SMS_BODY_RETENTION_SECONDS", 24 * 3600))
+SMS_REDACT_INTERVAL_SECONDS = int(os.getenv("SMS_REDACT_INTERVAL_SECONDS", 600))
+
+# Stored in place of a body past its retention
+REDACTED_BODY = ""
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before attempt number attempts + 1"""
+    return min(SMS_RETRY_BASE_SECONDS * 2 ** (attempts - 1), SMS_RETRY_MAX_SECONDS)
+
+
+class SmsOutbox:
+    """Persisted SMS queue plus its sending thread"""
+
+    def __init__(self, transport: Optional[SmsTransport] = None):
+        self.transport = transport or make_transport()
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._last_send = 0.0
+        self._last_redact: Optional[float] = None
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def enqueue(self, db: Session, to_phone: str, body: str,
+                purpose: Optional[str] = None) -> SmsMessage:
+        """Store the message and wake the worker; the send happens later"""
+        if not self.transport.configured:
+            logger.error(f"SMS transport {self.transport.name} is not configured")
+            raise ValueError("إعدادات Twilio غير مضبوطة")
+
+        message = SmsMessage(
+            to_phone=to_phone,
+            body=body,
+            purpose=purpose,
+            status=SmsStatus.queued,
+            attempts=0,
+            next_attempt_at=datetime.utcnow(),
+            created_at=datetime.utcnow(),
+        )
+        db.add(message)
+        db.commit()
+
+        self.start()
+        self._wakeup.set()
+        return message
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._work, name="sms-outbox", daemon=True)
+            self._thread.start()
+
+    def _claim(self) -> List[int]:
+        """Mark a batch of due messages as sending and return their ids"""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            stuck_before = now - timedelta(seconds=SMS_SENDING_TIMEOUT_SECONDS)
+            messages = db.query(SmsMessage).filter(or_(
+                and_(SmsMessage.status == SmsStatus.queued,
+                     SmsMessage.next_attempt_at <= now),
+                and_(SmsMessage.status == SmsStatus.sending,
+                     SmsMessage.next_attempt_at <= stuck_before)
+            )).order_by(SmsMessage.next_attempt_at, SmsMessage.id).limit(
+                SMS_BATCH_SIZE).with_for_update(skip_locked=True).all()
+            for message in messages:
+                message.status = SmsStatus.sending
+                # While sending, next_attempt_at is the claim time
+                message.next_attempt_at = now
+            db.commit()
+            return [message.id for message in messages]
+        finally:
+            db.close()
+
+    def _pace(self):
+        """Keep at most SMS_RATE_PER_SECOND sends per second (in this process)"""
+        if SMS_RATE_PER_SECOND <= 0:
+            return
+        wait = self._last_send + 1 / SMS_RATE_PER_SECOND - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last_send = time.monotonic()
+
+    def _send(self, db: Session, message: SmsMessage):
+        self._pace()
+        message.attempts += 1
+        started = time.perf_counter()
+        try:
+            message.provider_id = self.transport.send(message.to_phone, message.body)
+        except SmsSendError as e:
+            sms_send_duration.labels(self.transport.name, "error").observe(
+                time.perf_counter() - started)
+            message.last_error = str(e)
+            if e.retryable and message.attempts < SMS_MAX_ATTEMPTS:
+                message.status = SmsStatus.queued
+                message.next_attempt_at = datetime.utcnow() + timedelta(
+                    seconds=retry_delay(message.attempts))
+                logger.warning(
+                    f"SMS {message.id} attempt {message.attempts} failed, retrying: {e}")
+            else:
+                message.status = SmsStatus.failed
+                logger.error(f"SMS {message.id} to {message.to_phone} failed: {e}")
+            return
+        sms_send_duration.labels(self.transport.name, "sent").observe(
+            time.perf_counter() - started)
+        message.status = SmsStatus.sent
+        message.sent_at = datetime.utcnow()
+        message.last_error = None
+        logger.info(f"SMS {message.id} sent to {message.to_phone}, id: {message.provider_id}")
+
+    def process_batch(self) -> int:
+        """Send one batch of due messages; returns how many were handled"""
+        ids = self._claim()
+        if not ids:
+            return 0
+        db = SessionLocal()
+        try:
+            messages = db.query(SmsMessage).filter(
+                SmsMessage.id.in_(ids)).order_by(SmsMessage.id).all()
+            for message in messages:
+                self._send(db, message)
+                # Commit each outcome: a crash must not resend delivered messages
+                db.commit()
+        finally:
+            db.close()
+        return len(ids)
+
+    def _work(self):
+        while not self._stopping.is_set():
+            try:
+                handled = self.process_batch()
+            except Exception as e:
+                logger.error(f"SMS outbox worker error: {e}")
+                handled = 0
+            if handled == 0:
+                self._redact_due()
+                self._wakeup.wait(self._idle_seconds())
+                self._wakeup.clear()
+
+    def redact_bodies(self) -> int:
+        """Blank the bodies of finished messages older than the retention"""
+        cutoff = datetime.utcnow() - timedelta(seconds=SMS_BODY_RETENTION_SECONDS)
+        db = SessionLocal()
+        try:
+            redacted = db.query(SmsMessage).filter(
+                SmsMessage.status.in_([SmsStatus.sent, SmsStatus.failed]),
+                SmsMessage.created_at < cutoff,
+                SmsMessage.body != REDACTED_BODY,
+            ).update({SmsMessage.body: REDACTED_BODY}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        if redacted:
+            logger.info(f"Redacted the bodies of {redacted} SMS messages")
+        return redacted
+
+    def _redact_due(self):
+        if (self._last_redact is not None
+                and time.monotonic() - self._last_redact < SMS_REDACT_INTERVAL_SECONDS):
+            return
+        self._last_redact = time.monotonic()
+        try:
+            self.redact_bodies()
+        except Exception as e:
+            logger.error(f"SMS outbox redaction error: {e}")
+
+    def _idle_seconds(self) -> float:
+        """Until the next retry is due, at most SMS_POLL_SECONDS"""
+        db = SessionLocal()
+        try:
+            next_due = db.query(func.min(SmsMessage.next_attempt_at)).filter(
+                SmsMessage.status == SmsStatus.queued).scalar()
+        except Exception:
+            return SMS_POLL_SECONDS
+        finally:
+            db.close()
+        if next_due is None:
+            return SMS_POLL_SECONDS
+        due_in = (next_due - datetime.utcnow()).total_seconds()
+        return min(max(due_in, 0.05), SMS_POLL_SECONDS)
+
+    def stats(self) -> dict:
+        db = SessionLocal()
+        try:
+            counts = {status.value: 0 for status in SmsStatus}
+            for status, count in db.query(
+                    SmsMessage.status, func.count(SmsMessage.id)).group_by(SmsMessage.status):
+                counts[status.value] = count
+        finally:
+            db.close()
+        return {
+            "transport": self.transport.name,
+            "rate_per_second": SMS_RATE_PER_SECOND,
+            "messages": counts,
+        }
+
+    def shutdown(self) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+
+
+# Shared instance used by the OTP helpers and the app lifespan
+sms_outbox = SmsOutbox()
@@ -0,0 +1,131 @@
+# server\utils\sms_transport.py
+"""
+SMS transports used by the outbox worker.
+
+A transport sends one message and returns the provider's message id, or
+raises SmsSendError saying whether a retry can help. SMS_TRANSPORT selects it:
+- "twilio" (default): Twilio Messaging Service, one client reused for all sends
+- "fake": nothing leaves the machine; messages are kept in memory and, when
+  SMS_FAKE_FILE is set, appended to that file as JSON lines
+"""
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Deque, Optional
+
+from twilio.base.exceptions import TwilioRestException
+from twilio.rest import Client
+
+logger = logging.getLogger(__name__)
+
+SMS_TRANSPORT = os.getenv("SMS_TRANSPORT", "twilio")
+SMS_FAKE_FILE = os.getenv("SMS_FAKE_FILE")
+
+TWILIO_SID = os.getenv("TWILIO_SID")
+TWILIO_TOKEN = os.getenv("TWILIO_TOKEN")
+TWILIO_MESSAGING_SERVICE_SID = os.getenv("TWILIO_MESSAGING_SERVICE_SID")
+
+# Twilio errors that will fail the same way on every retry
+TWILIO_PERMANENT_ERRORS = {
+    21408: "تأكد من تفعيل الجزائر في Twilio Geographic Permissions",
+    21211: "رقم الهاتف غير صالح",
+    21614: "رقم الهاتف غير صالح",
+    21610: "الرقم غير موجود أو لا يمكن الوصول إليه",
+    30005: "الرقم غير موجود أو لا يمكن الوصول إليه",
+    21606: "رقم الهاتف في القائمة السوداء",
+}
+
+
+class SmsSendError(Exception):
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class SmsTransport:
+    """Interface of the outbox transports"""
+    name = "base"
+
+    @property
+    def configured(self) -> bool:
+        return True
+
+    def send(self, to_phone: str, body: str) -> str:
+        raise NotImplementedError
+
+
+class TwilioTransport(SmsTransport):
+    name = "twilio"
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def configured(self) -> bool:
+        return all([TWILIO_SID, TWILIO_TOKEN, TWILIO_MESSAGING_SERVICE_SID])
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = Client(TWILIO_SID, TWILIO_TOKEN)
+            return self._client
+
+    def send(self, to_phone: str, body: str) -> str:
+        if not self.configured:
+            raise SmsSendError("إعدادات Twilio غير مضبوطة", retryable=False)
+        try:
+            message = self._get_client().messages.create(
+                messaging_service_sid=TWILIO_MESSAGING_SERVICE_SID,
+                body=body,
+                to=to_phone
+            )
+        except TwilioRestException as e:
+            logger.error(f"Twilio error: {e.code} - {e.msg}")
+            if e.code in TWILIO_PERMANENT_ERRORS:
+                raise SmsSendError(TWILIO_PERMANENT_ERRORS[e.code], retryable=False)
+            # 4xx other than throttling will not get better by retrying
+            retryable = e.status is None or e.status == 429 or e.status >= 500
+            raise SmsSendError(f"خطأ في الإرسال: {e.msg}", retryable=retryable)
+        except Exception as e:
+            # Network errors, timeouts
+            raise SmsSendError(f"فشل إرسال الرسالة: {e}")
+        return message.sid
+
+
+class FakeTransport(SmsTransport):
+    """Offline transport for development and tests"""
+    name = "fake"
+
+    def __init__(self, path: Optional[str] = SMS_FAKE_FILE):
+        self.path = path
+        # Most recent messages, for tests and the dev console
+        self.sent: Deque[dict] = deque(maxlen=1000)
+        self._lock = threading.Lock()
+
+    def send(self, to_phone: str, body: str) -> str:
+        record = {
+            "id": f"fake-{uuid.uuid4().hex}",
+            "to": to_phone,
+            "body": body,
+            "sent_at": datetime.utcnow().isoformat(),
+        }
+        with self._lock:
+            self.sent.append(record)
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        logger.info(f"[fake sms] to {to_phone}: {body}")
+        return record["id"]
+
+
+def make_transport(name: str = SMS_TRANSPORT) -> SmsTransport:
+    if name == "fake":
+        return FakeTransport()
+    if name == "twilio":
+        return TwilioTransport()
+    raise ValueError(f"Unknown SMS_TRANSPORT: {name}")
@@ -0,0 +1,115 @@
+"""
+The before_flush hooks behind the reservation rollup, the day slots and the
+clan versions must see the database value of a column even when the
+reservation is changed after a commit (expired instance).
+
+    python -m pytest tests
+"""
+import os
+import tempfile
+from datetime import date
+
+_db_file = os.path.join(tempfile.mkdtemp(), "test.db")
+# server.db builds its engine at import time
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_file}"
+os.environ.setdefault("SECRET_KEY", "test")
+
+import pytest  # noqa: E402
+
+import server.main  # noqa: E402,F401  registers every model
+from server.db import Base, SessionLocal, engine  # noqa: E402
+from server.models import Clan, County, Reservation, ReservationStatus  # noqa: E402
+from server.models.reservation_daily_count import ReservationDailyCount  # noqa: E402
+from server.models.reservation_day_slot import ReservationDaySlot  # noqa: E402
+from server.utils import clan_versions, day_slots, reservation_stats  # noqa: E402,F401
+
+DAY = date(2027, 1, 10)
+
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    county = County(name="county")
+    session.add(county)
+    session.commit()
+    session.add_all([Clan(name="a", county_id=county.id),
+                     Clan(name="b", county_id=county.id)])
+    session.commit()
+    yield session
+    session.close()
+
+
+def _rollup(db):
+    return {(row.clan_id, row.day, row.status): row.count
+            for row in db.query(ReservationDailyCount) if row.count}
+
+
+def _truth(db):
+    counts = {}
+    for r in db.query(Reservation):
+        key = (r.clan_id, r.date1, r.status)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def _slots(db):
+    return {(s.clan_id, s.day): (s.total, s.solo)
+            for s in db.query(ReservationDaySlot) if s.total}
+
+
+def _new(db, clan_id, **values):
+    reservation = Reservation(clan_id=clan_id, county_id=1, date1=DAY, **values)
+    db.add(reservation)
+    db.commit()
+    return reservation
+
+
+def test_rollup_follows_changes_made_after_commit(db):
+    reservations = [_new(db, 1) for _ in range(3)]
+
+    # Each change is made on an instance expired by the previous commit
+    reservations[0].status = ReservationStatus.validated
+    db.commit()
+    reservations[0].status = ReservationStatus.cancelled
+    db.commit()
+    reservations[1].status = ReservationStatus.validated
+    db.commit()
+    reservations[2].date1 = date(2027, 2, 1)
+    db.commit()
+    reservations[2].clan_id = 2
+    db.commit()
+    assert _rollup(db) == _truth(db)
+
+    db.delete(reservations[1])
+    db.commit()
+    assert _rollup(db) == _truth(db)
+    assert all(count > 0 for count in _rollup(db).values())
+
+
+def test_day_slots_follow_changes_made_after_commit(db):
+    reservation = _new(db, 1)
+    assert _slots(db) == {(1, DAY): (1, 1)}
+
+    reservation.allow_others = True
+    db.commit()
+    assert _slots(db) == {(1, DAY): (1, 0)}
+
+    reservation.date1 = date(2027, 2, 1)
+    db.commit()
+    assert _slots(db) == {(1, date(2027, 2, 1)): (1, 0)}
+
+    reservation.status = ReservationStatus.cancelled
+    db.commit()
+    assert _slots(db) == {}
+
+
+def test_clan_version_bumps_both_clans_of_a_move(db):
+    reservation = _new(db, 1)
+    before = clan_versions.get_version(db, 1), clan_versions.get_version(db, 2)
+
+    reservation.clan_id = 2
+    db.commit()
+    assert clan_versions.get_version(db, 1) == before[0] + 1
+    assert clan_versions.get_version(db, 2) == before[1] + 1